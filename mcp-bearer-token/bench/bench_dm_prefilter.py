@@ -0,0 +1,34 @@
+"""Local DM pre-classifier throughput over the labelled fixture texts.
+
+    python mcp-bearer-token/bench/bench_dm_prefilter.py [--rounds 2000]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from eval_dm_prefilter import DEFAULT_FIXTURE, load_fixture  # noqa: E402
+from tools.dm_prefilter import load_prefilter  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rounds", type=int, default=2000)
+    args = parser.parse_args()
+
+    texts = [item["text"] for item in load_fixture(DEFAULT_FIXTURE)]
+    prefilter = load_prefilter()
+    prefilter.classify(texts[0])
+    start = time.perf_counter()
+    for _ in range(args.rounds):
+        for text in texts:
+            prefilter.classify(text, allow_harmless=True, allow_scored_run=True)
+    elapsed = time.perf_counter() - start
+    total = args.rounds * len(texts)
+    print(f"{total} classifications in {elapsed:.2f}s: {total / elapsed:,.0f} msgs/s, {elapsed / total * 1e6:.1f} us each")
+
+
+if __name__ == "__main__":
+    main()
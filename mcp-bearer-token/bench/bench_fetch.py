@@ -0,0 +1,57 @@
+"""Fetch engine throughput against the local stand-in server.
+
+    python mcp-bearer-token/bench/bench_fetch.py [--pages 200] [--kb 64]
+
+Fetches every page cold, then again once its ETag needs revalidating (304),
+then again while a max-age is still fresh (no request at all).
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SERVER_DIR)
+sys.path.insert(0, os.path.join(SERVER_DIR, "tests"))
+
+from stand_in import Reply, StandInServer, html  # noqa: E402
+from tools.fetch_engine import FetchEngine  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, default=200)
+    parser.add_argument("--kb", type=int, default=64)
+    args = parser.parse_args()
+    body = "<p>" + "lorem ipsum " * (args.kb * 1024 // 12) + "</p>"
+
+    def etag_page(headers):
+        if headers.get("if-none-match") == '"v1"':
+            return Reply(304, headers={"ETag": '"v1"'})
+        return html(body, ETag='"v1"')
+
+    routes = {f"/etag/{i}": etag_page for i in range(args.pages)}
+    routes.update({f"/fresh/{i}": (lambda h: html(body, **{"Cache-Control": "max-age=600"})) for i in range(args.pages)})
+
+    async def run(engine, urls):
+        start = time.perf_counter()
+        await asyncio.gather(*(engine.fetch(url, "bench") for url in urls))
+        return time.perf_counter() - start
+
+    with StandInServer(routes) as server:
+        engine = FetchEngine(parse_workers=0, cache_entries=2 * args.pages)
+        etag_urls = [server.url(f"/etag/{i}") for i in range(args.pages)]
+        fresh_urls = [server.url(f"/fresh/{i}") for i in range(args.pages)]
+
+        async def scenario():
+            await run(engine, fresh_urls)
+            return await run(engine, etag_urls), await run(engine, etag_urls), await run(engine, fresh_urls)
+
+        cold, revalidated, fresh = asyncio.run(scenario())
+    for name, elapsed in (("cold", cold), ("revalidated (304)", revalidated), ("fresh cache", fresh)):
+        print(f"{name:<20}{args.pages / elapsed:>10.0f} pages/s")
+
+
+if __name__ == "__main__":
+    main()
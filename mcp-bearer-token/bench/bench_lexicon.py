@@ -0,0 +1,96 @@
+"""Heuristic keyword scoring: the old per-category rescans against one Lexicon pass.
+
+    python mcp-bearer-token/bench/bench_lexicon.py [--text-kb 64] [--results 5000]
+"""
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tools.outfit_rater import STYLE_LEXICON  # noqa: E402
+from tools.trendy_date_spotter import SPOT_LEXICON  # noqa: E402
+
+FILLER = "the evening went on and we talked about everything under the sun while it rained outside".split()
+STYLE_WORDS = ["suit", "blazer", "jeans", "hoodie", "vintage", "retro", "wrinkled", "sneakers", "Silk", "Oversized"]
+SPOT_WORDS = ["rooftop", "speakeasy", "hidden", "arcade", "Museum", "gallery", "popup"]
+SPOT_KEYWORDS = ["rooftop", "speakeasy", "hidden", "underground", "arcade", "museum", "gallery", "theater", "popup"]
+
+
+def legacy_style(desc: str) -> int:
+    """OutfitRater._style_score before the lexicon: four findall passes."""
+    desc = desc.lower()
+    return (
+        len(re.findall(r"suit|blazer|dress|heels|silk|tailored", desc)) * 10
+        + len(re.findall(r"jeans|t-shirt|hoodie|sneakers", desc)) * 5
+        + len(re.findall(r"oversized|retro|vintage|streetwear", desc)) * 8
+        + len(re.findall(r"clashing|mismatched|wrinkled", desc)) * -10
+    )
+
+
+def lexicon_style(desc: str) -> int:
+    hits = STYLE_LEXICON.scan(desc)
+    return sum(hits.points(c) for c in ("classy", "casual", "trendy", "mismatch"))
+
+
+def legacy_curate(results):
+    """TrendyDateSpotter._curate scoring before the lexicon: one `in` test per keyword."""
+    scored = []
+    for item in results:
+        text = (item["title"] + " " + item["snippet"]).lower()
+        scored.append(sum(3 for k in SPOT_KEYWORDS if k in text) + len(text) / 400)
+    return scored
+
+
+def lexicon_curate(results):
+    scored = []
+    for item in results:
+        text = item["title"] + " " + item["snippet"]
+        scored.append(SPOT_LEXICON.scan(text).presence_points("standout") + len(text) / 400)
+    return scored
+
+
+def text_of(rng: random.Random, words, size: int) -> str:
+    out, length = [], 0
+    while length < size:
+        word = rng.choice(words) if rng.random() < 0.1 else rng.choice(FILLER)
+        out.append(word)
+        length += len(word) + 1
+    return " ".join(out)
+
+
+def timed(fn, arg, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn(arg)
+    elapsed = (time.perf_counter() - start) / repeat
+    return elapsed, result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--text-kb", type=int, default=64)
+    parser.add_argument("--results", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    rng = random.Random(7)
+
+    text = text_of(rng, STYLE_WORDS, args.text_kb * 1024)
+    results = [{"title": text_of(rng, SPOT_WORDS, 60), "snippet": text_of(rng, SPOT_WORDS, 300)} for _ in range(args.results)]
+
+    old, old_score = timed(legacy_style, text, args.repeat)
+    new, new_score = timed(lexicon_style, text, args.repeat)
+    assert old_score == new_score, (old_score, new_score)
+    print(f"style score, {args.text_kb} KB text:   legacy {old * 1e3:7.2f} ms   lexicon {new * 1e3:7.2f} ms   ({old / new:.1f}x)")
+
+    old, old_scores = timed(legacy_curate, results, max(1, args.repeat // 4))
+    new, new_scores = timed(lexicon_curate, results, max(1, args.repeat // 4))
+    assert old_scores == new_scores
+    print(f"curate, {args.results} results:     legacy {old * 1e3:7.2f} ms   lexicon {new * 1e3:7.2f} ms   ({old / new:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
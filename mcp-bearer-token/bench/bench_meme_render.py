@@ -0,0 +1,61 @@
+"""Meme renders per second: the old per-request setup against tools/meme_renderer.
+
+    python mcp-bearer-token/bench/bench_meme_render.py [--seconds 2]
+"""
+import argparse
+import base64
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image, ImageDraw, ImageFont  # noqa: E402
+from tools import meme_renderer  # noqa: E402
+
+CAPTION = "When they said 'let's split the bill' and then ordered the lobster and three cocktails"
+
+
+def legacy_render(caption: str) -> str:
+    """DateMemeGenerator._generate_meme_image before the renderer: full setup on every call."""
+    img = Image.new("RGB", (400, 200), color="#FFFFFF")
+    draw = ImageDraw.Draw(img)
+    try:
+        font = ImageFont.truetype("arial.ttf", 20)
+    except OSError:
+        font = ImageFont.load_default()
+    draw.text((10, 10), caption[:100], fill="#000000", font=font)
+    draw.text((10, 150), "#SafeDateMeme", fill="#FF6B6B", font=font)
+    buf = io.BytesIO()
+    img.save(buf, format="PNG")
+    return base64.b64encode(buf.getvalue()).decode("utf-8")
+
+
+def engine_render(caption: str) -> str:
+    return meme_renderer.render_meme("date_meme", [caption[:100]]).data
+
+
+def rate(fn, seconds: float) -> float:
+    fn(CAPTION)  # warm caches (font, template)
+    count, start = 0, time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        fn(CAPTION)
+        count += 1
+    return count / (time.perf_counter() - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seconds", type=float, default=2.0)
+    args = parser.parse_args()
+
+    print(f"{'renderer':<24}{'renders/s':>12}")
+    print(f"{'legacy (png, level 6)':<24}{rate(legacy_render, args.seconds):>12.0f}")
+    for fmt in ("png", "webp", "jpeg"):
+        os.environ["MEME_FORMAT"] = fmt
+        print(f"{'engine (' + fmt + ')':<24}{rate(engine_render, args.seconds):>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""Listing one user's tasks: the old filter-and-sort of a dict against both task stores.
+
+    python mcp-bearer-token/bench/bench_task_store.py [--tasks 50000] [--page 50]
+
+Each backend is timed on the first page, a page deep in the list (keyset
+cursor), a status filter, a tag filter and both together. The SQLite store
+uses a temporary file.
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from task_store import MemoryTaskStore, SQLiteTaskStore, sort_key  # noqa: E402
+
+USER = "bench-user"
+TAGS = ["work", "home", "errands", "date", "gym", "family", "travel", "bills"]
+
+
+def make_tasks(n: int, rng: random.Random):
+    tasks = []
+    for i in range(n):
+        due = None if rng.random() < 0.2 else f"2026-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}T{rng.randint(0, 23):02d}:00:00+00:00"
+        created = f"2026-01-01T00:00:{i:07d}"
+        tasks.append({
+            "id": str(uuid.UUID(int=rng.getrandbits(128))),
+            "title": f"task {i}",
+            "status": "completed" if rng.random() < 0.7 else "open",
+            "due_at": due,
+            "priority": "normal",
+            "tags": rng.sample(TAGS, 1) if rng.random() < 0.5 else [],
+            "notes": None,
+            "created_at": created,
+            "updated_at": created,
+        })
+    return tasks
+
+
+def legacy_list(tasks_by_id, status=None, tag=None, limit=None, after=None):
+    """list_tasks before the task store: filter every task, then sort them all."""
+    tasks = list(tasks_by_id.values())
+    if status:
+        tasks = [t for t in tasks if t["status"] == status]
+    if tag:
+        tasks = [t for t in tasks if tag in (t.get("tags") or [])]
+    tasks.sort(key=sort_key)
+    if after is not None:
+        tasks = [t for t in tasks if sort_key(t) > after]
+    return tasks[:limit]
+
+
+def timed(fn, repeat: int):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return (time.perf_counter() - start) / repeat, result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tasks", type=int, default=50_000)
+    parser.add_argument("--page", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    tasks = make_tasks(args.tasks, random.Random(3))
+    by_id = {t["id"]: t for t in tasks}
+    deep = sort_key(sorted(tasks, key=sort_key)[args.tasks // 2])
+
+    memory = MemoryTaskStore()
+    start = time.perf_counter()
+    memory.add_many(USER, [dict(t) for t in tasks])
+    memory_load = time.perf_counter() - start
+    with tempfile.TemporaryDirectory() as tmp:
+        sqlite = SQLiteTaskStore(os.path.join(tmp, "tasks.sqlite3"))
+        start = time.perf_counter()
+        sqlite.add_many(USER, tasks)
+        sqlite_load = time.perf_counter() - start
+        print(f"{args.tasks} tasks loaded: memory {memory_load:.2f} s, sqlite {sqlite_load:.2f} s (one transaction)")
+
+        cases = [
+            ("first page", {}),
+            ("page after the middle", {"after": deep}),
+            ("status=open", {"status": "open"}),
+            ("tag=date", {"tag": "date"}),
+            ("tag=date, status=open", {"tag": "date", "status": "open"}),
+        ]
+        print(f"{'page of ' + str(args.page):<24}{'legacy':>12}{'memory':>12}{'sqlite':>12}")
+        for name, query in cases:
+            old, expected = timed(lambda: legacy_list(by_id, limit=args.page, **query), max(1, args.repeat // 4))
+            mem, got_memory = timed(lambda: memory.list(USER, limit=args.page, **query), args.repeat)
+            sql, got_sqlite = timed(lambda: sqlite.list(USER, limit=args.page, **query), args.repeat)
+            assert [t["id"] for t in got_memory] == [t["id"] for t in expected] == [t["id"] for t in got_sqlite], name
+            print(f"{name:<24}{old * 1e3:>10.2f}ms{mem * 1e3:>10.3f}ms{sql * 1e3:>10.3f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""Agreement of the local DM pre-classifier with the LLM on a labelled fixture set.
+
+    python mcp-bearer-token/bench/eval_dm_prefilter.py                 # against the fixture's labels
+    python mcp-bearer-token/bench/eval_dm_prefilter.py --llm --write   # relabel with Groq, record the result
+
+The fixture is JSON lines of {"text": ..., "label": <risk level>}. Its labels
+are the verdicts expected from the LLM. With --llm, every text is sent to
+DMRiskMeter's LLM path (GROQ_API_KEY) and that answer is the label. Only an
+--llm run may --write its numbers into tools/data/dm_prefilter.json, and only
+those numbers can switch on local "Harmless" and score-based "Run" answers.
+Explicit threat-pattern matches always answer "Run" locally.
+"""
+import argparse
+import asyncio
+import json
+import os
+import re
+import sys
+from collections import Counter
+from datetime import datetime, timezone
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SERVER_DIR)
+
+from tools.dm_prefilter import MODEL_PATH, DMPrefilter  # noqa: E402
+
+DEFAULT_FIXTURE = os.path.join(SERVER_DIR, "tests", "fixtures", "dm_labelled.jsonl")
+# LLM verdicts that make a local "Harmless" answer unsafe, not merely off by a notch
+UNSAFE_FOR_HARMLESS = ("Borderline creepy", "Run")
+PATTERN_RUN, SCORED_RUN = "Run (pattern)", "Run (score)"
+
+
+def load_fixture(path: str):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+async def llm_labels(texts, concurrency: int = 4):
+    from tools.dm_risk_meter import DMRiskMeter
+
+    tool = DMRiskMeter(api_key=os.environ["GROQ_API_KEY"])
+    tool.cache_responses = False
+    limit = asyncio.Semaphore(concurrency)
+
+    async def label(text):
+        async with limit:
+            return (await tool._llm_analysis(text))["risk_level"]
+
+    return await asyncio.gather(*(label(text) for text in texts))
+
+
+def evaluate(prefilter: DMPrefilter, items):
+    """Compare local verdicts (with both score gates forced open) to the labels.
+
+    A "Run" from an explicit threat pattern and a "Run" from the score are
+    counted apart, since only the second one is gated on this evaluation.
+    """
+    confusion = Counter()
+    for item in items:
+        verdict = prefilter.classify(item["text"], allow_harmless=True, allow_scored_run=True)
+        local = verdict[0] if verdict else "escalated"
+        if local == "Run":
+            local = PATTERN_RUN if prefilter.run_hits(item["text"]) else SCORED_RUN
+        confusion[(local, item["label"])] += 1
+
+    def answered(local):
+        return sum(n for (verdict, _), n in confusion.items() if verdict == local)
+
+    def agreement(local, label):
+        total = answered(local)
+        return round(confusion[(local, label)] / total, 4) if total else None
+
+    return confusion, {
+        "harmless_agreement": agreement("Harmless", "Harmless"),
+        "harmless_samples": answered("Harmless"),
+        "harmless_unsafe": sum(confusion[("Harmless", label)] for label in UNSAFE_FOR_HARMLESS),
+        "run_agreement": agreement(PATTERN_RUN, "Run"),
+        "run_samples": answered(PATTERN_RUN),
+        "scored_run_agreement": agreement(SCORED_RUN, "Run"),
+        "scored_run_samples": answered(SCORED_RUN),
+    }
+
+
+def write_evaluation(path: str, evaluation) -> None:
+    """Replace only the "evaluation" block so the hand-kept layout of the rest survives."""
+    with open(path, encoding="utf-8") as f:
+        text = f.read()
+    block = json.dumps(evaluation, indent=2).replace("\n", "\n  ")
+    text, replaced = re.subn(r'"evaluation": \{[^}]*\}', lambda _: f'"evaluation": {block}', text)
+    if replaced != 1:
+        raise SystemExit(f"no evaluation block in {path}")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--fixture", default=DEFAULT_FIXTURE)
+    parser.add_argument("--model", default=MODEL_PATH)
+    parser.add_argument("--llm", action="store_true", help="label every text with the Groq model first")
+    parser.add_argument("--write", action="store_true", help="record the result in the model file (needs --llm)")
+    args = parser.parse_args()
+    if args.write and not args.llm:
+        parser.error("--write records agreement with the LLM, so it needs --llm")
+
+    items = load_fixture(args.fixture)
+    if args.llm:
+        labels = asyncio.run(llm_labels([item["text"] for item in items]))
+        items = [{**item, "label": label} for item, label in zip(items, labels)]
+
+    with open(args.model, encoding="utf-8") as f:
+        model = json.load(f)
+    prefilter = DMPrefilter(model)
+    confusion, stats = evaluate(prefilter, items)
+
+    print(f"{len(items)} messages, labels from {'the LLM' if args.llm else 'the fixture'}")
+    print(f"{'local verdict':<16}{'label':<20}{'count':>6}")
+    for (local, label), n in sorted(confusion.items()):
+        print(f"{local:<16}{label:<20}{n:>6}")
+    local_answers = stats["harmless_samples"] + stats["run_samples"] + stats["scored_run_samples"]
+    print(f"answered locally: {local_answers}/{len(items)} ({local_answers / len(items):.0%})")
+    for key, value in stats.items():
+        print(f"{key}: {value}")
+
+    evaluation = {
+        "label_source": "llm" if args.llm else "fixture",
+        **stats,
+        "evaluated_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+    }
+    gated = DMPrefilter({**model, "evaluation": evaluation})
+    print(f"local Harmless answers would be {'enabled' if gated.harmless_enabled else 'disabled'} "
+          f"(needs LLM labels, agreement >= {model['min_harmless_agreement']}, "
+          f">= {model['min_harmless_samples']} samples, no unsafe answers)")
+    print(f"score-based local Run answers would be {'enabled' if gated.scored_run_enabled else 'disabled'} "
+          f"(needs LLM labels, agreement >= {model['min_scored_run_agreement']}, "
+          f">= {model['min_scored_run_samples']} samples)")
+    if args.write:
+        write_evaluation(args.model, evaluation)
+        print(f"wrote evaluation to {args.model}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,30 +1,29 @@
 import asyncio
+import time
+import signal
+import socket
 from typing import Annotated
 import os
 from dotenv import load_dotenv
-from fastmcp import FastMCP
+from fastmcp import FastMCP, Context
 from fastmcp.server.auth.providers.bearer import BearerAuthProvider, RSAKeyPair
 from mcp import ErrorData, McpError
 from mcp.server.auth.provider import AccessToken
 from mcp.types import TextContent, ImageContent, INVALID_PARAMS, INTERNAL_ERROR
 from pydantic import BaseModel, Field, AnyUrl
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse
 
-import markdownify
 import httpx
-import readabilipy
+import importlib
 
-# Import extra tool classes
 import json
-from tools.best_date_idea import BestDateIdea
-from tools.best_restaurants_near_me import BestRestaurantsNearMe
-from tools.date_analyzer import DateAnalyzer
-from tools.date_meme_generator import DateMemeGenerator
-from tools.dm_risk_meter import DMRiskMeter
-from tools.outfit_rater import OutfitRater
-from tools.rate_my_date import RateMyDate
-from tools.safety_tools import SafetyTools
-from tools.text_vibe_checker import TextVibeChecker
-from tools.trendy_date_spotter import TrendyDateSpotter
+from tools.clients import registry as clients
+from tools.metrics import metrics, instrumented
+from tools.single_flight import SingleFlight
+from tools.fetch_engine import get_fetch_engine
+from tools.resilience import UpstreamUnavailable
+from tools.web_search import ddg_search, search_and_read as run_search_and_read
 
 # --- Load environment variables ---
 load_dotenv()
@@ -36,6 +35,19 @@ GROQ_API_KEY = os.environ.get("GROQ_API_KEY")
 GOOGLE_API_KEY = os.environ.get("GOOGLE_API_KEY")
 GIPHY_API_KEY = os.environ.get("GIPHY_API_KEY")
 TAVILY_API_KEY = os.environ.get("TAVILY_API_KEY")
+# Server binding; MCP_WORKERS > 1 pre-forks that many worker processes on one port
+HOST = os.environ.get("HOST", "0.0.0.0")
+PORT = int(os.environ.get("PORT", "8086"))
+MCP_WORKERS = int(os.environ.get("MCP_WORKERS", "1"))
+# Import every tool module in the background shortly after start-up (0 disables)
+MCP_WARM_TOOLS = os.environ.get("MCP_WARM_TOOLS", "1") != "0"
+MCP_WARM_DELAY = float(os.environ.get("MCP_WARM_DELAY", "1.0"))
+# Minimum seconds between streamed progress notifications
+STREAM_PROGRESS_INTERVAL = float(os.environ.get("STREAM_PROGRESS_INTERVAL", "0.1"))
+# Cities whose date-idea pools are generated during warm-up and a day ahead after that (comma-separated)
+DATE_IDEA_SEED_CITIES = [c.strip() for c in os.environ.get("DATE_IDEA_SEED_CITIES", "").split(",") if c.strip()]
+# Weather buckets seeded for each city; "any" is where the tool's default "unknown weather" lands
+DATE_IDEA_SEED_WEATHER = [w.strip() for w in os.environ.get("DATE_IDEA_SEED_WEATHER", "any,clear,cloudy,rainy").split(",") if w.strip()]
 
 assert TOKEN is not None, "Please set AUTH_TOKEN in your .env file"
 assert MY_NUMBER is not None, "Please set MY_NUMBER in your .env file"
@@ -74,66 +86,36 @@ class Fetch:
         user_agent: str,
         force_raw: bool = False,
     ) -> tuple[str, str]:
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.get(
-                    url,
-                    follow_redirects=True,
-                    headers={"User-Agent": user_agent},
-                    timeout=30,
-                )
-            except httpx.HTTPError as e:
-                raise McpError(ErrorData(code=INTERNAL_ERROR, message=f"Failed to fetch {url}: {e!r}"))
-
-            if response.status_code >= 400:
-                raise McpError(ErrorData(code=INTERNAL_ERROR, message=f"Failed to fetch {url} - status code {response.status_code}"))
+        engine = get_fetch_engine()
+        try:
+            response = await engine.fetch(url, user_agent)
+        except (httpx.HTTPError, UpstreamUnavailable) as e:
+            raise McpError(ErrorData(code=INTERNAL_ERROR, message=f"Failed to fetch {url}: {e!r}"))
 
-            page_raw = response.text
+        if response.status_code >= 400:
+            raise McpError(ErrorData(code=INTERNAL_ERROR, message=f"Failed to fetch {url} - status code {response.status_code}"))
 
-        content_type = response.headers.get("content-type", "")
-        is_page_html = "text/html" in content_type
+        page_raw = response.text
+        note = f"Page truncated at {engine.max_bytes} bytes.\n" if response.truncated else ""
 
-        if is_page_html and not force_raw:
-            return cls.extract_content_from_html(page_raw), ""
+        if response.is_html and not force_raw:
+            return await engine.to_markdown(page_raw), note
 
         return (
             page_raw,
-            f"Content type {content_type} cannot be simplified to markdown, but here is the raw content:\n",
+            note + f"Content type {response.content_type} cannot be simplified to markdown, but here is the raw content:\n",
         )
 
-    @staticmethod
-    def extract_content_from_html(html: str) -> str:
-        """Extract and convert HTML content to Markdown format."""
-        ret = readabilipy.simple_json.simple_json_from_html_string(html, use_readability=True)
-        if not ret or not ret.get("content"):
-            return "<error>Page failed to be simplified from HTML</error>"
-        content = markdownify.markdownify(ret["content"], heading_style=markdownify.ATX)
-        return content
-
     @staticmethod
     async def google_search_links(query: str, num_results: int = 5) -> list[str]:
         """
         Perform a scoped DuckDuckGo search and return a list of job posting URLs.
         (Using DuckDuckGo because Google blocks most programmatic scraping.)
         """
-        ddg_url = f"https://html.duckduckgo.com/html/?q={query.replace(' ', '+')}"
-        links = []
-
-        async with httpx.AsyncClient() as client:
-            resp = await client.get(ddg_url, headers={"User-Agent": Fetch.USER_AGENT})
-            if resp.status_code != 200:
-                return ["<error>Failed to perform search.</error>"]
-
-        from bs4 import BeautifulSoup
-        soup = BeautifulSoup(resp.text, "html.parser")
-        for a in soup.find_all("a", class_="result__a", href=True):
-            href = a["href"]
-            if "http" in href:
-                links.append(href)
-            if len(links) >= num_results:
-                break
-
-        return links or ["<error>No results found.</error>"]
+        results = await ddg_search(query, num_results, Fetch.USER_AGENT)
+        if results is None:
+            return ["<error>Failed to perform search.</error>"]
+        return [r["url"] for r in results] or ["<error>No results found.</error>"]
 
 # --- MCP Server Setup ---
 mcp = FastMCP(
@@ -143,9 +125,26 @@ mcp = FastMCP(
 
 # --- Tool: validate (required by Puch) ---
 @mcp.tool
+@instrumented
 async def validate() -> str:
     return MY_NUMBER
 
+# --- Metrics: Prometheus text on GET /metrics (bearer-protected) and as an MCP tool ---
+@mcp.custom_route("/metrics", methods=["GET"])
+async def metrics_endpoint(request: Request) -> PlainTextResponse:
+    if request.headers.get("authorization") != f"Bearer {TOKEN}":
+        return PlainTextResponse("unauthorized", status_code=401)
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+MetricsDescription = RichToolDescription(
+    description="Report per-tool latency, error, payload size and cache metrics in Prometheus text format",
+    use_when="An operator wants to inspect server performance.",
+)
+
+@mcp.tool(description=MetricsDescription.model_dump_json())
+async def server_metrics() -> str:
+    return metrics.render()
+
 # --- Tool: job_finder (now smart!) ---
 # Helper to convert any tool result dict (and optional image) to MCP contents
 
@@ -170,6 +169,67 @@ def _to_contents(tool_name: str, result: dict) -> list[TextContent | ImageConten
         return result  # type: ignore[return-value]
     return [TextContent(type="text", text=str(result))]
 
+def _stream_progress(ctx: Context):
+    """Forward streamed LLM text to the client as MCP progress notifications (throttled)."""
+    text = ""
+    last_sent = 0.0
+
+    async def on_partial(delta: str) -> None:
+        nonlocal text, last_sent
+        text += delta
+        now = time.monotonic()
+        if now - last_sent >= STREAM_PROGRESS_INTERVAL:
+            last_sent = now
+            await ctx.report_progress(progress=len(text), message=text)
+
+    return on_partial
+
+# --- Lazy tool loading: schemas are declared below, tool modules load on first call ---
+TOOL_CLASSES = {
+    "best_date_idea": ("tools.best_date_idea", "BestDateIdea"),
+    "best_restaurants_near_me": ("tools.best_restaurants_near_me", "BestRestaurantsNearMe"),
+    "date_analyzer": ("tools.date_analyzer", "DateAnalyzer"),
+    "date_meme_generator": ("tools.date_meme_generator", "DateMemeGenerator"),
+    "dm_risk_meter": ("tools.dm_risk_meter", "DMRiskMeter"),
+    "outfit_rater": ("tools.outfit_rater", "OutfitRater"),
+    "rate_my_date": ("tools.rate_my_date", "RateMyDate"),
+    "safety_tools": ("tools.safety_tools", "SafetyTools"),
+    "text_vibe_checker": ("tools.text_vibe_checker", "TextVibeChecker"),
+    "trendy_date_spotter": ("tools.trendy_date_spotter", "TrendyDateSpotter"),
+}
+
+# Concurrent identical calls to the upstream-heavy tools share one run()
+_flights = SingleFlight()
+
+def _coalesced(name: str, inputs: dict, run):
+    return _flights.do(name, (name, json.dumps(inputs, sort_keys=True)), lambda: run(inputs))
+
+def _tool_class(name: str):
+    module, cls = TOOL_CLASSES[name]
+    return getattr(importlib.import_module(module), cls)
+
+def _import_all_tools():
+    for name in TOOL_CLASSES:
+        _tool_class(name)
+    import markdownify, readabilipy  # noqa: F401  (used by Fetch)
+    get_fetch_engine().warm()
+
+async def _warm_tools():
+    """Import tool modules off the event loop once the server is accepting connections."""
+    await asyncio.sleep(MCP_WARM_DELAY)
+    try:
+        await asyncio.to_thread(_import_all_tools)
+    except Exception as e:
+        print(f"⚠️ Tool warm-up failed: {e!r}")
+    if DATE_IDEA_SEED_CITIES and GROQ_API_KEY:
+        await _seed_date_ideas()
+
+async def _seed_date_ideas():
+    from tools.date_idea_catalog import idea_catalog
+
+    tool = _tool_class("best_date_idea")(api_key=GROQ_API_KEY)
+    await idea_catalog.keep_seeded(DATE_IDEA_SEED_CITIES, DATE_IDEA_SEED_WEATHER, tool._llm_batch)
+
 # --- Tool wrappers for tools/ classes ---
 
 # Best Date Idea
@@ -179,15 +239,17 @@ BestDateIdeaDescription = RichToolDescription(
 )
 
 @mcp.tool(description=BestDateIdeaDescription.model_dump_json())
+@instrumented
 async def best_date_idea(
     location: Annotated[str, Field(description="Location for date idea", default="unknown city")],
     weather: Annotated[str, Field(description="Current weather", default="unknown weather")] = "unknown weather",
     budget: Annotated[str, Field(description="Budget level (low, medium, high)", default="flexible")] = "flexible",
+    puch_user_id: Annotated[str | None, Field(description="Puch User Unique Identifier; avoids repeating ideas for this user")] = None,
 ) -> list[TextContent | ImageContent]:
     if not GROQ_API_KEY:
         raise McpError(ErrorData(code=INTERNAL_ERROR, message="Missing GROQ_API_KEY"))
-    tool = BestDateIdea(api_key=GROQ_API_KEY)
-    result = await tool.run({"location": location, "weather": weather, "budget": budget})
+    tool = _tool_class("best_date_idea")(api_key=GROQ_API_KEY)
+    result = await tool.run({"location": location, "weather": weather, "budget": budget, "puch_user_id": puch_user_id})
     return _to_contents("best_date_idea", result)
 
 # Best Restaurants Near Me
@@ -197,15 +259,17 @@ BestRestaurantsDescription = RichToolDescription(
 )
 
 @mcp.tool(description=BestRestaurantsDescription.model_dump_json())
+@instrumented
 async def best_restaurants_near_me(
     location: Annotated[str, Field(min_length=1, description="Location (e.g., 'New York, NY' or '40.7128,-74.0060')")],
+    ctx: Context,
 ) -> list[TextContent | ImageContent]:
     if not GOOGLE_API_KEY:
         raise McpError(ErrorData(code=INTERNAL_ERROR, message="Missing GOOGLE_API_KEY"))
     if not GROQ_API_KEY:
         raise McpError(ErrorData(code=INTERNAL_ERROR, message="Missing GROQ_API_KEY"))
-    tool = BestRestaurantsNearMe(google_api_key=GOOGLE_API_KEY, groq_api_key=GROQ_API_KEY)
-    result = await tool.run({"location": location})
+    tool = _tool_class("best_restaurants_near_me")(google_api_key=GOOGLE_API_KEY, groq_api_key=GROQ_API_KEY)
+    result = await tool.run({"location": location}, on_partial=_stream_progress(ctx))
     return _to_contents("best_restaurants_near_me", result)
 
 # Date Analyzer
@@ -215,15 +279,33 @@ DateAnalyzerDescription = RichToolDescription(
 )
 
 @mcp.tool(description=DateAnalyzerDescription.model_dump_json())
+@instrumented
 async def date_analyzer(
     conversation: Annotated[str, Field(min_length=1, max_length=1000, description="Conversation text to analyze for manipulation")],
 ) -> list[TextContent | ImageContent]:
     if not GROQ_API_KEY:
         raise McpError(ErrorData(code=INTERNAL_ERROR, message="Missing GROQ_API_KEY"))
-    tool = DateAnalyzer(api_key=GROQ_API_KEY)
-    result = await tool.run({"conversation": conversation})
+    tool = _tool_class("date_analyzer")(api_key=GROQ_API_KEY)
+    result = await _coalesced("date_analyzer", {"conversation": conversation}, tool.run)
     return _to_contents("date_analyzer", result)
 
+# Date Analyzer (batch)
+DateAnalyzerBatchDescription = RichToolDescription(
+    description="Detect manipulation in many conversations at once, several per LLM call",
+    use_when="A moderator needs to screen a whole set of chats for manipulation.",
+)
+
+@mcp.tool(description=DateAnalyzerBatchDescription.model_dump_json())
+@instrumented
+async def date_analyzer_batch(
+    conversations: Annotated[list[str], Field(min_length=1, max_length=200, description="Conversation texts to analyze (max 1000 chars each)")],
+) -> list[TextContent | ImageContent]:
+    if not GROQ_API_KEY:
+        raise McpError(ErrorData(code=INTERNAL_ERROR, message="Missing GROQ_API_KEY"))
+    tool = _tool_class("date_analyzer")(api_key=GROQ_API_KEY)
+    result = await tool.run_batch({"conversations": conversations})
+    return _to_contents("date_analyzer_batch", result)
+
 # Date Meme Generator
 DateMemeGeneratorDescription = RichToolDescription(
     description="Generate a meme based on a date or conversation with an LLM-caption",
@@ -231,13 +313,14 @@ DateMemeGeneratorDescription = RichToolDescription(
 )
 
 @mcp.tool(description=DateMemeGeneratorDescription.model_dump_json())
+@instrumented
 async def date_meme_generator(
     text: Annotated[str, Field(min_length=1, max_length=500, description="Text or conversation to base meme on")],
     vibe: Annotated[str, Field(description="Desired meme vibe (e.g., funny, romantic)", default="funny")] = "funny",
 ) -> list[TextContent | ImageContent]:
     if not GROQ_API_KEY:
         raise McpError(ErrorData(code=INTERNAL_ERROR, message="Missing GROQ_API_KEY"))
-    tool = DateMemeGenerator(api_key=GROQ_API_KEY)
+    tool = _tool_class("date_meme_generator")(api_key=GROQ_API_KEY)
     result = await tool.run({"text": text, "vibe": vibe})
     return _to_contents("date_meme_generator", result)
 
@@ -248,16 +331,34 @@ DMRiskMeterDescription = RichToolDescription(
 )
 
 @mcp.tool(description=DMRiskMeterDescription.model_dump_json())
+@instrumented
 async def dm_risk_meter(
     dm_text: Annotated[str, Field(min_length=1, max_length=500, description="DM text to analyze")],
     raw: Annotated[bool, Field(description="Return raw analysis if True", default=False)] = False,
 ) -> list[TextContent | ImageContent]:
     if not GROQ_API_KEY:
         raise McpError(ErrorData(code=INTERNAL_ERROR, message="Missing GROQ_API_KEY"))
-    tool = DMRiskMeter(api_key=GROQ_API_KEY)
-    result = await tool.run({"dm_text": dm_text, "raw": raw})
+    tool = _tool_class("dm_risk_meter")(api_key=GROQ_API_KEY)
+    result = await _coalesced("dm_risk_meter", {"dm_text": dm_text, "raw": raw}, tool.run)
     return _to_contents("dm_risk_meter", result)
 
+# DM Risk Meter (batch)
+DMRiskMeterBatchDescription = RichToolDescription(
+    description="Rate a whole inbox of DMs for creepiness or risk, several per LLM call",
+    use_when="A moderator needs risk levels for many DMs at once.",
+)
+
+@mcp.tool(description=DMRiskMeterBatchDescription.model_dump_json())
+@instrumented
+async def dm_risk_meter_batch(
+    dm_texts: Annotated[list[str], Field(min_length=1, max_length=300, description="DM texts to analyze (max 500 chars each)")],
+) -> list[TextContent | ImageContent]:
+    if not GROQ_API_KEY:
+        raise McpError(ErrorData(code=INTERNAL_ERROR, message="Missing GROQ_API_KEY"))
+    tool = _tool_class("dm_risk_meter")(api_key=GROQ_API_KEY)
+    result = await tool.run_batch({"dm_texts": dm_texts})
+    return _to_contents("dm_risk_meter_batch", result)
+
 # Outfit Rater
 OutfitRaterDescription = RichToolDescription(
     description="Rate and review outfits with fashion tips and optional image support",
@@ -265,19 +366,21 @@ OutfitRaterDescription = RichToolDescription(
 )
 
 @mcp.tool(description=OutfitRaterDescription.model_dump_json())
+@instrumented
 async def outfit_rater(
+    ctx: Context,
     outfit_description: Annotated[str, Field(description="Text description of the outfit", default="")] = "",
     puch_image_data: Annotated[str, Field(description="Base64-encoded image data of the outfit", default="")] = "",
     roast_mode: Annotated[bool, Field(description="Enable roast mode for playful feedback", default=False)] = False,
 ) -> list[TextContent | ImageContent]:
     if not GROQ_API_KEY:
         raise McpError(ErrorData(code=INTERNAL_ERROR, message="Missing GROQ_API_KEY"))
-    tool = OutfitRater(api_key=GROQ_API_KEY)
+    tool = _tool_class("outfit_rater")(api_key=GROQ_API_KEY)
     result = await tool.run({
         "outfit_description": outfit_description,
         "puch_image_data": puch_image_data,
         "roast_mode": roast_mode,
-    })
+    }, on_partial=_stream_progress(ctx))
     return _to_contents("outfit_rater", result)
 
 # Rate My Date
@@ -287,13 +390,15 @@ RateMyDateDescription = RichToolDescription(
 )
 
 @mcp.tool(description=RateMyDateDescription.model_dump_json())
+@instrumented
 async def rate_my_date(
     date_text: Annotated[str, Field(min_length=1, max_length=1000, description="Description of the date experience")],
+    ctx: Context,
 ) -> list[TextContent | ImageContent]:
     if not GROQ_API_KEY:
         raise McpError(ErrorData(code=INTERNAL_ERROR, message="Missing GROQ_API_KEY"))
-    tool = RateMyDate(api_key=GROQ_API_KEY)
-    result = await tool.run({"date_text": date_text})
+    tool = _tool_class("rate_my_date")(api_key=GROQ_API_KEY)
+    result = await tool.run({"date_text": date_text}, on_partial=_stream_progress(ctx))
     return _to_contents("rate_my_date", result)
 
 # Safety Tools
@@ -303,13 +408,14 @@ SafetyToolsDescription = RichToolDescription(
 )
 
 @mcp.tool(description=SafetyToolsDescription.model_dump_json())
+@instrumented
 async def safety_tools(
     latitude: Annotated[float, Field(description="User's latitude")],
     longitude: Annotated[float, Field(description="User's longitude")],
 ) -> list[TextContent | ImageContent]:
     if not GOOGLE_API_KEY:
         raise McpError(ErrorData(code=INTERNAL_ERROR, message="Missing GOOGLE_API_KEY"))
-    tool = SafetyTools(google_api_key=GOOGLE_API_KEY)
+    tool = _tool_class("safety_tools")(google_api_key=GOOGLE_API_KEY)
     result = await tool.run({"latitude": latitude, "longitude": longitude})
     return _to_contents("safety_tools", result)
 
@@ -320,6 +426,7 @@ TextVibeCheckerDescription = RichToolDescription(
 )
 
 @mcp.tool(description=TextVibeCheckerDescription.model_dump_json())
+@instrumented
 async def text_vibe_checker(
     messages: Annotated[str, Field(min_length=1, max_length=1000, description="Conversation text to analyze")],
     raw: Annotated[bool, Field(description="Return raw analysis if True", default=False)] = False,
@@ -328,7 +435,7 @@ async def text_vibe_checker(
         raise McpError(ErrorData(code=INTERNAL_ERROR, message="Missing GROQ_API_KEY"))
     if not GIPHY_API_KEY:
         raise McpError(ErrorData(code=INTERNAL_ERROR, message="Missing GIPHY_API_KEY"))
-    tool = TextVibeChecker(api_key=GROQ_API_KEY, giphy_api_key=GIPHY_API_KEY)
+    tool = _tool_class("text_vibe_checker")(api_key=GROQ_API_KEY, giphy_api_key=GIPHY_API_KEY)
     result = await tool.run({"messages": messages, "raw": raw})
     return _to_contents("text_vibe_checker", result)
 
@@ -339,6 +446,7 @@ TrendyDateSpotterDescription = RichToolDescription(
 )
 
 @mcp.tool(description=TrendyDateSpotterDescription.model_dump_json())
+@instrumented
 async def trendy_date_spotter(
     location: Annotated[str, Field(min_length=2, max_length=80, description="City or area (e.g. 'Austin, TX')")],
     theme: Annotated[str | None, Field(description="Optional theme: rooftop, cozy, arcade, speakeasy, etc.", default=None)] = None,
@@ -346,14 +454,108 @@ async def trendy_date_spotter(
 ) -> list[TextContent | ImageContent]:
     if not TAVILY_API_KEY:
         raise McpError(ErrorData(code=INTERNAL_ERROR, message="Missing TAVILY_API_KEY"))
-    tool = TrendyDateSpotter(tavily_api_key=TAVILY_API_KEY)
-    result = await tool.run({"location": location, "theme": theme, "max_results": max_results})
+    tool = _tool_class("trendy_date_spotter")(tavily_api_key=TAVILY_API_KEY)
+    result = await _coalesced("trendy_date_spotter", {"location": location, "theme": theme, "max_results": max_results}, tool.run)
     return _to_contents("trendy_date_spotter", result)
 
+# Search and Read
+SearchAndReadDescription = RichToolDescription(
+    description="Web search that also fetches and simplifies the top results to Markdown, in parallel",
+    use_when="You need the actual content of a few web pages about a query, not just links.",
+    side_effects="Each page is sent as a progress notification as soon as it has been read.",
+)
+
+@mcp.tool(description=SearchAndReadDescription.model_dump_json())
+@instrumented
+async def search_and_read(
+    query: Annotated[str, Field(min_length=2, max_length=200, description="Search query")],
+    ctx: Context,
+    num_results: Annotated[int, Field(ge=1, le=10, description="How many results to read")] = 5,
+) -> list[TextContent | ImageContent]:
+    done = 0
+
+    async def on_result(item: dict) -> None:
+        nonlocal done
+        done += 1
+        await ctx.report_progress(progress=done, total=num_results, message=json.dumps(item, ensure_ascii=False))
+
+    result = await run_search_and_read(query, Fetch.USER_AGENT, num_results, on_result=on_result)
+    return _to_contents("search_and_read", result)
+
 # --- Run MCP Server ---
 async def main():
-    print("🚀 Starting MCP server on http://0.0.0.0:8086")
-    await mcp.run_async("streamable-http", host="0.0.0.0", port=8086)
+    print(f"🚀 Starting MCP server on http://{HOST}:{PORT}")
+    warm = asyncio.create_task(_warm_tools()) if MCP_WARM_TOOLS else None  # noqa: F841  (keep a reference)
+    try:
+        await mcp.run_async("streamable-http", host=HOST, port=PORT)
+    finally:
+        # Drain the pooled upstream connections shared by all tools
+        await clients.aclose()
+        get_fetch_engine().close()
+
+async def _serve_worker(sock: socket.socket):
+    import uvicorn
+
+    # Each worker has its own registry and a scrape reaches whichever worker accepts it
+    metrics.const_labels = (("worker", str(os.getpid())),)
+    # Stateless HTTP: consecutive requests of one client may land on different workers
+    app = mcp.http_app(transport="streamable-http", stateless_http=True)
+    server = uvicorn.Server(uvicorn.Config(app, lifespan="on", timeout_graceful_shutdown=0))
+    warm = asyncio.create_task(_warm_tools()) if MCP_WARM_TOOLS else None  # noqa: F841  (keep a reference)
+    try:
+        await server.serve(sockets=[sock])
+    finally:
+        await clients.aclose()
+        get_fetch_engine().close()
+
+def run_workers(workers: int):
+    """Pre-fork supervisor: bind the port once, fork workers that share the socket, restart any that die."""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((HOST, PORT))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    print(f"🚀 Starting MCP server on http://{HOST}:{PORT} with {workers} workers")
+    from tools.rate_limiter import GROQ_RPM, GROQ_TPM
+    print(f"ℹ️ Groq budget split across workers: {GROQ_RPM / workers:g} RPM and {GROQ_TPM / workers:g} TPM per model each")
+
+    children: set[int] = set()
+    stopping = False
+
+    def spawn():
+        pid = os.fork()
+        if pid == 0:
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            try:
+                asyncio.run(_serve_worker(sock))
+            finally:
+                os._exit(0)
+        children.add(pid)
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in children:
+            os.kill(pid, signal.SIGTERM)
+
+    for _ in range(workers):
+        spawn()
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    while children:
+        try:
+            pid, _ = os.wait()
+        except ChildProcessError:
+            break
+        children.discard(pid)
+        if not stopping:
+            print(f"⚠️ Worker {pid} exited, restarting")
+            spawn()
+    sock.close()
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    if MCP_WORKERS > 1:
+        run_workers(MCP_WORKERS)
+    else:
+        asyncio.run(main())
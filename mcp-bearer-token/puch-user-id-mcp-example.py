@@ -3,8 +3,9 @@
 
 import asyncio
 from typing import Annotated, Optional, Literal
-import os, uuid, json
-from datetime import datetime
+import os, uuid, json, base64, time
+from collections import deque
+from datetime import datetime, timezone
 from dotenv import load_dotenv
 
 from fastmcp import FastMCP
@@ -13,6 +14,8 @@ from mcp.server.auth.provider import AccessToken
 from mcp import ErrorData, McpError
 from mcp.types import TextContent, INVALID_PARAMS, INTERNAL_ERROR
 from pydantic import Field, BaseModel  # <-- add BaseModel
+from task_store import open_task_store, sort_key
+from task_scheduler import DueScheduler, due_timestamp
 
 # --- Env ---
 load_dotenv()
@@ -44,26 +47,116 @@ mcp = FastMCP(
     auth=SimpleBearerAuthProvider(TOKEN),
 )
 
-# since its a starter, we can use an in memory dict as a db
-TASKS: dict[str, dict[str, dict]] = {}
+# TASK_STORE=sqlite (default, persists to TASK_DB_PATH) or memory
+STORE = open_task_store()
+
+# Page size bounds for list_tasks and item limits for the bulk tools
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+MAX_BULK_ITEMS = 500
+
+# Reminders fire this many minutes before due_at; REMINDER_WEBHOOK_URL (optional)
+# receives each one as a JSON POST, otherwise they wait for upcoming_tasks
+REMINDER_LEAD_MINUTES = float(os.environ.get("REMINDER_LEAD_MINUTES", "15"))
+# After a restart, reminders that should have fired longer ago than this are dropped
+REMINDER_MAX_OVERDUE_MINUTES = float(os.environ.get("REMINDER_MAX_OVERDUE_MINUTES", "60"))
+REMINDER_WEBHOOK_URL = os.environ.get("REMINDER_WEBHOOK_URL")
+MAX_PENDING_REMINDERS = 50
+
+SCHEDULER = DueScheduler(lead=REMINDER_LEAD_MINUTES * 60, stale_after=REMINDER_MAX_OVERDUE_MINUTES * 60)
+REMINDERS: dict[str, deque] = {}
 
 
 def _now() -> str:
     return datetime.utcnow().isoformat()
 
 
-def _user_tasks(puch_user_id: str) -> dict[str, dict]:
+def _require_user(puch_user_id: str) -> str:
     if not puch_user_id:
         raise McpError(
             ErrorData(code=INVALID_PARAMS, message="puch_user_id is required")
         )
-    return TASKS.setdefault(puch_user_id, {})
+    return puch_user_id
 
 
 def _error(code, msg):
     raise McpError(ErrorData(code=code, message=msg))
 
 
+# due_at is stored as UTC ISO 8601 so that the store's string order is time
+# order (upcoming_tasks stops at the first task past its window)
+def _utc_due_at(due_at: Optional[str]) -> Optional[str]:
+    if not due_at:
+        return None
+    try:
+        due = datetime.fromisoformat(due_at.strip())
+    except ValueError:
+        _error(INVALID_PARAMS, f"due_at is not an ISO 8601 datetime: {due_at}")
+    if due.tzinfo is None:
+        due = due.replace(tzinfo=timezone.utc)  # naive times are UTC, like created_at
+    return due.astimezone(timezone.utc).isoformat()
+
+
+def _new_task(
+    title: str,
+    due_at: Optional[str] = None,
+    priority: Optional[str] = "normal",
+    tags: Optional[list[str]] = None,
+    notes: Optional[str] = None,
+) -> dict:
+    if not title or not title.strip():
+        _error(INVALID_PARAMS, "title cannot be empty")
+    due_at = _utc_due_at(due_at)
+    now = _now()
+    return {
+        "id": str(uuid.uuid4()),
+        "title": title.strip(),
+        "status": "open",
+        "due_at": due_at,
+        "priority": priority or "normal",
+        "tags": tags or [],
+        "notes": notes,
+        "created_at": now,
+        "updated_at": now,
+    }
+
+
+# Cursors are the opaque sort key of the last task on a page (keyset pagination)
+def _encode_cursor(task: dict) -> str:
+    return base64.urlsafe_b64encode(json.dumps(sort_key(task)).encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> tuple[str, str, str]:
+    try:
+        due, created, tid = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return (str(due), str(created), str(tid))
+    except Exception:
+        _error(INVALID_PARAMS, "Invalid cursor")
+
+
+async def _fire_reminder(user_id: str, task_id: str, due: float) -> None:
+    task = STORE.get(user_id, task_id)
+    if not task or task["status"] != "open":
+        return
+    reminder = {"task": task, "due_in_minutes": round((due - time.time()) / 60, 1)}
+    REMINDERS.setdefault(user_id, deque(maxlen=MAX_PENDING_REMINDERS)).append(reminder)
+    if REMINDER_WEBHOOK_URL:
+        import httpx
+
+        async with httpx.AsyncClient(timeout=10) as client:
+            await client.post(
+                REMINDER_WEBHOOK_URL, json={"puch_user_id": user_id, **reminder}
+            )
+
+
+class NewTask(BaseModel):
+    title: str = Field(description="Task title")
+    due_at: Optional[str] = Field(default=None, description="ISO 8601 datetime")
+    priority: Optional[Literal["low", "normal", "high"]] = Field(default="normal", description="Priority")
+    tags: Optional[list[str]] = Field(default=None, description="List of tags")
+    notes: Optional[str] = Field(default=None, description="Notes")
+
+
 # --- Rich Tool Description model ---
 class RichToolDescription(BaseModel):
     description: str
@@ -85,9 +178,9 @@ ADD_TASK_DESCRIPTION = RichToolDescription(
 )
 
 LIST_TASKS_DESCRIPTION = RichToolDescription(
-    description="List a user's tasks with optional filters (status, tag, search).",
-    use_when="The user asks to view tasks, possibly filtered by completion status, tag, or a search term.",
-    side_effects="Reads tasks from memory and returns them sorted by due_at then created_at.",
+    description="List a user's tasks with optional filters (status, tag, search), one page at a time.",
+    use_when="The user asks to view tasks, possibly filtered by completion status, tag, or a search term. Pass next_cursor back as cursor to get the following page.",
+    side_effects="Reads tasks from the task store, sorted by due_at then created_at.",
 )
 
 GET_TASK_DESCRIPTION = RichToolDescription(
@@ -108,6 +201,30 @@ REMOVE_TASK_DESCRIPTION = RichToolDescription(
     side_effects="Permanently removes the task from storage.",
 )
 
+ADD_TASKS_DESCRIPTION = RichToolDescription(
+    description="Create many tasks for a user in one call, with a result per item.",
+    use_when="Importing or syncing a whole to-do list instead of calling add_task repeatedly.",
+    side_effects="Adds every valid task; invalid items are reported and skipped.",
+)
+
+COMPLETE_TASKS_DESCRIPTION = RichToolDescription(
+    description="Mark many of a user's tasks as completed in one call, with a result per ID.",
+    use_when="Several tasks are done at once, e.g. when syncing completion state.",
+    side_effects="Updates status and timestamp of every task found; unknown IDs are reported.",
+)
+
+REMOVE_TASKS_DESCRIPTION = RichToolDescription(
+    description="Delete many of a user's tasks in one call, with a result per ID.",
+    use_when="The user wants to clear out several tasks at once.",
+    side_effects="Permanently removes every task found; unknown IDs are reported.",
+)
+
+UPCOMING_TASKS_DESCRIPTION = RichToolDescription(
+    description="Open tasks due soon (or overdue) for a user, plus any reminders that fired since the last check.",
+    use_when="The user asks what is coming up, what is due today, or whether they have missed anything.",
+    side_effects="Clears the user's pending reminders once they are returned.",
+)
+
 
 # --- Tools ---
 @mcp.tool(description=ADD_TASK_DESCRIPTION.model_dump_json())
@@ -122,23 +239,10 @@ async def add_task(
     notes: Annotated[Optional[str], Field(description="Notes")] = None,
 ) -> list[TextContent]:
     try:
-        if not title or not title.strip():
-            _error(INVALID_PARAMS, "title cannot be empty")
-        user_tasks = _user_tasks(puch_user_id)
-        tid = str(uuid.uuid4())
-        now = _now()
-        task = {
-            "id": tid,
-            "title": title.strip(),
-            "status": "open",
-            "due_at": due_at,
-            "priority": priority or "normal",
-            "tags": tags or [],
-            "notes": notes,
-            "created_at": now,
-            "updated_at": now,
-        }
-        user_tasks[tid] = task
+        task = _new_task(title, due_at, priority, tags, notes)
+        user_id = _require_user(puch_user_id)
+        STORE.add(user_id, task)
+        SCHEDULER.schedule(user_id, task)
         return [TextContent(type="text", text=json.dumps(task))]
     except McpError:
         raise
@@ -156,25 +260,33 @@ async def list_tasks(
     search: Annotated[
         Optional[str], Field(description="Substring in title/notes")
     ] = None,
+    limit: Annotated[
+        int, Field(ge=1, le=MAX_PAGE_SIZE, description="Page size")
+    ] = DEFAULT_PAGE_SIZE,
+    cursor: Annotated[
+        Optional[str], Field(description="next_cursor from the previous page")
+    ] = None,
 ) -> list[TextContent]:
     try:
-        tasks = list(_user_tasks(puch_user_id).values())
-        if status:
-            tasks = [t for t in tasks if t["status"] == status]
-        if tag:
-            tasks = [t for t in tasks if tag in (t.get("tags") or [])]
-        if search:
-            q = search.lower()
-            tasks = [
-                t
-                for t in tasks
-                if q in t["title"].lower()
-                or (t.get("notes") or "").lower().find(q) != -1
-            ]
-        tasks.sort(
-            key=lambda t: (t.get("due_at") or "9999", t["created_at"])
-        )  # simple sort
-        return [TextContent(type="text", text=json.dumps(tasks))]
+        after = _decode_cursor(cursor) if cursor else None
+        # One extra row tells us whether another page exists
+        tasks = STORE.list(
+            _require_user(puch_user_id),
+            status=status,
+            tag=tag,
+            search=search,
+            limit=limit + 1,
+            after=after,
+        )
+        page = tasks[:limit]
+        next_cursor = _encode_cursor(page[-1]) if len(tasks) > limit else None
+        return [
+            TextContent(
+                type="text", text=json.dumps({"tasks": page, "next_cursor": next_cursor})
+            )
+        ]
+    except McpError:
+        raise
     except Exception as e:
         _error(INTERNAL_ERROR, str(e))
 
@@ -185,7 +297,7 @@ async def get_task(
     task_id: Annotated[str, Field(description="Task ID")],
 ) -> list[TextContent]:
     try:
-        t = _user_tasks(puch_user_id).get(task_id)
+        t = STORE.get(_require_user(puch_user_id), task_id)
         if not t:
             _error(INVALID_PARAMS, f"No task {task_id} for user")
         return [TextContent(type="text", text=json.dumps(t))]
@@ -201,12 +313,11 @@ async def complete_task(
     task_id: Annotated[str, Field(description="Task ID")],
 ) -> list[TextContent]:
     try:
-        user_tasks = _user_tasks(puch_user_id)
-        t = user_tasks.get(task_id)
+        user_id = _require_user(puch_user_id)
+        t = STORE.update(user_id, task_id, status="completed", updated_at=_now())
         if not t:
             _error(INVALID_PARAMS, f"No task {task_id} for user")
-        t["status"] = "completed"
-        t["updated_at"] = _now()
+        SCHEDULER.cancel(user_id, task_id)
         return [TextContent(type="text", text=json.dumps(t))]
     except McpError:
         raise
@@ -220,10 +331,10 @@ async def remove_task(
     task_id: Annotated[str, Field(description="Task ID")],
 ) -> list[TextContent]:
     try:
-        user_tasks = _user_tasks(puch_user_id)
-        if task_id not in user_tasks:
+        user_id = _require_user(puch_user_id)
+        if not STORE.remove(user_id, task_id):
             _error(INVALID_PARAMS, f"No task {task_id} for user")
-        del user_tasks[task_id]
+        SCHEDULER.cancel(user_id, task_id)
         return [TextContent(type="text", text=json.dumps({"removed": task_id}))]
     except McpError:
         raise
@@ -231,10 +342,143 @@ async def remove_task(
         _error(INTERNAL_ERROR, str(e))
 
 
+@mcp.tool(description=ADD_TASKS_DESCRIPTION.model_dump_json())
+async def add_tasks(
+    puch_user_id: Annotated[str, Field(description="Puch User Unique Identifier")],
+    tasks: Annotated[
+        list[NewTask],
+        Field(min_length=1, max_length=MAX_BULK_ITEMS, description="Tasks to create"),
+    ],
+) -> list[TextContent]:
+    try:
+        user_id = _require_user(puch_user_id)
+        results, created = [], []
+        for index, spec in enumerate(tasks):
+            try:
+                task = _new_task(spec.title, spec.due_at, spec.priority, spec.tags, spec.notes)
+            except McpError as e:
+                results.append({"index": index, "ok": False, "error": e.error.message})
+                continue
+            created.append(task)
+            results.append({"index": index, "ok": True, "task": task})
+        STORE.add_many(user_id, created)
+        for task in created:
+            SCHEDULER.schedule(user_id, task)
+        return [TextContent(type="text", text=json.dumps({"results": results, "added": len(created)}))]
+    except McpError:
+        raise
+    except Exception as e:
+        _error(INTERNAL_ERROR, str(e))
+
+
+@mcp.tool(description=COMPLETE_TASKS_DESCRIPTION.model_dump_json())
+async def complete_tasks(
+    puch_user_id: Annotated[str, Field(description="Puch User Unique Identifier")],
+    task_ids: Annotated[
+        list[str],
+        Field(min_length=1, max_length=MAX_BULK_ITEMS, description="Task IDs"),
+    ],
+) -> list[TextContent]:
+    try:
+        user_id = _require_user(puch_user_id)
+        updated = STORE.update_many(
+            user_id, task_ids, status="completed", updated_at=_now()
+        )
+        for tid in updated:
+            SCHEDULER.cancel(user_id, tid)
+        results = [
+            {"id": tid, "ok": True, "task": t} if t else {"id": tid, "ok": False, "error": "not found"}
+            for tid, t in updated.items()
+        ]
+        return [TextContent(type="text", text=json.dumps({"results": results}))]
+    except McpError:
+        raise
+    except Exception as e:
+        _error(INTERNAL_ERROR, str(e))
+
+
+@mcp.tool(description=REMOVE_TASKS_DESCRIPTION.model_dump_json())
+async def remove_tasks(
+    puch_user_id: Annotated[str, Field(description="Puch User Unique Identifier")],
+    task_ids: Annotated[
+        list[str],
+        Field(min_length=1, max_length=MAX_BULK_ITEMS, description="Task IDs"),
+    ],
+) -> list[TextContent]:
+    try:
+        user_id = _require_user(puch_user_id)
+        removed = STORE.remove_many(user_id, task_ids)
+        for tid in removed:
+            SCHEDULER.cancel(user_id, tid)
+        results = [
+            {"id": tid, "ok": ok} if ok else {"id": tid, "ok": False, "error": "not found"}
+            for tid, ok in removed.items()
+        ]
+        return [TextContent(type="text", text=json.dumps({"results": results}))]
+    except McpError:
+        raise
+    except Exception as e:
+        _error(INTERNAL_ERROR, str(e))
+
+
+@mcp.tool(description=UPCOMING_TASKS_DESCRIPTION.model_dump_json())
+async def upcoming_tasks(
+    puch_user_id: Annotated[str, Field(description="Puch User Unique Identifier")],
+    within_minutes: Annotated[
+        int, Field(ge=1, le=60 * 24 * 30, description="Look-ahead window in minutes")
+    ] = 60 * 24,
+    limit: Annotated[
+        int, Field(ge=1, le=MAX_PAGE_SIZE, description="Maximum tasks to return")
+    ] = DEFAULT_PAGE_SIZE,
+) -> list[TextContent]:
+    try:
+        user_id = _require_user(puch_user_id)
+        horizon = time.time() + within_minutes * 60
+        due_soon = []
+        after = None
+        done = False
+        # Open tasks come back ordered by due_at with undated ones last, so stop at
+        # the first undated task or the first one past the window
+        while not done:
+            page = STORE.list(user_id, status="open", limit=limit, after=after)
+            done = len(page) < limit
+            for task in page:
+                due = due_timestamp(task)
+                if not task.get("due_at") or (due is not None and due > horizon):
+                    done = True
+                    break
+                if due is None:
+                    continue  # unparseable due_at: later tasks may still be due
+                due_soon.append(task)
+                if len(due_soon) >= limit:
+                    done = True
+                    break
+            if page:
+                after = sort_key(page[-1])
+        pending = REMINDERS.pop(user_id, None) or []
+        return [
+            TextContent(
+                type="text",
+                text=json.dumps({"tasks": due_soon, "reminders": list(pending)}),
+            )
+        ]
+    except McpError:
+        raise
+    except Exception as e:
+        _error(INTERNAL_ERROR, str(e))
+
+
 # --- Run MCP Server ---
 async def main():
-    print("🧭 Starting Task MCP server on http://0.0.0.0:8086  (in-memory store)")
-    await mcp.run_async("streamable-http", host="0.0.0.0", port=8086)
+    print(f"🧭 Starting Task MCP server on http://0.0.0.0:8086  ({type(STORE).__name__})")
+    # Reminders live in memory only; rebuild them from the store after a restart
+    SCHEDULER.rebuild(STORE.due_tasks())
+    reminders = asyncio.create_task(SCHEDULER.run(_fire_reminder))
+    print(f"⏰ {len(SCHEDULER)} reminder(s) scheduled")
+    try:
+            await mcp.run_async("streamable-http", host="0.0.0.0", port=8086)
+    finally:
+        reminders.cancel()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,121 @@
+import asyncio
+import heapq
+import time
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+# (user_id, task_id, due timestamp)
+DueEvent = Tuple[str, str, float]
+DueCallback = Callable[[str, str, float], Awaitable[None]]
+
+
+def due_timestamp(task: Dict[str, Any]) -> Optional[float]:
+    """Epoch seconds of an open task's due_at; naive ISO times are taken as UTC like created_at."""
+    due_at = task.get("due_at")
+    if not due_at or task.get("status") != "open":
+        return None
+    try:
+        due = datetime.fromisoformat(due_at)
+    except ValueError:
+        return None
+    if due.tzinfo is None:
+        due = due.replace(tzinfo=timezone.utc)
+    return due.timestamp()
+
+
+class DueScheduler:
+    """Min-heap of task due times that fires each reminder once, `lead` seconds early.
+
+    Adding or rescheduling a task is one heappush. Completing or removing it
+    only drops its entry from `_live`, and the stale heap node is skipped when
+    it surfaces (lazy deletion). The heap is compacted once stale nodes
+    outnumber live ones. State is rebuilt from the task store on start-up, so a
+    restart only drops reminders whose fire time passed more than `stale_after`
+    seconds ago (None keeps them all); one that already fired may fire again.
+    """
+
+    def __init__(
+        self,
+        lead: float = 0.0,
+        clock: Callable[[], float] = time.time,
+        stale_after: Optional[float] = None,
+    ):
+        self.lead = lead
+        self.clock = clock
+        self.stale_after = stale_after
+        self._heap: List[Tuple[float, int, str, str]] = []
+        self._live: Dict[Tuple[str, str], Tuple[float, int]] = {}
+        self._seq = 0
+        self._changed: Optional[asyncio.Event] = None
+
+    def __len__(self) -> int:
+        return len(self._live)
+
+    def schedule(self, user_id: str, task: Dict[str, Any]) -> None:
+        due = due_timestamp(task)
+        if due is None:
+            self.cancel(user_id, task["id"])
+            return
+        self._seq += 1
+        self._live[(user_id, task["id"])] = (due, self._seq)
+        heapq.heappush(self._heap, (due, self._seq, user_id, task["id"]))
+        if self._heap[0][1] == self._seq and self._changed is not None:
+            self._changed.set()  # new earliest reminder: wake the loop
+
+    def cancel(self, user_id: str, task_id: str) -> None:
+        if self._live.pop((user_id, task_id), None) is not None and len(self._heap) > 2 * len(self._live) + 1024:
+            self._compact()
+
+    def _compact(self) -> None:
+        self._heap = [(due, seq, user, tid) for (user, tid), (due, seq) in self._live.items()]
+        heapq.heapify(self._heap)
+
+    def _prune(self) -> None:
+        while self._heap:
+            due, seq, user, tid = self._heap[0]
+            if self._live.get((user, tid)) == (due, seq):
+                return
+            heapq.heappop(self._heap)
+
+    def next_fire_at(self) -> Optional[float]:
+        self._prune()
+        return self._heap[0][0] - self.lead if self._heap else None
+
+    def pop_due(self, now: Optional[float] = None) -> List[DueEvent]:
+        now = self.clock() if now is None else now
+        events: List[DueEvent] = []
+        while True:
+            fire_at = self.next_fire_at()
+            if fire_at is None or fire_at > now:
+                return events
+            due, _, user, tid = heapq.heappop(self._heap)
+            del self._live[(user, tid)]
+            events.append((user, tid, due))
+
+    def rebuild(self, tasks: Iterable[Tuple[str, Dict[str, Any]]]) -> None:
+        """Replace the schedule with `tasks`, skipping reminders that are long overdue."""
+        self._live.clear()
+        oldest = None if self.stale_after is None else self.clock() - self.stale_after + self.lead
+        for user_id, task in tasks:
+            due = due_timestamp(task)
+            if due is not None and (oldest is None or due >= oldest):
+                self._seq += 1
+                self._live[(user_id, task["id"])] = (due, self._seq)
+        self._compact()
+
+    async def run(self, on_due: DueCallback, max_sleep: float = 60.0) -> None:
+        """Fire `on_due` for every reminder as its time comes; runs until cancelled."""
+        self._changed = asyncio.Event()
+        while True:
+            for event in self.pop_due():
+                try:
+                    await on_due(*event)
+                except Exception as e:
+                    print(f"⚠️ Reminder hook failed: {e!r}")
+            fire_at = self.next_fire_at()
+            delay = max_sleep if fire_at is None else min(max_sleep, max(0.0, fire_at - self.clock()))
+            self._changed.clear()
+            try:
+                await asyncio.wait_for(self._changed.wait(), delay)
+            except asyncio.TimeoutError:
+                pass
@@ -0,0 +1,319 @@
+import abc
+import bisect
+import json
+import os
+import sqlite3
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+NO_DUE_DATE = "9999"
+
+SortKey = Tuple[str, str, str]
+
+
+def sort_key(task: Dict[str, Any]) -> SortKey:
+    return (task.get("due_at") or NO_DUE_DATE, task["created_at"], task["id"])
+
+
+def matches_search(task: Dict[str, Any], search: Optional[str]) -> bool:
+    if not search:
+        return True
+    q = search.lower()
+    return q in task["title"].lower() or q in (task.get("notes") or "").lower()
+
+
+class TaskStore(abc.ABC):
+    """Interface shared by the backends; tasks are plain dicts as returned to clients.
+
+    Listings come back ordered by (due_at, created_at) with undated tasks last.
+    Both backends keep that order maintained on write, so listing never sorts
+    a user's whole task list.
+    """
+
+    @abc.abstractmethod
+    def add(self, user_id: str, task: Dict[str, Any]) -> Dict[str, Any]:
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def get(self, user_id: str, task_id: str) -> Optional[Dict[str, Any]]:
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def update(self, user_id: str, task_id: str, **fields: Any) -> Optional[Dict[str, Any]]:
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def remove(self, user_id: str, task_id: str) -> bool:
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def list(
+        self,
+        user_id: str,
+        status: Optional[str] = None,
+        tag: Optional[str] = None,
+        search: Optional[str] = None,
+        limit: Optional[int] = None,
+        after: Optional[SortKey] = None,
+    ) -> List[Dict[str, Any]]:
+        """Matching tasks in order, starting strictly after the `after` sort key."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def due_tasks(self) -> Iterable[Tuple[str, Dict[str, Any]]]:
+        """(user_id, task) for every open task with a due date, across all users."""
+        raise NotImplementedError
+
+    # Bulk variants; backends override these to apply a batch atomically
+    def add_many(self, user_id: str, tasks: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        return [self.add(user_id, task) for task in tasks]
+
+    def update_many(self, user_id: str, task_ids: List[str], **fields: Any) -> Dict[str, Optional[Dict[str, Any]]]:
+        return {task_id: self.update(user_id, task_id, **fields) for task_id in task_ids}
+
+    def remove_many(self, user_id: str, task_ids: List[str]) -> Dict[str, bool]:
+        return {task_id: self.remove(user_id, task_id) for task_id in task_ids}
+
+
+def _discard(keys: List[SortKey], key: SortKey) -> None:
+    i = bisect.bisect_left(keys, key)
+    if i < len(keys) and keys[i] == key:
+        del keys[i]
+
+
+def _discard_from(index: Dict[str, List[SortKey]], name: str, key: SortKey) -> None:
+    keys = index.get(name)
+    if keys is not None:
+        _discard(keys, key)
+        if not keys:
+            del index[name]
+
+
+class _UserTasks:
+    """One user's tasks plus sort-key lists kept in order: all tasks, per status, per tag."""
+
+    __slots__ = ("tasks", "order", "by_status", "by_tag")
+
+    def __init__(self):
+        self.tasks: Dict[str, Dict[str, Any]] = {}
+        self.order: List[SortKey] = []
+        self.by_status: Dict[str, List[SortKey]] = {}
+        self.by_tag: Dict[str, List[SortKey]] = {}
+
+    def index(self, task: Dict[str, Any]) -> None:
+        key = sort_key(task)
+        bisect.insort(self.order, key)
+        bisect.insort(self.by_status.setdefault(task["status"], []), key)
+        for tag in set(task.get("tags") or []):
+            bisect.insort(self.by_tag.setdefault(tag, []), key)
+
+    def unindex(self, task: Dict[str, Any]) -> None:
+        key = sort_key(task)
+        _discard(self.order, key)
+        _discard_from(self.by_status, task["status"], key)
+        for tag in set(task.get("tags") or []):
+            _discard_from(self.by_tag, tag, key)
+
+
+class MemoryTaskStore(TaskStore):
+    """Per-user dicts plus sorted (due_at, created_at, id) lists: all tasks, per status, per tag."""
+
+    def __init__(self):
+        self._users: Dict[str, _UserTasks] = {}
+
+    def _user(self, user_id: str) -> _UserTasks:
+        user = self._users.get(user_id)
+        if user is None:
+            user = self._users[user_id] = _UserTasks()
+        return user
+
+    def add(self, user_id: str, task: Dict[str, Any]) -> Dict[str, Any]:
+        user = self._user(user_id)
+        user.tasks[task["id"]] = task
+        user.index(task)
+        return task
+
+    def get(self, user_id: str, task_id: str) -> Optional[Dict[str, Any]]:
+        return self._user(user_id).tasks.get(task_id)
+
+    def update(self, user_id: str, task_id: str, **fields: Any) -> Optional[Dict[str, Any]]:
+        user = self._user(user_id)
+        task = user.tasks.get(task_id)
+        if task is None:
+            return None
+        user.unindex(task)
+        task.update(fields)
+        user.index(task)
+        return task
+
+    def remove(self, user_id: str, task_id: str) -> bool:
+        user = self._user(user_id)
+        task = user.tasks.pop(task_id, None)
+        if task is None:
+            return False
+        user.unindex(task)
+        return True
+
+    def list(self, user_id, status=None, tag=None, search=None, limit=None, after=None):
+        user = self._user(user_id)
+        # Seek into the narrowest ordered key list; only a tag+status query checks status per task
+        if tag is not None:
+            keys = user.by_tag.get(tag, [])
+        elif status:
+            keys = user.by_status.get(status, [])
+        else:
+            keys = user.order
+        check_status = status if tag is not None else None
+        start = bisect.bisect_right(keys, after) if after is not None else 0
+        results: List[Dict[str, Any]] = []
+        for i in range(start, len(keys)):
+            task = user.tasks[keys[i][2]]
+            if check_status and task["status"] != check_status:
+                continue
+            if not matches_search(task, search):
+                continue
+            results.append(task)
+            if limit is not None and len(results) >= limit:
+                break
+        return results
+
+    def due_tasks(self):
+        for user_id, user in list(self._users.items()):
+            for key in list(user.by_status.get("open", ())):
+                task = user.tasks[key[2]]
+                if task.get("due_at"):
+                    yield user_id, task
+
+
+class SQLiteTaskStore(TaskStore):
+    """Embedded SQLite store (WAL) with (user, status), (user, tag) and (user, due_at) indexes."""
+
+    def __init__(self, path: str):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS tasks (
+                user_id TEXT NOT NULL,
+                id TEXT NOT NULL,
+                status TEXT NOT NULL,
+                due_sort TEXT NOT NULL,
+                created_at TEXT NOT NULL,
+                data TEXT NOT NULL,
+                PRIMARY KEY (user_id, id)
+            );
+            CREATE TABLE IF NOT EXISTS task_tags (
+                user_id TEXT NOT NULL,
+                tag TEXT NOT NULL,
+                task_id TEXT NOT NULL,
+                PRIMARY KEY (user_id, tag, task_id)
+            );
+            CREATE INDEX IF NOT EXISTS tasks_user_due ON tasks (user_id, due_sort, created_at, id);
+            CREATE INDEX IF NOT EXISTS tasks_user_status_due ON tasks (user_id, status, due_sort, created_at, id);
+            CREATE INDEX IF NOT EXISTS task_tags_task ON task_tags (user_id, task_id);
+            """
+        )
+
+    def _write(self, user_id: str, task: Dict[str, Any]) -> None:
+        self._conn.execute(
+            "INSERT OR REPLACE INTO tasks (user_id, id, status, due_sort, created_at, data) VALUES (?, ?, ?, ?, ?, ?)",
+            (user_id, task["id"], task["status"], task.get("due_at") or NO_DUE_DATE, task["created_at"], json.dumps(task)),
+        )
+        self._conn.execute("DELETE FROM task_tags WHERE user_id = ? AND task_id = ?", (user_id, task["id"]))
+        self._conn.executemany(
+            "INSERT OR IGNORE INTO task_tags (user_id, tag, task_id) VALUES (?, ?, ?)",
+            [(user_id, tag, task["id"]) for tag in task.get("tags") or []],
+        )
+
+    def _transaction(self, fn, *args):
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                result = fn(*args)
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+            return result
+
+    def add(self, user_id: str, task: Dict[str, Any]) -> Dict[str, Any]:
+        self._transaction(self._write, user_id, task)
+        return task
+
+    def get(self, user_id: str, task_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute("SELECT data FROM tasks WHERE user_id = ? AND id = ?", (user_id, task_id)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def _update(self, user_id: str, task_id: str, fields: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        row = self._conn.execute("SELECT data FROM tasks WHERE user_id = ? AND id = ?", (user_id, task_id)).fetchone()
+        if row is None:
+            return None
+        task = json.loads(row[0])
+        task.update(fields)
+        self._write(user_id, task)
+        return task
+
+    def _remove(self, user_id: str, task_id: str) -> bool:
+        cur = self._conn.execute("DELETE FROM tasks WHERE user_id = ? AND id = ?", (user_id, task_id))
+        self._conn.execute("DELETE FROM task_tags WHERE user_id = ? AND task_id = ?", (user_id, task_id))
+        return cur.rowcount > 0
+
+    def update(self, user_id: str, task_id: str, **fields: Any) -> Optional[Dict[str, Any]]:
+        return self._transaction(self._update, user_id, task_id, fields)
+
+    def remove(self, user_id: str, task_id: str) -> bool:
+        return self._transaction(self._remove, user_id, task_id)
+
+    def add_many(self, user_id: str, tasks: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        self._transaction(lambda: [self._write(user_id, task) for task in tasks])
+        return tasks
+
+    def update_many(self, user_id: str, task_ids: List[str], **fields: Any) -> Dict[str, Optional[Dict[str, Any]]]:
+        return self._transaction(lambda: {task_id: self._update(user_id, task_id, fields) for task_id in task_ids})
+
+    def remove_many(self, user_id: str, task_ids: List[str]) -> Dict[str, bool]:
+        return self._transaction(lambda: {task_id: self._remove(user_id, task_id) for task_id in task_ids})
+
+    def list(self, user_id, status=None, tag=None, search=None, limit=None, after=None):
+        sql = "SELECT t.data FROM tasks t"
+        params: List[Any] = []
+        if tag is not None:
+            sql += " JOIN task_tags g ON g.user_id = t.user_id AND g.task_id = t.id AND g.tag = ?"
+            params.append(tag)
+        sql += " WHERE t.user_id = ?"
+        params.append(user_id)
+        if status:
+            sql += " AND t.status = ?"
+            params.append(status)
+        if after is not None:
+            sql += " AND (t.due_sort, t.created_at, t.id) > (?, ?, ?)"
+            params.extend(after)
+        sql += " ORDER BY t.due_sort, t.created_at, t.id"
+        results: List[Dict[str, Any]] = []
+        with self._lock:
+            for (data,) in self._conn.execute(sql, params):
+                task = json.loads(data)
+                if not matches_search(task, search):
+                    continue
+                results.append(task)
+                if limit is not None and len(results) >= limit:
+                    break
+        return results
+
+    def due_tasks(self):
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT user_id, data FROM tasks WHERE status = 'open' AND due_sort != ?", (NO_DUE_DATE,)
+            ).fetchall()
+        for user_id, data in rows:
+            yield user_id, json.loads(data)
+
+
+def open_task_store() -> TaskStore:
+    kind = os.environ.get("TASK_STORE", "sqlite").lower()
+    if kind == "memory":
+        return MemoryTaskStore()
+    return SQLiteTaskStore(os.environ.get("TASK_DB_PATH", "tasks.sqlite3"))
@@ -0,0 +1,54 @@
+import asyncio
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, Union
+
+import pytest
+
+
+class FakeCompletions:
+    """Stands in for AsyncGroq's chat.completions: each call sleeps `latency` and answers `reply`.
+
+    `reply` is either the completion text or a function of the call's parameters.
+    """
+
+    def __init__(self, reply: Union[str, Callable[[Dict[str, Any]], str]], latency: float):
+        self.reply = reply
+        self.latency = latency
+        self.calls: List[Dict[str, Any]] = []
+        self.with_raw_response = self
+
+    async def create(self, **params: Any) -> Any:
+        self.calls.append(params)
+        await asyncio.sleep(self.latency)
+        completion = SimpleNamespace(
+            usage=None,
+            choices=[SimpleNamespace(message=SimpleNamespace(content=self.reply(params) if callable(self.reply) else self.reply))],
+        )
+
+        async def parse() -> Any:
+            return completion
+
+        return SimpleNamespace(headers={}, parse=parse)
+
+
+@pytest.fixture
+def fake_groq():
+    """Factory for a fake AsyncGroq client; assign it to a tool's `client`."""
+
+    def make(reply: Union[str, Callable[[Dict[str, Any]], str]] = "{}", latency: float = 0.0) -> Any:
+        completions = FakeCompletions(reply, latency)
+        return SimpleNamespace(chat=SimpleNamespace(completions=completions), completions=completions)
+
+    return make
+
+
+@pytest.fixture(autouse=True)
+def _fresh_upstream_state():
+    """Pooled clients and upstream policies are per process; each test runs its own event loop."""
+    yield
+    from tools import resilience
+    from tools.clients import registry
+
+    registry._http.clear()
+    registry._groq.clear()
+    resilience._upstreams.clear()
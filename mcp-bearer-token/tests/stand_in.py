@@ -0,0 +1,99 @@
+"""Local HTTP stand-in for the upstreams, shared by the tests and the benchmarks.
+
+Routes map a path to a handler that receives the request headers and returns
+a Reply. The server runs in a background thread on 127.0.0.1 and records hits
+and peak concurrency per path.
+"""
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Mapping, NamedTuple, Optional
+from urllib.parse import urlsplit
+
+
+class Reply(NamedTuple):
+    status: int = 200
+    body: bytes = b""
+    headers: Mapping[str, str] = {}
+    delay: float = 0.0
+
+
+Handler = Callable[[Mapping[str, str]], Reply]
+
+
+def html(body: str, **headers: str) -> Reply:
+    return Reply(200, f"<html><head><title>t</title></head><body>{body}</body></html>".encode(), {"Content-Type": "text/html; charset=utf-8", **headers})
+
+
+class StandInServer:
+    def __init__(self, routes: Optional[Dict[str, Handler]] = None):
+        self.routes: Dict[str, Handler] = dict(routes or {})
+        self.hits: Counter = Counter()
+        self.requests: List[Dict[str, str]] = []
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def url(self, path: str) -> str:
+        return self.base_url + path
+
+    def __enter__(self) -> "StandInServer":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _handler_class(self):
+        stand_in = self
+
+        class RequestHandler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args) -> None:
+                pass
+
+            def do_GET(self) -> None:
+                self._serve()
+
+            def do_POST(self) -> None:
+                self.rfile.read(int(self.headers.get("Content-Length") or 0))
+                self._serve()
+
+            def _serve(self) -> None:
+                path = urlsplit(self.path).path
+                headers = {k.lower(): v for k, v in self.headers.items()}
+                with stand_in._lock:
+                    stand_in.hits[path] += 1
+                    stand_in.requests.append({"path": self.path, **headers})
+                    stand_in.in_flight += 1
+                    stand_in.peak_in_flight = max(stand_in.peak_in_flight, stand_in.in_flight)
+                try:
+                    handler = stand_in.routes.get(path)
+                    reply = handler(headers) if handler else Reply(404, b"not found")
+                    if reply.delay:
+                        time.sleep(reply.delay)
+                    body = b"" if reply.status == 304 else reply.body
+                    self.send_response(reply.status)
+                    for name, value in reply.headers.items():
+                        self.send_header(name, value)
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+                finally:
+                    with stand_in._lock:
+                        stand_in.in_flight -= 1
+
+        return RequestHandler
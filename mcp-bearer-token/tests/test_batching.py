@@ -0,0 +1,96 @@
+import asyncio
+import json
+import re
+
+from tools.batching import classify_in_batches
+from tools.dm_risk_meter import DMRiskMeter
+from tools.rate_limiter import TokenBucket, get_limiter
+
+_NUMBERED = re.compile(r"^\s*\[(\d+)\] (.*)$", re.MULTILINE)
+
+
+def _valid(item):
+    return item.get("label") in ("ok", "bad")
+
+
+def test_missing_and_malformed_items_are_requeued_individually():
+    calls = []
+
+    async def classify_chunk(chunk):
+        calls.append([index for index, _ in chunk])
+        if len(calls) == 1:
+            # First chunk of the first round: item 1 missing, item 2 malformed, item 0 with a string index
+            return [{"index": "0", "label": "ok"}, {"index": 2, "label": "maybe"}, {"index": 3, "label": "bad"}]
+        return [{"index": index, "label": "ok"} for index, _ in chunk]
+
+    texts = ["a", "b", "c", "d", "e"]
+    outputs, stats = asyncio.run(classify_in_batches(texts, classify_chunk, _valid, chunk_size=4, concurrency=1))
+
+    assert calls[:2] == [[0, 1, 2, 3], [4]]
+    assert sorted(calls[2:]) == [[1, 2]]  # round two halves the chunk size
+    assert [o["label"] for o in outputs] == ["ok", "ok", "ok", "bad", "ok"]
+    assert stats == {"items": 5, "unique_items": 5, "completions": 3, "rounds": 2, "failed_items": 0}
+
+
+def test_items_are_finally_classified_one_per_completion():
+    calls = []
+
+    async def classify_chunk(chunk):
+        calls.append([index for index, _ in chunk])
+        if len(chunk) > 1:
+            return [{"index": chunk[0][0], "label": "ok"}]  # the model answers only the first item
+        return [{"index": chunk[0][0], "label": "bad"}]
+
+    outputs, stats = asyncio.run(classify_in_batches(["a", "b", "c", "d"], classify_chunk, _valid, chunk_size=4, max_rounds=3))
+
+    assert calls[0] == [0, 1, 2, 3]
+    assert sorted(calls[1:3]) == [[1, 2], [3]]
+    assert sorted(calls[3:]) == [[2]]
+    assert [o["label"] for o in outputs] == ["ok", "ok", "bad", "bad"]
+    assert stats["failed_items"] == 0 and stats["rounds"] == 3
+
+
+def test_failed_chunks_are_retried_and_leftovers_come_back_as_none():
+    async def classify_chunk(chunk):
+        if any(text == "poison" for _, text in chunk):
+            raise ValueError("model returned prose")
+        return [{"index": index, "label": "ok"} for index, _ in chunk]
+
+    texts = ["a", "poison", "b", "a"]
+    outputs, stats = asyncio.run(classify_in_batches(texts, classify_chunk, _valid, chunk_size=4, max_rounds=3))
+
+    assert outputs[1] is None
+    assert [o["label"] for i, o in enumerate(outputs) if i != 1] == ["ok", "ok", "ok"]
+    assert stats["unique_items"] == 3 and stats["failed_items"] == 1
+
+
+def test_dm_batch_requeues_what_the_llm_left_out(fake_groq):
+    limiter = get_limiter("batch-test-model")
+    limiter.requests, limiter.tokens = TokenBucket(10_000), TokenBucket(10_000_000)
+    prompts = []
+
+    def reply(params):
+        numbered = _NUMBERED.findall(params["messages"][1]["content"])
+        prompts.append([int(index) for index, _ in numbered])
+        results = [
+            {"index": int(index), "risk_level": "Weird but safe", "three_word_summary": "Odd but fine", "reasoning": "test"}
+            for index, text in numbered
+        ]
+        if len(numbered) > 1:
+            results = results[:-1]  # truncated batch: the last item is missing
+            results[0]["risk_level"] = "Somewhat spicy"  # and the first is off-scale
+        return json.dumps({"results": results})
+
+    tool = DMRiskMeter(api_key="test", model="batch-test-model")
+    tool.client = fake_groq(reply)
+    tool.local_tier = False
+    tool.batch_chunk_size = 4
+    dms = [f"dm number {i}" for i in range(4)]
+
+    result = asyncio.run(tool.run_batch({"dm_texts": dms}))
+
+    assert prompts[0] == [0, 1, 2, 3]
+    assert prompts[1] == [0, 3]  # re-queued together, then split until each has its own completion
+    assert sorted(prompts[2:]) == [[0], [3]]
+    assert [r["risk_level"] for r in result["results"]] == ["Weird but safe"] * 4
+    assert result["stats"]["completions"] == 4 and result["stats"]["failed_items"] == 0
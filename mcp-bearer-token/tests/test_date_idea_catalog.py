@@ -0,0 +1,54 @@
+import asyncio
+import datetime
+
+import pytest
+
+from tools.date_idea_catalog import WEATHER_BUCKETS, catalog_key, weather_bucket
+
+MONDAY = datetime.date(2026, 10, 12)
+
+
+@pytest.mark.parametrize("bucket", ["any"] + [name for name, _ in WEATHER_BUCKETS])
+def test_bucket_names_map_to_themselves(bucket):
+    # Warm-up seeds pools by bucket name, so each name must land in its own bucket
+    assert weather_bucket(bucket) == bucket
+
+
+@pytest.mark.parametrize("weather, bucket", [
+    ("unknown weather", "any"),
+    ("light drizzle", "rainy"),
+    ("Sunny and 24C", "clear"),
+    ("nice evening", "clear"),
+    ("overcast", "cloudy"),
+])
+def test_free_text_weather_shares_the_seeded_pool(weather, bucket):
+    assert catalog_key("austin ", weather, "$$", MONDAY) == catalog_key("Austin", bucket, "medium", MONDAY)
+
+
+def test_keep_seeded_warms_the_next_weekday_before_midnight():
+    from tools.date_idea_catalog import DateIdeaCatalog, seconds_until_midnight
+
+    catalog = DateIdeaCatalog(pool_size=2, low_water=1)
+    clock = [datetime.datetime(2026, 10, 12, 21, 30)]  # Monday evening
+    generated, sleeps = [], []
+
+    async def generate(key, count):
+        generated.append(key)
+        return [{"title": f"{key[3]} idea {i}", "description": "d"} for i in range(count)]
+
+    async def sleep(seconds):
+        sleeps.append(seconds)
+        if len(sleeps) == 2:
+            raise asyncio.CancelledError
+        clock[0] += datetime.timedelta(seconds=seconds)
+
+    with pytest.raises(asyncio.CancelledError):
+        asyncio.run(catalog.keep_seeded(["Austin"], ["any", "rainy"], generate, now=lambda: clock[0], sleep=sleep))
+
+    weekdays = [key[3] for key in generated]
+    # Start-up seeds Monday and Tuesday; after midnight only Wednesday is new
+    assert weekdays == ["Monday"] * 8 + ["Tuesday"] * 8 + ["Wednesday"] * 8
+    assert sleeps[0] == 2.5 * 3600 + 1
+    assert seconds_until_midnight(datetime.datetime(2026, 10, 12, 23, 59, 30)) == 30
+    tuesday = catalog_key("Austin", "drizzle", "cheap", datetime.date(2026, 10, 13))
+    assert catalog.take(tuesday) is not None
@@ -0,0 +1,105 @@
+import json
+import os
+
+import pytest
+
+from tools.dm_prefilter import MODEL_PATH, DMPrefilter, load_prefilter
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "fixtures", "dm_labelled.jsonl")
+THREATS_AFTER_A_GREETING = [
+    "hi! how are you? i am outside your house",
+    "how are you doing sweetheart, wanna see my dick",
+    "Hey how are you? We matched! Love your dog. I will wait by your car",
+]
+# Risky words and a high score, but the LLM rates these below "Run"
+BORDERLINE = [
+    "hey babe you look so hot, send me a pic?",
+    "wanna come over to my place tonight babe",
+    "I invest in crypto, you should try bitcoin",
+]
+
+
+def _fixture():
+    with open(FIXTURE, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def _evaluated_model(**evaluation):
+    with open(MODEL_PATH, encoding="utf-8") as f:
+        model = json.load(f)
+    passing = {
+        "label_source": "llm",
+        "harmless_agreement": 0.99,
+        "harmless_samples": 500,
+        "harmless_unsafe": 0,
+        "scored_run_agreement": 0.99,
+        "scored_run_samples": 500,
+    }
+    model["evaluation"] = {**passing, **evaluation}
+    return DMPrefilter(model)
+
+
+def test_shipped_model_never_answers_harmless_without_an_llm_evaluation():
+    prefilter = load_prefilter()
+    assert not prefilter.harmless_enabled
+    assert all(
+        (prefilter.classify(item["text"]) or ("escalated",))[0] != "Harmless" for item in _fixture()
+    )
+
+
+@pytest.mark.parametrize("evaluation", [
+    {"label_source": "fixture"},
+    {"harmless_agreement": 0.9},
+    {"harmless_samples": 50},
+    {"harmless_unsafe": 1},
+])
+def test_harmless_gate_needs_every_condition(evaluation):
+    assert not _evaluated_model(**evaluation).harmless_enabled
+
+
+@pytest.mark.parametrize("evaluation", [
+    {"label_source": "fixture"},
+    {"scored_run_agreement": 0.944},
+    {"scored_run_samples": 18},
+])
+def test_scored_run_gate_needs_every_condition(evaluation):
+    prefilter = _evaluated_model(**evaluation)
+    assert not prefilter.scored_run_enabled
+    assert prefilter.classify(BORDERLINE[0]) is None
+
+
+@pytest.mark.parametrize("text", BORDERLINE)
+def test_borderline_messages_go_to_the_llm_until_the_scored_run_is_measured(text):
+    prefilter = load_prefilter()
+    assert not prefilter.scored_run_enabled
+    assert prefilter.risk_signals(text) and prefilter.score(text) >= prefilter.run_above
+    assert prefilter.classify(text) is None
+
+
+def test_threat_patterns_answer_run_without_an_evaluation():
+    prefilter = load_prefilter()
+    assert prefilter.classify("i know where you live")[0] == "Run"
+
+
+@pytest.mark.parametrize("text", THREATS_AFTER_A_GREETING)
+def test_greeting_does_not_hide_a_threat(text):
+    prefilter = _evaluated_model()
+    assert prefilter.harmless_enabled
+    verdict = prefilter.classify(text)
+    assert verdict is None or verdict[0] == "Run"
+
+
+def test_evaluated_model_answers_plain_greetings_locally():
+    prefilter = _evaluated_model()
+    assert prefilter.classify("hey how are you")[0] == "Harmless"
+
+
+def test_local_answers_agree_with_fixture_labels():
+    prefilter = load_prefilter()
+    for item in _fixture():
+        verdict = prefilter.classify(item["text"], allow_harmless=True)
+        if verdict is None:
+            continue
+        assert verdict[0] == item["label"], item["text"]
+        if verdict[0] == "Run":
+            assert prefilter.run_hits(item["text"]), item["text"]
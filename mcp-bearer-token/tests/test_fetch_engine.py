@@ -0,0 +1,79 @@
+import asyncio
+
+from stand_in import Reply, StandInServer, html
+from tools import fetch_engine
+from tools.fetch_engine import FetchEngine
+
+UA = "SafeDate-test"
+
+
+def _revalidating_page(headers):
+    if headers.get("if-none-match") == '"v1"':
+        return Reply(304, headers={"ETag": '"v1"'})
+    return html("<article><h1>Title</h1><p>Body text for the page.</p></article>", ETag='"v1"')
+
+
+def test_etag_revalidation_costs_a_304():
+    with StandInServer({"/page": _revalidating_page}) as server:
+        engine = FetchEngine(parse_workers=0)
+
+        async def scenario():
+            first = await engine.fetch(server.url("/page"), UA)
+            second = await engine.fetch(server.url("/page"), UA)
+            return first, second
+
+        first, second = asyncio.run(scenario())
+    assert (first.source, second.source) == ("network", "revalidated")
+    assert second.body == first.body and b"Body text" in second.body
+    assert server.requests[1]["if-none-match"] == '"v1"'
+
+
+def test_fresh_max_age_is_served_without_a_request():
+    with StandInServer({"/fresh": lambda h: html("<p>fresh</p>", **{"Cache-Control": "max-age=60"})}) as server:
+        engine = FetchEngine(parse_workers=0)
+
+        async def scenario():
+            return [(await engine.fetch(server.url("/fresh"), UA)).source for _ in range(3)]
+
+        assert asyncio.run(scenario()) == ["network", "cache", "cache"]
+        assert server.hits["/fresh"] == 1
+
+
+def test_body_is_capped_while_streaming():
+    with StandInServer({"/big": lambda h: Reply(200, b"x" * 200_000, {"Content-Type": "text/plain"})}) as server:
+        engine = FetchEngine(max_bytes=10_000, parse_workers=0)
+        page = asyncio.run(engine.fetch(server.url("/big"), UA))
+    assert page.truncated
+    assert len(page.body) == 10_000
+
+
+def test_per_host_concurrency_limit():
+    with StandInServer({"/slow": lambda h: Reply(200, b"ok", {"Content-Type": "text/plain"}, delay=0.1)}) as server:
+        engine = FetchEngine(per_host=2, parse_workers=0)
+
+        async def scenario():
+            await asyncio.gather(*(engine.fetch(server.url("/slow"), UA) for _ in range(6)))
+
+        asyncio.run(scenario())
+    assert server.hits["/slow"] == 6
+    assert server.peak_in_flight == 2
+
+
+def test_markdown_is_cached_by_content_hash(monkeypatch):
+    conversions = []
+
+    def counting(page_html):
+        # readabilipy shells out to node; the cache is what is under test here
+        conversions.append(page_html)
+        return "# Hello"
+
+    monkeypatch.setattr(fetch_engine, "html_to_markdown", counting)
+    engine = FetchEngine(parse_workers=0)
+    page = "<html><body><article><h1>Hello</h1><p>Some paragraph text that readability keeps.</p></article></body></html>"
+
+    async def scenario():
+        return [await engine.to_markdown(page) for _ in range(3)]
+
+    results = asyncio.run(scenario())
+    assert len(conversions) == 1
+    assert results[0] == results[2] and "Hello" in results[0]
@@ -0,0 +1,48 @@
+import asyncio
+
+import pytest
+
+from tools.geo_cache import PlacesStatusError, PlacesTileCache, places_results
+from tools.safety_tools import SafetyTools
+
+LAT, LON = 12.9716, 77.5946
+STATION = {"name": "Central", "vicinity": "MG Road", "place_id": "abc", "geometry": {"location": {"lat": LAT, "lng": LON}}}
+
+
+def test_places_results_rejects_error_statuses():
+    assert places_results({"status": "OK", "results": [STATION]}) == [STATION]
+    assert places_results({"status": "ZERO_RESULTS", "results": []}) == []
+    for status in ("OVER_QUERY_LIMIT", "REQUEST_DENIED", "INVALID_REQUEST"):
+        with pytest.raises(PlacesStatusError, match=status):
+            places_results({"status": status, "results": []})
+
+
+def test_failed_tile_fetch_is_not_cached():
+    cache = PlacesTileCache()
+    replies = [{"status": "OVER_QUERY_LIMIT", "results": []}, {"status": "OK", "results": [STATION]}]
+
+    async def fetch(lat, lon, radius):
+        return places_results(replies.pop(0))
+
+    async def scenario():
+        with pytest.raises(PlacesStatusError):
+            await cache.nearby(LAT, LON, "police", "", 5000, 3600, fetch)
+        return await cache.nearby(LAT, LON, "police", "", 5000, 3600, fetch)
+
+    places = asyncio.run(scenario())
+    assert [p["name"] for p in places] == ["Central"]
+    assert cache.stats["misses"] == 2
+
+
+def test_sos_answer_survives_a_failed_police_lookup(monkeypatch):
+    tool = SafetyTools(google_api_key="test")
+
+    async def failing(lat, lon):
+        raise RuntimeError("Google Places API failed")
+
+    monkeypatch.setattr(tool, "_find_nearby_police", failing)
+    result = asyncio.run(tool.run({"latitude": LAT, "longitude": LON}))
+    assert result["police_stations"] == []
+    assert result["emergency_contacts"]
+    assert result["police_search_link"].startswith("https://www.google.com/maps/search/police/")
+    assert result["whatsapp_sos_link"].startswith("https://wa.me/")
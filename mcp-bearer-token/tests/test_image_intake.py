@@ -0,0 +1,29 @@
+import io
+import warnings
+
+from PIL import Image
+
+from tools.image_intake import dhash
+
+
+def _picture(size=(320, 240)):
+    return Image.effect_mandelbrot(size, (-2, -1.5, 1, 1.5), 50).convert("RGB")
+
+
+def _jpeg(image, quality):
+    buf = io.BytesIO()
+    image.save(buf, format="JPEG", quality=quality)
+    return Image.open(io.BytesIO(buf.getvalue()))
+
+
+def test_dhash_survives_rescaling_and_recompression():
+    original = dhash(_picture())
+    for variant in (_picture((160, 120)), _jpeg(_picture(), 40)):
+        assert bin(original ^ dhash(variant)).count("1") <= 4
+    assert dhash(Image.new("RGB", (50, 50), "white")) == 0
+
+
+def test_dhash_uses_no_deprecated_pillow_api():
+    with warnings.catch_warnings():
+        warnings.simplefilter("error", DeprecationWarning)
+        dhash(_picture())
@@ -0,0 +1,46 @@
+import random
+
+from tools.lexicon import Lexicon
+from tools.outfit_rater import STYLE_LEXICON
+from tools.rate_my_date import DATE_LEXICON
+
+
+def test_scan_counts_terms_case_insensitively_in_one_pass():
+    hits = STYLE_LEXICON.scan("Tailored BLAZER, silk shirt and a second blazer with Jeans")
+    assert hits.counts == {"tailored": 1, "blazer": 2, "silk": 1, "jeans": 1}
+    assert hits.hits("classy") == 4
+    assert hits.points("classy") == 40
+    assert hits.presence_points("classy") == 30
+    assert hits.points("casual") == 5
+    assert hits.points("mismatch") == 0
+
+
+def test_longest_term_wins_without_overlap():
+    lexicon = Lexicon({"a": {"hot": 1, "hotel": 5}, "b": {"tel": 2}})
+    hits = lexicon.scan("a hotel, not so hot")
+    assert hits.counts == {"hotel": 1, "hot": 1}
+    assert hits.points("a") == 6 and hits.points("b") == 0
+
+
+def test_emoji_terms_are_matched():
+    hits = DATE_LEXICON.scan("lol 😂😂 it was great")
+    assert hits.counts == {"lol": 1, "😂": 2, "great": 1}
+    assert hits.points("humor") == 30
+
+
+def test_matches_the_per_category_findall_it_replaced():
+    import re
+
+    rng = random.Random(3)
+    words = ["suit", "Blazer", "jeans", "hoodie", "VINTAGE", "wrinkled", "retro", "dress", "and", "with", "the"]
+    old = {
+        "classy": (r"suit|blazer|dress|heels|silk|tailored", 10),
+        "casual": (r"jeans|t-shirt|hoodie|sneakers", 5),
+        "trendy": (r"oversized|retro|vintage|streetwear", 8),
+        "mismatch": (r"clashing|mismatched|wrinkled", -10),
+    }
+    for _ in range(200):
+        text = " ".join(rng.choice(words) for _ in range(rng.randint(0, 40)))
+        hits = STYLE_LEXICON.scan(text)
+        for category, (pattern, weight) in old.items():
+            assert hits.points(category) == len(re.findall(pattern, text.lower())) * weight
@@ -0,0 +1,46 @@
+import asyncio
+import json
+import time
+
+from tools.dm_risk_meter import DMRiskMeter
+from tools.rate_limiter import TokenBucket, get_limiter
+
+ROUND_TRIP = 0.3
+CALLERS = 25
+REPLY = json.dumps({"risk_level": "Weird but safe", "three_word_summary": "Odd but okay", "reasoning": "test"})
+
+
+async def _heartbeat(stop: asyncio.Event, lags: list) -> None:
+    """Record how late each 10 ms tick runs; a blocked loop shows up as a large lag."""
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(0.01)
+        lags.append(time.perf_counter() - start - 0.01)
+
+
+def test_concurrent_tool_calls_overlap_and_loop_stays_responsive(fake_groq):
+    limiter = get_limiter("load-test-model")
+    limiter.requests, limiter.tokens = TokenBucket(10_000), TokenBucket(10_000_000)
+
+    tool = DMRiskMeter(api_key="test", model="load-test-model")
+    tool.client = fake_groq(REPLY, latency=ROUND_TRIP)
+    tool.local_tier = False
+    tool.cache_responses = False
+
+    async def scenario():
+        stop, lags = asyncio.Event(), []
+        beat = asyncio.ensure_future(_heartbeat(stop, lags))
+        start = time.perf_counter()
+        results = await asyncio.gather(*(tool.run({"dm_text": f"message number {i}"}) for i in range(CALLERS)))
+        elapsed = time.perf_counter() - start
+        stop.set()
+        await beat
+        return results, elapsed, lags
+
+    results, elapsed, lags = asyncio.run(scenario())
+
+    assert len(tool.client.completions.calls) == CALLERS
+    assert all(r["risk_level"] == "Weird but safe" and r["answered_by"] == "llm" for r in results)
+    # One round-trip for all callers, not CALLERS of them back to back
+    assert elapsed < 2 * ROUND_TRIP
+    assert max(lags) < 0.1
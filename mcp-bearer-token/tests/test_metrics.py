@@ -0,0 +1,11 @@
+from tools.metrics import MetricsRegistry
+
+
+def test_const_labels_tag_every_series():
+    registry = MetricsRegistry()
+    registry.const_labels = (("worker", "4242"),)
+    registry.inc("tool_errors_total", {"tool": "validate", "code": "-32602"})
+    registry.observe("tool_call_seconds", {"tool": "validate"}, 0.02)
+    lines = [line for line in registry.render().splitlines() if not line.startswith("#")]
+    assert lines
+    assert all(line.startswith("safedate_") and '{worker="4242",' in line for line in lines)
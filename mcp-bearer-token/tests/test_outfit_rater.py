@@ -0,0 +1,38 @@
+import asyncio
+import base64
+import io
+
+from PIL import Image
+
+from tools import outfit_rater
+from tools.outfit_rater import OutfitRater
+
+
+def _photo_b64() -> str:
+    buf = io.BytesIO()
+    Image.new("RGB", (64, 96), color=(120, 30, 60)).save(buf, format="PNG")
+    return base64.b64encode(buf.getvalue()).decode()
+
+
+def test_failed_vision_stream_does_not_leak_into_the_fallback_progress(monkeypatch):
+    async def fake_stream(client, model, messages, temperature, max_tokens, on_partial=None, priority="normal"):
+        if model == tool.vision_model:
+            if on_partial is not None:
+                await on_partial("Half a vision rev")
+            raise RuntimeError("vision stream dropped")
+        for delta in ("Text ", "review"):
+            if on_partial is not None:
+                await on_partial(delta)
+        return "Text review"
+
+    tool = OutfitRater(api_key="test", vision_model="vision-test-model")
+    monkeypatch.setattr(outfit_rater, "stream_chat_completion", fake_stream)
+    streamed = []
+
+    async def on_partial(delta: str) -> None:
+        streamed.append(delta)
+
+    result = asyncio.run(tool.run({"outfit_description": "navy blazer", "puch_image_data": _photo_b64()}, on_partial=on_partial))
+    assert result["reviewed_by"] == "text"
+    assert result["fashion_review"] == "Text review"
+    assert "".join(streamed) == "Text review"
@@ -0,0 +1,149 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from tools import llm, response_cache
+from tools.rate_limiter import RateLimitTimeout, TokenBucket, UpstreamRateLimiter, estimate_tokens, get_limiter, parse_duration
+from tools.text_vibe_checker import TextVibeChecker
+
+
+@pytest.mark.parametrize("value, seconds", [
+    ("7.66s", 7.66),
+    ("2m59.56s", 179.56),
+    ("120ms", 0.12),
+    ("1h", 3600.0),
+    ("3", 3.0),
+    ("", None),
+    (None, None),
+    ("soon", None),
+])
+def test_parse_duration(value, seconds):
+    assert parse_duration(value) == (pytest.approx(seconds) if seconds is not None else None)
+
+
+def test_estimate_tokens_counts_text_images_and_completion():
+    messages = [
+        {"role": "system", "content": "x" * 40},
+        {"role": "user", "content": [{"type": "text", "text": "y" * 80}, {"type": "image_url", "image_url": {"url": "data:"}}]},
+    ]
+    assert estimate_tokens(messages, max_tokens=100) == 10 + 20 + 1000 + 100
+
+
+def test_budget_is_split_across_workers():
+    limiter = UpstreamRateLimiter("groq:test", rpm=30, tpm=6000, workers=3)
+    assert (limiter.requests.capacity, limiter.tokens.capacity) == (10, 2000)
+    limiter.adapt({"x-ratelimit-limit-tokens": "9000", "x-ratelimit-remaining-tokens": "1500"})
+    assert limiter.tokens.capacity == 3000
+    assert limiter.tokens.level == 500
+
+
+def test_get_limiter_is_one_per_model():
+    assert get_limiter("model-a") is get_limiter("model-a")
+    assert get_limiter("model-a") is not get_limiter("model-b")
+
+
+def test_queued_calls_are_admitted_highest_priority_first():
+    async def scenario():
+        limiter = UpstreamRateLimiter("groq:test", rpm=60 * 50, tpm=10**6, workers=1)
+        limiter.requests.level = 0  # empty bucket: everything queues, one admitted every 20 ms
+        order = []
+
+        async def call(name, priority):
+            await limiter.acquire(10, priority=priority, deadline=5)
+            order.append(name)
+
+        await asyncio.gather(
+            call("meme", "entertainment"),
+            call("chat", "normal"),
+            call("sos", "safety"),
+            call("meme2", "entertainment"),
+        )
+        return order
+
+    assert asyncio.run(scenario()) == ["sos", "chat", "meme", "meme2"]
+
+
+def test_call_fails_at_its_queue_deadline():
+    async def scenario():
+        limiter = UpstreamRateLimiter("groq:test", rpm=1, tpm=10**6, workers=1)
+        await limiter.acquire(10)
+        with pytest.raises(RateLimitTimeout):
+            await limiter.acquire(10, deadline=0.05)
+
+    asyncio.run(scenario())
+
+
+def test_retry_after_pauses_the_queue_and_settle_refunds():
+    async def scenario():
+        limiter = UpstreamRateLimiter("groq:test", rpm=600, tpm=1000, workers=1)
+        charged = await limiter.acquire(400)
+        limiter.settle(charged, used=100)
+        refunded = limiter.tokens.level
+        limiter.adapt({"retry-after": "0.1"})
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        await limiter.acquire(10, deadline=1)
+        return refunded, loop.time() - started
+
+    refunded, waited = asyncio.run(scenario())
+    assert refunded == pytest.approx(900, abs=1)
+    assert waited >= 0.09
+
+
+def _llm_limiter(model):
+    limiter = get_limiter(model)
+    limiter.requests, limiter.tokens = TokenBucket(10_000), TokenBucket(10_000_000)
+    return limiter
+
+
+def test_failed_or_cancelled_completions_give_their_charge_back(fake_groq):
+    limiter = _llm_limiter("refund-test-model")
+    full = limiter.tokens.level
+    messages = [{"role": "user", "content": "hi"}]
+
+    class Broken:
+        async def create(self, **params):
+            raise ConnectionError("reset by peer")
+
+    broken = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(with_raw_response=Broken())))
+
+    async def scenario():
+        with pytest.raises(ConnectionError):
+            await llm.chat_completion(broken, "refund-test-model", messages, temperature=0, max_tokens=500)
+        with pytest.raises(ConnectionError):
+            await llm.stream_chat_completion(broken, "refund-test-model", messages, temperature=0, max_tokens=500)
+        after_errors = limiter.tokens.level
+
+        slow = asyncio.ensure_future(
+            llm.chat_completion(fake_groq(latency=5), "refund-test-model", messages, temperature=0, max_tokens=500)
+        )
+        await asyncio.sleep(0.05)
+        assert limiter.tokens.level < full - 400  # charged while in flight
+        slow.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await slow
+        return after_errors, limiter.tokens.level
+
+    after_errors, after_cancel = asyncio.run(scenario())
+    assert after_errors == pytest.approx(full, abs=1)
+    assert after_cancel == pytest.approx(full, abs=1)
+
+
+def test_text_vibe_checker_queues_as_entertainment(fake_groq, monkeypatch):
+    monkeypatch.setenv("LLM_CACHE_BACKEND", "off")
+    monkeypatch.setattr(response_cache, "_cache", None)
+    admitted = []
+    real_admit = llm._admit
+
+    async def recording_admit(model, messages, max_tokens, priority):
+        admitted.append(priority)
+        return await real_admit(model, messages, max_tokens, priority)
+
+    monkeypatch.setattr(llm, "_admit", recording_admit)
+    _llm_limiter("vibe-test-model")
+    tool = TextVibeChecker(api_key="test", giphy_api_key="test", model="vibe-test-model")
+    tool.client = fake_groq('{"vibe": "Playful", "confidence": 90, "reason": "emoji storm"}')
+
+    assert asyncio.run(tool.run({"messages": "haha ok 😂", "raw": True}))["vibe"] == "Playful"
+    assert admitted == ["entertainment"]
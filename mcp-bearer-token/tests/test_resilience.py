@@ -0,0 +1,224 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from stand_in import Reply, StandInServer
+from tools import resilience
+from tools.fetch_engine import FetchEngine
+from tools.resilience import CircuitBreaker, Upstream, UpstreamUnavailable
+
+
+class Faults:
+    """Route handler whose replies are switched mid-test: `script` is served first, then `status`/`delay`."""
+
+    def __init__(self):
+        self.status = 200
+        self.delay = 0.0
+        self.script = []
+        self.etag = None
+
+    def __call__(self, headers):
+        status, delay = self.script.pop(0) if self.script else (self.status, self.delay)
+        extra = {"ETag": self.etag, "Cache-Control": "max-age=0"} if self.etag else {}
+        return Reply(status, b"ok" if status == 200 else b"down", {"Content-Type": "text/html", **extra}, delay)
+
+
+@pytest.fixture
+def faults():
+    faults = Faults()
+    with StandInServer({"/": faults}) as server:
+        faults.server = server
+        yield faults
+
+
+@pytest.fixture
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(resilience.random, "uniform", lambda a, b: 0.0)
+
+
+def _policy(threshold=2, cooldown=60.0, max_timeout=5.0):
+    policy = Upstream("stand-in", max_timeout)
+    policy.breaker = CircuitBreaker(threshold=threshold, cooldown=cooldown)
+    return policy
+
+
+def _seed_latency(policy, seconds, n=resilience.MIN_SAMPLES):
+    for _ in range(n):
+        policy.latency.add(seconds)
+
+
+def _attempt(client, url):
+    async def attempt(timeout):
+        resp = await client.get(url, timeout=timeout)
+        if resp.status_code >= 500:
+            resp.raise_for_status()
+        return resp.text
+
+    return attempt
+
+
+def test_breaker_opens_fails_fast_and_a_probe_closes_it(faults):
+    policy = _policy(threshold=2, cooldown=0.2)
+    faults.status = 503
+
+    async def scenario():
+        async with httpx.AsyncClient() as client:
+            attempt = _attempt(client, faults.server.url("/"))
+            for _ in range(2):
+                with pytest.raises(httpx.HTTPStatusError):
+                    await policy.call(attempt)
+            assert policy.breaker.state == "open"
+            with pytest.raises(UpstreamUnavailable):
+                await policy.call(attempt)
+            assert faults.server.hits["/"] == 2
+
+            faults.status = 200
+            await asyncio.sleep(0.25)
+            return await policy.call(attempt)
+
+    assert asyncio.run(scenario()) == "ok"
+    assert (policy.breaker.state, policy.breaker.failures) == ("closed", 0)
+
+
+def test_failed_probe_reopens_with_a_longer_cooldown(faults):
+    policy = _policy(threshold=1, cooldown=0.1)
+    faults.status = 503
+
+    async def scenario():
+        async with httpx.AsyncClient() as client:
+            attempt = _attempt(client, faults.server.url("/"))
+            with pytest.raises(httpx.HTTPStatusError):
+                await policy.call(attempt)
+            await asyncio.sleep(0.15)
+            with pytest.raises(httpx.HTTPStatusError):
+                await policy.call(attempt)
+
+    asyncio.run(scenario())
+    assert policy.breaker.state == "open"
+    assert policy.breaker.cooldown == pytest.approx(0.2)
+
+
+def test_cancelled_probe_does_not_leave_the_breaker_half_open(faults):
+    policy = _policy()
+    policy.breaker.state, policy.breaker.opened_at = "open", time.monotonic() - 120
+    faults.delay = 1.0
+
+    async def scenario():
+        async with httpx.AsyncClient() as client:
+            attempt = _attempt(client, faults.server.url("/"))
+            probe = asyncio.ensure_future(policy.call(attempt))
+            await asyncio.sleep(0.1)
+            assert policy.breaker.state == "half_open"
+            with pytest.raises(UpstreamUnavailable):
+                await policy.call(attempt)  # only one probe at a time
+            probe.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await probe
+            assert policy.breaker.state == "open"
+
+            faults.delay = 0.0
+            return await policy.call(attempt)
+
+    assert asyncio.run(scenario()) == "ok"
+    assert policy.breaker.state == "closed"
+
+
+def test_idempotent_calls_retry_through_transient_faults(faults, no_backoff):
+    policy = _policy(threshold=1)
+    faults.script = [(503, 0.0), (502, 0.0)]
+
+    async def scenario():
+        async with httpx.AsyncClient() as client:
+            attempt = _attempt(client, faults.server.url("/"))
+            ok = await policy.call(attempt, idempotent=True)
+            faults.script = [(503, 0.0)]
+            with pytest.raises(httpx.HTTPStatusError):
+                await policy.call(attempt)  # not idempotent: one attempt only
+            return ok
+
+    assert asyncio.run(scenario()) == "ok"
+    assert faults.server.hits["/"] == 4
+    assert policy.breaker.state == "open"
+
+
+def test_slow_attempt_is_hedged_past_the_p95(faults):
+    policy = _policy()
+    _seed_latency(policy, 0.02)
+    faults.script = [(200, 1.0)]
+
+    async def scenario():
+        async with httpx.AsyncClient() as client:
+            started = time.monotonic()
+            result = await policy.call(_attempt(client, faults.server.url("/")), idempotent=True)
+            return result, time.monotonic() - started
+
+    result, elapsed = asyncio.run(scenario())
+    assert result == "ok" and elapsed < 0.5
+    assert faults.server.hits["/"] == 2
+
+
+def test_caller_cancelled_during_the_hedge_delay_cancels_the_first_attempt():
+    policy = _policy()
+    _seed_latency(policy, 0.5)  # hedge only after 0.5 s
+    attempts = []
+
+    async def attempt(timeout):
+        attempts.append("started")
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            attempts.append("cancelled")
+            raise
+
+    async def scenario():
+        call = asyncio.ensure_future(policy.call(attempt, idempotent=True))
+        await asyncio.sleep(0.05)
+        call.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await call
+        await asyncio.sleep(0.05)  # before asyncio.run would cancel an orphaned attempt itself
+        return list(attempts)
+
+    assert asyncio.run(scenario()) == ["started", "cancelled"]
+
+
+def test_timeout_follows_observed_latency_not_the_worst_case(faults, monkeypatch):
+    monkeypatch.setattr(resilience, "TIMEOUT_FLOOR", 0.1)
+    policy = _policy(max_timeout=10.0)
+    _seed_latency(policy, 0.02)
+    faults.delay = 0.6
+
+    async def scenario():
+        async with httpx.AsyncClient() as client:
+            started = time.monotonic()
+            with pytest.raises(UpstreamUnavailable):
+                await policy.call(_attempt(client, faults.server.url("/")))
+            return time.monotonic() - started
+
+    assert policy.timeout() == pytest.approx(0.1)
+    assert asyncio.run(scenario()) < 0.5
+    assert policy.breaker.failures == 1
+
+
+def test_fetch_engine_serves_stale_pages_while_the_host_is_down(faults, monkeypatch):
+    monkeypatch.setattr(resilience, "RETRY_ATTEMPTS", 0)
+    faults.etag = '"v1"'
+    url = faults.server.url("/")
+    host_policy = resilience.upstream(f"web:{faults.server.base_url.split('//')[1]}", 15)
+    host_policy.breaker = CircuitBreaker(threshold=2, cooldown=60)
+    engine = FetchEngine(parse_workers=0)
+
+    async def scenario():
+        first = await engine.fetch(url, "SafeDate-test")
+        faults.status = 503
+        later = [await engine.fetch(url, "SafeDate-test") for _ in range(3)]
+        return first, later
+
+    first, later = asyncio.run(scenario())
+    assert first.source == "network"
+    assert [page.source for page in later] == ["stale"] * 3
+    assert all(page.body == b"ok" for page in later)
+    assert host_policy.breaker.state == "open"
+    assert faults.server.hits["/"] == 3  # the third stale page never reached the host
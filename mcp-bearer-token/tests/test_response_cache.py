@@ -0,0 +1,114 @@
+import asyncio
+
+import pytest
+
+from tools import response_cache
+from tools.response_cache import MemoryBackend, ResponseCache, SQLiteBackend, make_key
+
+
+class FakeTime:
+    def __init__(self, now: float = 1_000_000.0):
+        self.now = now
+
+    def time(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeTime()
+    monkeypatch.setattr(response_cache, "time", fake)
+    return fake
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def backend(request, tmp_path):
+    if request.param == "memory":
+        return MemoryBackend(max_entries=3)
+    return SQLiteBackend(str(tmp_path / "cache.sqlite3"), max_entries=3)
+
+
+def _counting(value):
+    calls = []
+
+    async def compute():
+        calls.append(value)
+        return value
+
+    return compute, calls
+
+
+def test_key_ignores_whitespace_but_not_model_or_prompt_version():
+    key = make_key("dm_risk_meter", "m", "v1", "hey  there\n you")
+    assert key == make_key("dm_risk_meter", "m", "v1", "hey there you")
+    assert key != make_key("dm_risk_meter", "m", "v2", "hey there you")
+    assert key != make_key("dm_risk_meter", "other", "v1", "hey there you")
+
+
+def test_entries_expire_after_the_ttl(backend, clock):
+    backend.set("k", {"risk_level": "Run"}, ttl=60)
+    clock.now += 59
+    assert backend.get("k") == {"risk_level": "Run"}
+    clock.now += 2
+    assert backend.get("k") is None
+
+
+def test_least_recently_used_entry_is_evicted_at_capacity(backend, clock):
+    for key in ("a", "b", "c"):
+        clock.now += 1
+        backend.set(key, key, ttl=3600)
+    clock.now += 1
+    assert backend.get("a") == "a"  # a is now the most recently used
+    clock.now += 1
+    backend.set("d", "d", ttl=3600)
+    assert [backend.get(k) for k in ("a", "b", "c", "d")] == ["a", None, "c", "d"]
+
+
+def test_sqlite_entries_survive_a_new_instance(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    first = ResponseCache(SQLiteBackend(path))
+    compute, calls = _counting({"risk_level": "Harmless"})
+    asyncio.run(first.get_or_compute("dm_risk_meter", "m", "v1", "hi", compute))
+
+    reopened = ResponseCache(SQLiteBackend(path))
+    again, again_calls = _counting({"risk_level": "Run"})
+    assert asyncio.run(reopened.get_or_compute("dm_risk_meter", "m", "v1", "hi", again)) == {"risk_level": "Harmless"}
+    assert (len(calls), again_calls) == (1, [])
+    assert reopened.stats["dm_risk_meter"] == {"hits": 1, "misses": 0}
+
+
+def test_hits_and_misses_are_counted_per_tool():
+    cache = ResponseCache(MemoryBackend())
+    compute, calls = _counting("verdict")
+
+    async def scenario():
+        for _ in range(3):
+            await cache.get_or_compute("date_analyzer", "m", "v1", "same chat", compute)
+
+    asyncio.run(scenario())
+    assert calls == ["verdict"]
+    assert cache.stats["date_analyzer"] == {"hits": 2, "misses": 1}
+
+
+def test_tools_can_opt_out(monkeypatch):
+    monkeypatch.setenv("LLM_CACHE_BACKEND", "memory")
+    monkeypatch.setenv("LLM_CACHE_DISABLED_TOOLS", "text_vibe_checker, date_analyzer")
+    cache = ResponseCache.from_env()
+    assert cache.disabled_tools == {"text_vibe_checker", "date_analyzer"}
+    compute, calls = _counting("fresh")
+
+    async def scenario():
+        for _ in range(2):
+            await cache.get_or_compute("text_vibe_checker", "m", "v1", "x", compute)  # disabled by env
+            await cache.get_or_compute("best_date_idea", "m", "v1", "x", compute, enabled=False)  # cache_responses = False
+        await cache.get_or_compute("dm_risk_meter", "m", "v1", "x", compute)
+
+    asyncio.run(scenario())
+    assert len(calls) == 5
+    assert set(cache.stats) == {"dm_risk_meter"}
+
+
+def test_cache_can_be_switched_off(monkeypatch):
+    monkeypatch.setenv("LLM_CACHE_BACKEND", "off")
+    cache = ResponseCache.from_env()
+    assert not cache.enabled_for("dm_risk_meter")
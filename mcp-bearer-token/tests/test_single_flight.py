@@ -0,0 +1,107 @@
+import asyncio
+
+import pytest
+
+from tools.single_flight import SingleFlight
+
+CALLERS = 50
+
+
+def test_identical_concurrent_callers_share_one_upstream_call():
+    flights = SingleFlight()
+    upstream_calls = 0
+
+    async def upstream():
+        nonlocal upstream_calls
+        upstream_calls += 1
+        await asyncio.sleep(0.05)
+        return {"risk_level": "Run"}
+
+    async def scenario():
+        return await asyncio.gather(*(flights.do("dm_risk_meter", "same dm", upstream) for _ in range(CALLERS)))
+
+    results = asyncio.run(scenario())
+    assert upstream_calls == 1
+    assert results == [{"risk_level": "Run"}] * CALLERS
+    assert not flights._calls
+
+
+def test_distinct_keys_and_later_calls_are_not_coalesced():
+    flights = SingleFlight()
+    seen = []
+
+    async def upstream(key):
+        seen.append(key)
+        await asyncio.sleep(0.01)
+        return key
+
+    async def scenario():
+        first = await asyncio.gather(*(flights.do("t", k, lambda k=k: upstream(k)) for k in ("a", "b", "a")))
+        second = await flights.do("t", "a", lambda: upstream("a"))
+        return first, second
+
+    first, second = asyncio.run(scenario())
+    assert first == ["a", "b", "a"] and second == "a"
+    assert sorted(seen) == ["a", "a", "b"]
+
+
+def test_one_caller_cancelling_does_not_cancel_the_others():
+    flights = SingleFlight()
+    cancelled = False
+
+    async def upstream():
+        nonlocal cancelled
+        try:
+            await asyncio.sleep(0.1)
+        except asyncio.CancelledError:
+            cancelled = True
+            raise
+        return "ok"
+
+    async def scenario():
+        impatient = asyncio.ensure_future(flights.do("t", "k", upstream))
+        patient = asyncio.ensure_future(flights.do("t", "k", upstream))
+        await asyncio.sleep(0.01)
+        impatient.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await impatient
+        return await patient
+
+    assert asyncio.run(scenario()) == "ok"
+    assert not cancelled
+
+
+def test_last_waiter_leaving_cancels_the_upstream_call():
+    flights = SingleFlight()
+
+    async def scenario():
+        started, stopped = asyncio.Event(), asyncio.Event()
+
+        async def upstream():
+            started.set()
+            try:
+                await asyncio.sleep(10)
+            finally:
+                stopped.set()
+
+        caller = asyncio.ensure_future(flights.do("t", "k", upstream))
+        await started.wait()
+        caller.cancel()
+        await asyncio.wait_for(stopped.wait(), 1)
+        return dict(flights._calls)
+
+    assert asyncio.run(scenario()) == {}
+
+
+def test_errors_reach_every_waiter():
+    flights = SingleFlight()
+
+    async def upstream():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("Groq is down")
+
+    async def scenario():
+        return await asyncio.gather(*(flights.do("t", "k", upstream) for _ in range(5)), return_exceptions=True)
+
+    results = asyncio.run(scenario())
+    assert all(isinstance(r, RuntimeError) for r in results)
@@ -0,0 +1,43 @@
+import os
+import re
+import subprocess
+import sys
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# What mcp_starter may add on top of fastmcp/mcp/httpx: its own module body plus the tools it imports eagerly
+IMPORT_BUDGET_MS = float(os.environ.get("IMPORT_BUDGET_MS", "500"))
+# Heavy dependencies and tool modules that must load on first call or warm-up, not at import
+DEFERRED = (
+    "groq", "PIL", "readabilipy", "markdownify", "bs4",
+    "tools.best_date_idea", "tools.best_restaurants_near_me", "tools.date_analyzer",
+    "tools.date_meme_generator", "tools.dm_risk_meter", "tools.outfit_rater", "tools.rate_my_date",
+    "tools.safety_tools", "tools.text_vibe_checker", "tools.trendy_date_spotter",
+)
+_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( +)(\S+)$")
+
+
+def _importtime():
+    """(name, depth, self_us, cumulative_us) for every module `import mcp_starter` loads."""
+    env = dict(os.environ, AUTH_TOKEN="test", MY_NUMBER="0", MCP_WARM_TOOLS="0")
+    cmd = [sys.executable, "-X", "importtime", "-c", "import mcp_starter"]
+    subprocess.run(cmd, cwd=SERVER_DIR, env=env, capture_output=True, check=True)  # write .pyc files first
+    proc = subprocess.run(cmd, cwd=SERVER_DIR, env=env, capture_output=True, text=True, check=True)
+    entries = []
+    for line in proc.stderr.splitlines():
+        match = _LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            entries.append((name, (len(indent) - 1) // 2, int(self_us), int(cumulative_us)))
+    return entries
+
+
+def test_server_import_defers_tools_and_stays_within_budget():
+    entries = _importtime()
+    names = {name for name, _, _, _ in entries}
+    assert "mcp_starter" in names
+    assert not names & set(DEFERRED), f"imported eagerly: {sorted(names & set(DEFERRED))}"
+
+    starter_self = next(self_us for name, depth, self_us, _ in entries if name == "mcp_starter" and depth == 0)
+    own_tools = sum(cum for name, depth, _, cum in entries if depth == 1 and name.split(".")[0] == "tools")
+    spent_ms = (starter_self + own_tools) / 1000
+    assert spent_ms < IMPORT_BUDGET_MS, f"mcp_starter adds {spent_ms:.0f} ms of imports (budget {IMPORT_BUDGET_MS:.0f} ms)"
@@ -0,0 +1,179 @@
+import asyncio
+import importlib.util
+import json
+import os
+import random
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from task_scheduler import DueScheduler, due_timestamp
+
+START = datetime(2026, 10, 16, 12, 0, tzinfo=timezone.utc).timestamp()
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class FakeClock:
+    def __init__(self, now: float = START):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _iso(ts: float) -> str:
+    return datetime.fromtimestamp(ts, timezone.utc).isoformat()
+
+
+def _task(task_id, due=None, status="open"):
+    return {"id": task_id, "status": status, "due_at": _iso(due) if due is not None else None}
+
+
+def test_due_timestamp_only_for_open_dated_tasks():
+    assert due_timestamp(_task("a", START)) == START
+    assert due_timestamp({"id": "n", "status": "open", "due_at": "2026-10-16T12:00:00"}) == START
+    assert due_timestamp(_task("b")) is None
+    assert due_timestamp(_task("c", START, status="completed")) is None
+    assert due_timestamp({"id": "d", "status": "open", "due_at": "next tuesday"}) is None
+
+
+def test_reminders_fire_once_lead_seconds_early_in_due_order():
+    clock = FakeClock()
+    scheduler = DueScheduler(lead=900, clock=clock)
+    scheduler.schedule("u", _task("later", START + 3600))
+    scheduler.schedule("u", _task("soon", START + 1000))
+    scheduler.schedule("u", _task("undated"))
+    assert len(scheduler) == 2
+    assert scheduler.next_fire_at() == START + 100
+    assert scheduler.pop_due() == []
+    clock.now = START + 2700
+    assert scheduler.pop_due() == [("u", "soon", START + 1000), ("u", "later", START + 3600)]
+    assert scheduler.pop_due() == [] and len(scheduler) == 0
+
+
+def test_reschedule_and_cancel_supersede_the_old_entry():
+    scheduler = DueScheduler(clock=FakeClock())
+    scheduler.schedule("u", _task("a", START + 10))
+    scheduler.schedule("u", _task("a", START + 50))
+    scheduler.schedule("u", _task("b", START + 20))
+    scheduler.cancel("u", "b")
+    assert scheduler.pop_due(START + 100) == [("u", "a", START + 50)]
+    scheduler.schedule("u", _task("c", START + 10))
+    scheduler.schedule("u", _task("c", START + 10, status="completed"))
+    assert scheduler.pop_due(START + 100) == []
+
+
+def test_rebuild_skips_reminders_that_are_long_overdue():
+    scheduler = DueScheduler(lead=900, clock=FakeClock(), stale_after=3600)
+    scheduler.rebuild([
+        ("u", _task("fired-two-hours-ago", START - 7200 + 900)),
+        ("u", _task("fired-ten-minutes-ago", START - 600 + 900)),
+        ("u", _task("tomorrow", START + 86400)),
+        ("u", _task("undated")),
+    ])
+    assert len(scheduler) == 2
+    assert [tid for _, tid, _ in scheduler.pop_due()] == ["fired-ten-minutes-ago"]
+    keep_all = DueScheduler(clock=FakeClock())
+    keep_all.rebuild([("u", _task("last-month", START - 30 * 86400))])
+    assert len(keep_all) == 1
+
+
+def test_a_million_reminders_with_churn():
+    rng = random.Random(11)
+    clock = FakeClock()
+    scheduler = DueScheduler(clock=clock)
+    n = 1_000_000
+    dues = [START + rng.uniform(0, 86400) for _ in range(n)]
+    for i, due in enumerate(dues):
+        scheduler.schedule("u", {"id": i, "status": "open", "due_at": _iso(due)})
+    cancelled = set(rng.sample(range(n), n // 4))
+    for i in cancelled:
+        scheduler.cancel("u", i)
+    assert len(scheduler) == n - len(cancelled)
+    assert len(scheduler._heap) <= 2 * len(scheduler) + 1024  # compacted while cancelling
+
+    fired = []
+    started = time.perf_counter()
+    for hour in range(1, 25):
+        clock.now = START + hour * 3600
+        batch = scheduler.pop_due()
+        assert all(due <= clock.now for _, _, due in batch)
+        fired.extend(batch)
+    assert time.perf_counter() - started < 10
+    assert len(fired) == n - len(cancelled)
+    assert {tid for _, tid, _ in fired}.isdisjoint(cancelled)
+    assert [due for _, _, due in fired] == sorted(due for _, _, due in fired)
+
+
+def test_run_fires_due_reminders_and_wakes_for_earlier_ones():
+    async def scenario():
+        scheduler = DueScheduler()
+        fired = []
+
+        async def on_due(user, task_id, due):
+            fired.append(task_id)
+
+        loop = asyncio.ensure_future(scheduler.run(on_due, max_sleep=5))
+        scheduler.schedule("u", _task("far", time.time() + 3600))
+        await asyncio.sleep(0.01)
+        scheduler.schedule("u", _task("now", time.time() + 0.05))
+        await asyncio.sleep(0.2)
+        loop.cancel()
+        return fired
+
+    assert asyncio.run(scenario()) == ["now"]
+
+
+def _load_task_server(monkeypatch):
+    monkeypatch.setenv("AUTH_TOKEN", "test-token")
+    monkeypatch.setenv("MY_NUMBER", "0")
+    monkeypatch.setenv("TASK_STORE", "memory")
+    path = os.path.join(SERVER_DIR, "puch-user-id-mcp-example.py")
+    spec = importlib.util.spec_from_file_location("task_server_under_test", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_upcoming_tasks_skips_bad_due_dates_and_stops_at_undated(monkeypatch):
+    server = _load_task_server(monkeypatch)
+    now = datetime.now(timezone.utc)
+    tasks = [
+        server._new_task("overdue", due_at=(now - timedelta(hours=1)).isoformat()),
+        {**server._new_task("typo"), "due_at": "1999-01-45"},  # stored before due_at was checked
+        server._new_task("soon", due_at=(now + timedelta(hours=2)).isoformat()),
+        server._new_task("next week", due_at=(now + timedelta(days=7)).isoformat()),
+        server._new_task("someday"),
+    ]
+    server.STORE.add_many("u", tasks)
+    upcoming = server.upcoming_tasks.fn
+
+    def titles(**kwargs):
+        result = asyncio.run(upcoming(puch_user_id="u", **kwargs))
+        return [t["title"] for t in json.loads(result[0].text)["tasks"]]
+
+    assert titles() == ["overdue", "soon"]
+    assert titles(limit=1) == ["overdue"]
+    assert titles(within_minutes=60 * 24 * 30) == ["overdue", "soon", "next week"]
+
+
+def test_due_at_is_stored_in_utc_so_mixed_offsets_sort_by_time(monkeypatch):
+    server = _load_task_server(monkeypatch)
+    now = datetime.now(timezone.utc)
+    east, west = timezone(timedelta(hours=14)), timezone(timedelta(hours=-12))
+    # As raw strings "in 5 hours" at -12:00 sorts a day ahead of "in 3 hours" at +14:00
+    asyncio.run(server.add_tasks.fn(puch_user_id="u", tasks=[
+        server.NewTask(title="in 5 hours", due_at=(now + timedelta(hours=5)).astimezone(west).isoformat()),
+        server.NewTask(title="in 3 hours", due_at=(now + timedelta(hours=3)).astimezone(east).isoformat()),
+        server.NewTask(title="in 1 hour", due_at=(now + timedelta(hours=1)).replace(tzinfo=None).isoformat()),
+    ]))
+    stored = server.STORE.list("u")
+    assert [t["title"] for t in stored] == ["in 1 hour", "in 3 hours", "in 5 hours"]
+    assert all(t["due_at"].endswith("+00:00") for t in stored)
+
+    result = asyncio.run(server.upcoming_tasks.fn(puch_user_id="u", within_minutes=4 * 60))
+    assert [t["title"] for t in json.loads(result[0].text)["tasks"]] == ["in 1 hour", "in 3 hours"]
+
+    with pytest.raises(server.McpError):
+        asyncio.run(server.add_task.fn(puch_user_id="u", title="typo", due_at="1999-01-45"))
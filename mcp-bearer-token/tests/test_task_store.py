@@ -0,0 +1,152 @@
+import pytest
+
+from task_store import MemoryTaskStore, SQLiteTaskStore, TaskStore, open_task_store, sort_key
+
+USER = "user-1"
+
+
+def _task(i, due=None, status="open", tags=(), title=None, notes=None):
+    return {
+        "id": f"t{i:03d}",
+        "title": title or f"task {i}",
+        "status": status,
+        "due_at": due,
+        "priority": "normal",
+        "tags": list(tags),
+        "notes": notes,
+        "created_at": f"2026-10-01T00:00:{i:02d}+00:00",
+        "updated_at": f"2026-10-01T00:00:{i:02d}+00:00",
+    }
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    if request.param == "memory":
+        return MemoryTaskStore()
+    return SQLiteTaskStore(str(tmp_path / "tasks.sqlite3"))
+
+
+def _ids(tasks):
+    return [t["id"] for t in tasks]
+
+
+def test_task_store_is_abstract():
+    with pytest.raises(TypeError):
+        TaskStore()
+
+    class Partial(TaskStore):
+        def add(self, user_id, task):
+            return task
+
+    with pytest.raises(TypeError):
+        Partial()
+
+
+def test_listing_orders_by_due_then_created_with_undated_last(store):
+    store.add_many(USER, [
+        _task(1),
+        _task(2, due="2026-10-20T09:00:00+00:00"),
+        _task(3, due="2026-10-18T09:00:00+00:00"),
+        _task(4, due="2026-10-18T09:00:00+00:00"),
+        _task(5),
+    ])
+    assert _ids(store.list(USER)) == ["t003", "t004", "t002", "t001", "t005"]
+    assert store.list("someone-else") == []
+
+
+def test_filters_and_search(store):
+    store.add_many(USER, [
+        _task(1, tags=["date"], title="Book dinner"),
+        _task(2, status="completed", tags=["date"]),
+        _task(3, tags=["gym"], notes="Leg DAY"),
+        _task(4, status="completed"),
+    ])
+    assert _ids(store.list(USER, status="open")) == ["t001", "t003"]
+    assert _ids(store.list(USER, tag="date")) == ["t001", "t002"]
+    assert _ids(store.list(USER, status="completed", tag="date")) == ["t002"]
+    assert _ids(store.list(USER, search="dinner")) == ["t001"]
+    assert _ids(store.list(USER, search="leg day")) == ["t003"]
+    assert store.list(USER, tag="missing") == []
+
+
+def test_keyset_pages_cover_every_task_once(store):
+    tasks = [_task(i, due=f"2026-10-{(i % 5) + 10}T09:00:00+00:00" if i % 3 else None) for i in range(23)]
+    store.add_many(USER, tasks)
+    pages, after = [], None
+    while True:
+        page = store.list(USER, limit=5, after=after)
+        if not page:
+            break
+        pages.append(page)
+        after = sort_key(page[-1])
+    listed = [t for page in pages for t in page]
+    assert len(pages) == 5
+    assert _ids(listed) == _ids(sorted(tasks, key=sort_key))
+
+
+def test_filtered_keyset_pages_follow_the_filtered_order(store):
+    tasks = [_task(i, due=f"2026-10-{20 - i % 7}T09:00:00+00:00", status="open" if i % 2 else "completed", tags=["date"] if i % 3 else []) for i in range(30)]
+    store.add_many(USER, tasks)
+    for query in ({"tag": "date"}, {"status": "open"}, {"tag": "date", "status": "open"}):
+        expected = [t for t in sorted(tasks, key=sort_key)
+                    if ("tag" not in query or "date" in t["tags"]) and ("status" not in query or t["status"] == query["status"])]
+        listed, after = [], None
+        while True:
+            page = store.list(USER, limit=4, after=after, **query)
+            if not page:
+                break
+            listed.extend(page)
+            after = sort_key(page[-1])
+        assert _ids(listed) == _ids(expected), query
+
+
+def test_memory_store_drops_emptied_tag_and_status_lists():
+    store = MemoryTaskStore()
+    store.add(USER, _task(1, tags=["once"]))
+    store.update(USER, "t001", status="completed", tags=[])
+    store.remove(USER, "t001")
+    user = store._users[USER]
+    assert (user.order, user.by_status, user.by_tag) == ([], {}, {})
+
+
+def test_update_reindexes_status_tags_and_order(store):
+    store.add_many(USER, [_task(1, due="2026-10-20T09:00:00+00:00", tags=["a"]), _task(2, due="2026-10-21T09:00:00+00:00")])
+    updated = store.update(USER, "t001", status="completed", tags=["b"], due_at="2026-10-25T09:00:00+00:00")
+    assert updated["status"] == "completed"
+    assert store.get(USER, "t001") == updated
+    assert _ids(store.list(USER)) == ["t002", "t001"]
+    assert _ids(store.list(USER, status="open")) == ["t002"]
+    assert store.list(USER, tag="a") == []
+    assert _ids(store.list(USER, tag="b")) == ["t001"]
+    assert store.update(USER, "missing", status="completed") is None
+
+
+def test_bulk_update_and_remove_report_per_id(store):
+    store.add_many(USER, [_task(i) for i in range(4)])
+    updated = store.update_many(USER, ["t000", "t002", "nope"], status="completed")
+    assert {k: v and v["status"] for k, v in updated.items()} == {"t000": "completed", "t002": "completed", "nope": None}
+    assert store.remove_many(USER, ["t001", "nope"]) == {"t001": True, "nope": False}
+    assert _ids(store.list(USER)) == ["t000", "t002", "t003"]
+    assert _ids(store.list(USER, status="open")) == ["t003"]
+    assert store.get(USER, "t001") is None
+
+
+def test_due_tasks_are_open_and_dated(store):
+    store.add_many(USER, [_task(1, due="2026-10-20T09:00:00+00:00"), _task(2), _task(3, due="2026-10-20T09:00:00+00:00", status="completed")])
+    store.add("user-2", _task(4, due="2026-10-22T09:00:00+00:00"))
+    assert sorted((user, task["id"]) for user, task in store.due_tasks()) == [("user-1", "t001"), ("user-2", "t004")]
+
+
+def test_sqlite_store_persists_across_reopen(tmp_path):
+    path = str(tmp_path / "tasks.sqlite3")
+    SQLiteTaskStore(path).add_many(USER, [_task(1, tags=["x"]), _task(2)])
+    reopened = SQLiteTaskStore(path)
+    assert _ids(reopened.list(USER, tag="x")) == ["t001"]
+
+
+def test_open_task_store_follows_env(monkeypatch, tmp_path):
+    monkeypatch.setenv("TASK_STORE", "memory")
+    assert isinstance(open_task_store(), MemoryTaskStore)
+    monkeypatch.setenv("TASK_STORE", "sqlite")
+    monkeypatch.setenv("TASK_DB_PATH", str(tmp_path / "t.sqlite3"))
+    assert isinstance(open_task_store(), SQLiteTaskStore)
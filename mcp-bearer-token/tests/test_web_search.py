@@ -0,0 +1,71 @@
+import asyncio
+
+from stand_in import Reply, StandInServer, html
+from tools import fetch_engine, web_search
+from tools.fetch_engine import FetchEngine
+
+UA = "SafeDate-test"
+
+
+def _results_page(server, paths):
+    """DuckDuckGo-style results: redirect anchors for all but the last, a direct link for that one."""
+    rows = []
+    for i, path in enumerate(paths):
+        target = server.url(path)
+        href = f"//duckduckgo.com/l/?uddg={target}" if i < len(paths) - 1 else target
+        rows.append(f'<div class="result"><h2><a class="result__a" href="{href}">Result {path}</a></h2></div>')
+    return html("".join(rows))
+
+
+def _serve(monkeypatch, server, paths):
+    server.routes["/html/"] = lambda h: _results_page(server, paths)
+    monkeypatch.setattr(web_search, "DDG_SEARCH_URL", server.url("/html/"))
+    monkeypatch.setattr(fetch_engine, "_engine", FetchEngine(parse_workers=0))
+    monkeypatch.setattr(fetch_engine, "_engine_pid", fetch_engine.os.getpid())
+    monkeypatch.setattr(fetch_engine, "html_to_markdown", lambda page: page.split("<body>")[1].split("</body>")[0])
+
+
+def test_parse_result_links_unwraps_and_dedupes():
+    page = html(
+        '<a class="result__a" href="//duckduckgo.com/l/?uddg=https%3A%2F%2Fa.example%2F&rut=x">A</a>'
+        '<a class="result__a" href="https://a.example/">A again</a>'
+        '<a class="result__a" href="javascript:void(0)">ad</a>'
+        '<a class="result__a" href="https://b.example/">B</a>'
+    ).body.decode()
+    assert web_search.parse_result_links(page, 5) == [
+        {"url": "https://a.example/", "title": "A"},
+        {"url": "https://b.example/", "title": "B"},
+    ]
+
+
+def test_pages_stream_in_completion_order_and_slow_ones_time_out(monkeypatch):
+    routes = {
+        "/slow": lambda h: Reply(200, b"<html><body>slow</body></html>", {"Content-Type": "text/html"}, delay=1.5),
+        "/medium": lambda h: Reply(200, b"<html><body>medium</body></html>", {"Content-Type": "text/html"}, delay=0.2),
+        "/fast": lambda h: html("fast"),
+        "/missing": lambda h: Reply(404, b"gone"),
+    }
+    with StandInServer(routes) as server:
+        _serve(monkeypatch, server, ["/slow", "/medium", "/fast", "/missing"])
+        streamed = []
+
+        async def on_result(item):
+            streamed.append(item["url"].rsplit("/", 1)[1])
+
+        result = asyncio.run(web_search.search_and_read("first date ideas", UA, deadline=0.8, on_result=on_result))
+
+    assert server.requests[0]["path"] == "/html/?q=first+date+ideas"
+    assert streamed[-1] == "medium" and set(streamed) == {"fast", "missing", "medium"}
+    by_path = {item["url"].rsplit("/", 1)[1]: item for item in result["results"]}
+    assert by_path["fast"]["content"] == "fast"
+    assert by_path["medium"]["content"] == "medium"
+    assert by_path["missing"]["error"] == "status code 404"
+    assert by_path["slow"]["error"] == "timed out after 0.8s"
+    assert result["elapsed_s"] < 1.5
+
+
+def test_failed_search_is_reported(monkeypatch):
+    with StandInServer({"/html/": lambda h: Reply(403, b"blocked")}) as server:
+        monkeypatch.setattr(web_search, "DDG_SEARCH_URL", server.url("/html/"))
+        result = asyncio.run(web_search.search_and_read("anything", UA))
+    assert result == {"query": "anything", "error": "Failed to perform search", "results": []}
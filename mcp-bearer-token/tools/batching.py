@@ -0,0 +1,58 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+# Receives [(index, text), ...] and returns the parsed per-item dicts, each carrying its "index"
+ClassifyChunk = Callable[[List[Tuple[int, str]]], Awaitable[List[Dict[str, Any]]]]
+
+
+def numbered_items(chunk: List[Tuple[int, str]]) -> str:
+    return "\n".join(f"[{index}] {text}" for index, text in chunk)
+
+
+async def classify_in_batches(
+    texts: List[str],
+    classify_chunk: ClassifyChunk,
+    validate: Callable[[Dict[str, Any]], bool],
+    chunk_size: int = 20,
+    max_rounds: int = 3,
+    concurrency: int = 4,
+) -> Tuple[List[Optional[Dict[str, Any]]], Dict[str, int]]:
+    """Classify many texts with several items packed into each completion.
+
+    Duplicate texts are classified once. Items whose output is missing or fails
+    `validate` (or whose whole chunk failed) are re-queued in smaller chunks for
+    up to `max_rounds` rounds; anything still unresolved comes back as None.
+    """
+    unique: Dict[str, int] = {}
+    for text in texts:
+        unique.setdefault(text, len(unique))
+    unique_texts = list(unique)
+    resolved: Dict[int, Dict[str, Any]] = {}
+    pending = list(range(len(unique_texts)))
+    semaphore = asyncio.Semaphore(concurrency)
+    stats = {"items": len(texts), "unique_items": len(unique_texts), "completions": 0, "rounds": 0}
+
+    async def run_chunk(indices: List[int]) -> None:
+        async with semaphore:
+            stats["completions"] += 1
+            try:
+                outputs = await classify_chunk([(i, unique_texts[i]) for i in indices])
+            except Exception:
+                return
+        wanted = set(indices)
+        for output in outputs:
+            index = output.get("index") if isinstance(output, dict) else None
+            if isinstance(index, str) and index.isdigit():
+                index = int(index)
+            if isinstance(index, int) and index in wanted and index not in resolved and validate(output):
+                resolved[index] = output
+
+    while pending and stats["rounds"] < max_rounds:
+        stats["rounds"] += 1
+        size = max(1, chunk_size >> (stats["rounds"] - 1))
+        chunks = [pending[i:i + size] for i in range(0, len(pending), size)]
+        await asyncio.gather(*(run_chunk(chunk) for chunk in chunks))
+        pending = [i for i in pending if i not in resolved]
+
+    stats["failed_items"] = sum(1 for text in texts if unique[text] not in resolved)
+    return [resolved.get(unique[text]) for text in texts], stats
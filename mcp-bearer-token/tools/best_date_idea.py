@@ -5,18 +5,24 @@ except Exception:
     INVALID_PARAMS = -32602  # type: ignore
     INTERNAL_ERROR = -32603  # type: ignore
 from pydantic import BaseModel, Field
-from typing import Dict, Any
-from groq import Groq
+from typing import Dict, Any, List, Optional
+from .llm import groq_client, chat_completion
+from .response_cache import cached
+from .date_idea_catalog import idea_catalog, catalog_key, CatalogKey
 import datetime, json
 
 class BestDateIdeaInput(BaseModel):
     location: str = Field(default="unknown city", description="Location for date idea")
     weather: str = Field(default="unknown weather", description="Current weather")
     budget: str = Field(default="flexible", description="Budget level (low, medium, high)")
+    puch_user_id: Optional[str] = Field(default=None, description="Caller id; ideas already shown to this user are not repeated")
 
 class BestDateIdea:
+    prompt_version = "1"
+    cache_responses = False  # randomness is the point of this tool
+
     def __init__(self, api_key: str, model: str = "llama3-70b-8192"):
-        self.client = Groq(api_key=api_key)
+        self.client = groq_client(api_key)
         self.model = model
         self.name = "best_date_idea"
         self.description = "Suggest a unique and fun date idea for tonight"
@@ -32,21 +38,53 @@ class BestDateIdea:
         Example structure:
         {{"title":"...","description":"...","bonus_tip":"..."}}
         """
-        try:
-            chat_completion = self.client.chat.completions.create(
+        async def complete() -> Dict[str, str]:
+            content = await chat_completion(
+                self.client,
                 model=self.model,
                 messages=[{"role": "system", "content": "Output ONLY strict JSON."}, {"role": "user", "content": prompt}],
                 temperature=0.9,
                 max_tokens=300,
             )
-            return json.loads(chat_completion.choices[0].message.content)
+            return json.loads(content)
+
+        try:
+            return await cached(self.name, self.model, self.prompt_version, f"{location}|{weather}|{budget}", complete, enabled=self.cache_responses)
         except (json.JSONDecodeError, KeyError, Exception) as e:
             raise McpError(ErrorData(code=INTERNAL_ERROR, message=f"LLM suggestion failed: {str(e)}"))
 
+    async def _llm_batch(self, key: CatalogKey, count: int) -> List[Dict[str, str]]:
+        """Generate `count` distinct ideas for one catalog pool in a single completion."""
+        city, weather, budget, weekday = key
+        prompt = f"""
+        You are a quirky Date Idea Generator.
+        It's a {weekday} evening, location: {city}, weather: {weather}, budget: {budget}.
+        Suggest {count} different unique, fun, slightly unconventional date ideas for tonight.
+        Make every idea clearly distinct from the others. Keep them playful and screenshot-worthy.
+        Respond ONLY with a strict JSON object: {{"ideas":[{{"title":"...","description":"... (<=40 words)","bonus_tip":"..."}}]}}
+        """
+        content = await chat_completion(
+            self.client,
+            model=self.model,
+            messages=[{"role": "system", "content": "Output ONLY strict JSON."}, {"role": "user", "content": prompt}],
+            temperature=1.0,
+            max_tokens=120 * count,
+            response_format={"type": "json_object"},
+        )
+        ideas = json.loads(content).get("ideas", [])
+        return [idea for idea in ideas if isinstance(idea, dict) and idea.get("title") and idea.get("description")]
+
     async def run(self, inputs: Dict[str, Any]) -> Dict[str, Any]:
         try:
             validated = BestDateIdeaInput(**inputs)
         except ValueError as e:
             raise McpError(ErrorData(code=INVALID_PARAMS, message=str(e)))
-        suggestion = await self._llm_suggestion(validated.location, validated.weather, validated.budget)
-        return {"title": suggestion.get("title"), "description": suggestion.get("description"), "bonus_tip": suggestion.get("bonus_tip"), "share_text": f"Tonight's date idea: {suggestion.get('title')} 💡 — {suggestion.get('description')} #SafeDateIdeas"}
\ No newline at end of file
+        key = catalog_key(validated.location, validated.weather, validated.budget)
+        suggestion = idea_catalog.take(key, validated.puch_user_id)
+        idea_catalog.refill_if_low(key, self._llm_batch, force=suggestion is None)
+        source = "catalog"
+        if suggestion is None:
+            # Cold pool, or this user has seen all of it: answer live while the refill runs
+            suggestion = await self._llm_suggestion(validated.location, validated.weather, validated.budget)
+            source = "llm"
+        return {"title": suggestion.get("title"), "description": suggestion.get("description"), "bonus_tip": suggestion.get("bonus_tip"), "source": source, "share_text": f"Tonight's date idea: {suggestion.get('title')} 💡 — {suggestion.get('description')} #SafeDateIdeas"}
\ No newline at end of file
@@ -5,9 +5,15 @@ except Exception:
     INVALID_PARAMS = -32602  # type: ignore
     INTERNAL_ERROR = -32603  # type: ignore
 from pydantic import BaseModel, Field
-from typing import Dict, Any, List
-from groq import Groq
-import httpx
+from typing import Dict, Any, List, Optional
+from .llm import groq_client, stream_chat_completion, PartialCallback
+from .clients import registry
+from .geo_cache import places_cache, places_results, parse_lat_lon
+from .metrics import upstream_call, record_payload
+from .resilience import upstream
+import os
+
+RESTAURANT_TILE_TTL = float(os.environ.get("PLACES_RESTAURANT_TTL", str(24 * 3600)))
 
 class BestRestaurantsNearMeInput(BaseModel):
     location: str = Field(..., min_length=1, description="Location for restaurant search (e.g., 'New York, NY' or '40.7128,-74.0060')")
@@ -15,29 +21,44 @@ class BestRestaurantsNearMeInput(BaseModel):
 class BestRestaurantsNearMe:
     def __init__(self, google_api_key: str, groq_api_key: str, model: str = "llama3-70b-8192"):
         self.google_api_key = google_api_key
-        self.groq_client = Groq(api_key=groq_api_key)
+        self.groq_client = groq_client(groq_api_key)
         self.model = model
         self.name = "best_restaurants_near_me"
         self.description = "Find top romantic restaurants near a location using Google Places API"
 
     async def _fetch_restaurants(self, location: str) -> List[Dict[str, Any]]:
+        coords = parse_lat_lon(location)
+        if coords is None:
+            return await self._places_nearbysearch(location, 5000)
+        lat, lon = coords
+        return await places_cache.nearby(
+            lat, lon, "restaurant", "romantic", 5000, RESTAURANT_TILE_TTL,
+            lambda tile_lat, tile_lon, radius: self._places_nearbysearch(f"{tile_lat},{tile_lon}", radius),
+        )
+
+    async def _places_nearbysearch(self, location: str, radius: int) -> List[Dict[str, Any]]:
         url = "https://maps.googleapis.com/maps/api/place/nearbysearch/json"
         params = {
             "location": location,
-            "radius": 5000,
+            "radius": radius,
             "type": "restaurant",
             "keyword": "romantic",
             "key": self.google_api_key
         }
-        async with httpx.AsyncClient() as client:
-            try:
-                res = await client.get(url, params=params, timeout=10)
+        async def attempt(timeout: float):
+            async with upstream_call("google_places"):
+                res = await registry.http("google_places").get(url, params=params, timeout=timeout)
                 res.raise_for_status()
-                return res.json().get("results", [])
-            except Exception as e:
-                raise McpError(ErrorData(code=INTERNAL_ERROR, message=f"Google Places API failed: {str(e)}"))
+            return res
+
+        try:
+            res = await upstream("google_places", 10).call(attempt, idempotent=True)
+            record_payload("google_places", len(res.content))
+            return places_results(res.json())
+        except Exception as e:
+            raise McpError(ErrorData(code=INTERNAL_ERROR, message=f"Google Places API failed: {str(e)}"))
 
-    async def _llm_filter_and_style(self, restaurants: List[Dict[str, Any]]) -> str:
+    async def _llm_filter_and_style(self, restaurants: List[Dict[str, Any]], on_partial: Optional[PartialCallback] = None) -> str:
         restaurant_info = "\n".join([
             f"{r['name']} - {r.get('vicinity', '')}, Rating: {r.get('rating', '?')} stars"
             for r in restaurants
@@ -54,20 +75,22 @@ class BestRestaurantsNearMe:
         Output ONLY the formatted recommendations text. No introductory or closing phrases.
         """
         try:
-            completion = self.groq_client.chat.completions.create(
+            content = await stream_chat_completion(
+                self.groq_client,
                 model=self.model,
                 messages=[
                     {"role": "system", "content": "Respond with ONLY the requested formatted content. No extra sentences."},
                     {"role": "user", "content": prompt}
                 ],
                 temperature=0.8,
-                max_tokens=500
+                max_tokens=500,
+                on_partial=on_partial,
             )
-            return completion.choices[0].message.content
+            return content
         except Exception as e:
             raise McpError(ErrorData(code=INTERNAL_ERROR, message=f"LLM filtering failed: {str(e)}"))
 
-    async def run(self, inputs: Dict[str, Any]) -> Dict[str, Any]:
+    async def run(self, inputs: Dict[str, Any], on_partial: Optional[PartialCallback] = None) -> Dict[str, Any]:
         try:
             validated = BestRestaurantsNearMeInput(**inputs)
         except ValueError as e:
@@ -77,7 +100,7 @@ class BestRestaurantsNearMe:
         if not restaurants:
             raise McpError(ErrorData(code=INTERNAL_ERROR, message="No restaurants found"))
 
-        curated_list = await self._llm_filter_and_style(restaurants)
+        curated_list = await self._llm_filter_and_style(restaurants, on_partial)
 
         return {
             "location": validated.location,
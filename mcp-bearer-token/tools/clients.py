@@ -0,0 +1,64 @@
+import os
+from typing import Dict, TYPE_CHECKING
+import httpx
+
+if TYPE_CHECKING:  # groq is imported on first use to keep server start-up light
+    from groq import AsyncGroq
+
+# Upstream hosts that get their own keep-alive pool.
+UPSTREAMS = ("google_places", "tavily", "giphy", "groq", "duckduckgo", "web")
+
+
+def _env_number(name: str, default: float) -> float:
+    value = os.environ.get(name)
+    return float(value) if value else default
+
+
+def pool_limits(upstream: str) -> httpx.Limits:
+    """Pool limits for an upstream, e.g. HTTP_POOL_TAVILY_MAX_CONNECTIONS overrides HTTP_POOL_MAX_CONNECTIONS."""
+    def setting(key: str, default: float) -> float:
+        return _env_number(f"HTTP_POOL_{upstream.upper()}_{key}", _env_number(f"HTTP_POOL_{key}", default))
+
+    return httpx.Limits(
+        max_connections=int(setting("MAX_CONNECTIONS", 50)),
+        max_keepalive_connections=int(setting("MAX_KEEPALIVE", 10)),
+        keepalive_expiry=setting("KEEPALIVE_EXPIRY", 60.0),
+    )
+
+
+class ClientRegistry:
+    """Process-wide pooled HTTP and Groq clients that tools borrow instead of building per call."""
+
+    def __init__(self):
+        self._pid = os.getpid()
+        self._http: Dict[str, httpx.AsyncClient] = {}
+        self._groq: Dict[str, "AsyncGroq"] = {}
+
+    def http(self, upstream: str) -> httpx.AsyncClient:
+        if upstream not in UPSTREAMS:
+            raise KeyError(f"Unknown upstream: {upstream}")
+        if self._pid != os.getpid():
+            # Forked worker: connections inherited from the parent must not be shared
+            self._pid, self._http, self._groq = os.getpid(), {}, {}
+        client = self._http.get(upstream)
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(limits=pool_limits(upstream))
+            self._http[upstream] = client
+        return client
+
+    def groq(self, api_key: str) -> "AsyncGroq":
+        client = self._groq.get(api_key)
+        if client is None:
+            from groq import AsyncGroq
+            client = AsyncGroq(api_key=api_key, http_client=self.http("groq"))
+            self._groq[api_key] = client
+        return client
+
+    async def aclose(self) -> None:
+        clients, self._http = list(self._http.values()), {}
+        self._groq = {}
+        for client in clients:
+            await client.aclose()
+
+
+registry = ClientRegistry()
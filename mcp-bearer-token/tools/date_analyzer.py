@@ -5,16 +5,26 @@ except Exception:
     INVALID_PARAMS = -32602  # type: ignore
     INTERNAL_ERROR = -32603  # type: ignore
 from pydantic import BaseModel, Field
-from typing import Dict, Any
-from groq import Groq
+from typing import Dict, Any, List, Tuple, Annotated
+from .llm import groq_client, chat_completion
+from .response_cache import cached
+from .batching import classify_in_batches, numbered_items
 import json
 
 class DateAnalyzerInput(BaseModel):
     conversation: str = Field(..., min_length=1, max_length=1000, description="Conversation text to analyze for manipulation")
 
+class DateAnalyzerBatchInput(BaseModel):
+    conversations: List[Annotated[str, Field(min_length=1, max_length=1000)]] = Field(..., min_length=1, max_length=200, description="Conversations to analyze")
+
 class DateAnalyzer:
+    prompt_version = "1"
+    llm_priority = "safety"  # served first when the Groq budget is tight
+    cache_responses = True
+    batch_chunk_size = 8
+
     def __init__(self, api_key: str, model: str = "llama3-70b-8192"):
-        self.client = Groq(api_key=api_key)
+        self.client = groq_client(api_key)
         self.model = model
         self.name = "date_analyzer"
         self.description = "Detect manipulation in date conversations like gaslighting or love bombing"
@@ -29,14 +39,19 @@ class DateAnalyzer:
         Example structure:
         {{"manipulations_detected":["gaslighting"],"confidence":85,"explanation":"..."}}
         """
-        try:
-            chat_completion = self.client.chat.completions.create(
+        async def complete() -> Dict[str, Any]:
+            content = await chat_completion(
+                self.client,
+                priority=self.llm_priority,
                 model=self.model,
                 messages=[{"role": "system", "content": "Output ONLY strict JSON."}, {"role": "user", "content": prompt}],
                 temperature=0.8,
                 max_tokens=400,
             )
-            return json.loads(chat_completion.choices[0].message.content)
+            return json.loads(content)
+
+        try:
+            return await cached(self.name, self.model, self.prompt_version, conversation, complete, enabled=self.cache_responses)
         except (json.JSONDecodeError, KeyError, Exception) as e:
             raise McpError(ErrorData(code=INTERNAL_ERROR, message=f"LLM analysis failed: {str(e)}"))
 
@@ -51,4 +66,59 @@ class DateAnalyzer:
             "confidence": analysis.get("confidence", 0),
             "explanation": analysis.get("explanation", ""),
             "share_text": f"Date analysis: {', '.join(analysis.get('manipulations_detected', []))} detected! ⚠️ #SafeDateAnalyzer",
-        }
\ No newline at end of file
+        }
+
+    async def _llm_batch(self, chunk: List[Tuple[int, str]]) -> List[Dict[str, Any]]:
+        prompt = f"""
+        Analyze EACH numbered conversation below for signs of manipulation.
+        Detect gaslighting, love bombing, white-knighting.
+        Conversations:
+        ---
+        {numbered_items(chunk)}
+        ---
+        Return ONLY a strict JSON object (no markdown) with one entry per conversation:
+        {{"results": [{{"index": <conversation number>, "manipulations_detected": ["..."], "confidence": <0-100>, "explanation": "..."}}]}}
+        """
+        content = await chat_completion(
+            self.client,
+            priority=self.llm_priority,
+            model=self.model,
+            messages=[{"role": "system", "content": "Output ONLY strict JSON."}, {"role": "user", "content": prompt}],
+            temperature=0.3,
+            max_tokens=120 * len(chunk) + 50,
+            response_format={"type": "json_object"},
+        )
+        return json.loads(content).get("results", [])
+
+    @staticmethod
+    def _valid_batch_item(item: Dict[str, Any]) -> bool:
+        detected = item.get("manipulations_detected")
+        return (
+            isinstance(detected, list)
+            and all(isinstance(d, str) for d in detected)
+            and isinstance(item.get("confidence"), (int, float))
+            and 0 <= item["confidence"] <= 100
+        )
+
+    async def run_batch(self, inputs: Dict[str, Any]) -> Dict[str, Any]:
+        try:
+            validated = DateAnalyzerBatchInput(**inputs)
+        except ValueError as e:
+            raise McpError(ErrorData(code=INVALID_PARAMS, message=str(e)))
+
+        outputs, stats = await classify_in_batches(
+            validated.conversations, self._llm_batch, self._valid_batch_item, chunk_size=self.batch_chunk_size
+        )
+        results: List[Dict[str, Any]] = []
+        for index, output in enumerate(outputs):
+            if output is None:
+                results.append({"index": index, "error": "Could not analyze this conversation"})
+                continue
+            results.append({
+                "index": index,
+                "manipulations_detected": output["manipulations_detected"],
+                "confidence": output["confidence"],
+                "explanation": output.get("explanation", ""),
+            })
+        flagged = sum(1 for r in results if r.get("manipulations_detected"))
+        return {"results": results, "flagged": flagged, "stats": stats}
@@ -0,0 +1,213 @@
+import asyncio
+import datetime
+import itertools
+import os
+import random
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, List, Optional, Set, Tuple
+from .metrics import record_cache
+from .tavily_cache import normalize_city, normalize_phrase
+
+DATE_IDEA_POOL_SIZE = int(os.environ.get("DATE_IDEA_POOL_SIZE", "12"))
+# Refill a pool in the background once fewer than this many ideas are left
+DATE_IDEA_LOW_WATER = int(os.environ.get("DATE_IDEA_LOW_WATER", "4"))
+# Each idea goes to at most this many different users before it is retired
+DATE_IDEA_MAX_SERVES = int(os.environ.get("DATE_IDEA_MAX_SERVES", "3"))
+DATE_IDEA_MAX_POOLS = int(os.environ.get("DATE_IDEA_MAX_POOLS", "2048"))
+DATE_IDEA_MAX_USERS = int(os.environ.get("DATE_IDEA_MAX_USERS", "10000"))
+
+WEATHER_BUCKETS = (
+    ("rainy", ("rain", "drizzle", "shower", "storm", "thunder", "monsoon")),
+    ("snowy", ("snow", "sleet", "blizzard", "ice", "icy")),
+    ("hot", ("hot", "heat", "humid", "scorching", "summer")),
+    ("cold", ("cold", "chilly", "freezing", "winter")),
+    ("cloudy", ("cloud", "overcast", "grey", "gray", "fog", "mist")),
+    ("clear", ("sun", "clear", "warm", "nice", "pleasant", "mild")),
+)
+BUDGET_TIERS = (
+    ("low", ("low", "cheap", "free", "budget", "broke")),
+    ("high", ("high", "luxury", "fancy", "splurge", "expensive")),
+    ("medium", ("medium", "mid", "moderate", "average")),
+)
+
+# Budget tiers pre-generated for every seeded city and weather bucket
+SEED_BUDGETS = ("low", "medium", "high", "flexible")
+
+# (city, weather bucket, budget tier, weekday)
+CatalogKey = Tuple[str, str, str, str]
+# (key, count) -> freshly generated ideas with title/description/bonus_tip
+IdeaGenerator = Callable[[CatalogKey, int], Awaitable[List[Dict[str, str]]]]
+
+
+def _bucket(text: str, buckets: Tuple[Tuple[str, Tuple[str, ...]], ...], default: str) -> str:
+    # Prefix match per word: "rainy" hits "rain" but "nice" does not hit "ice"
+    tokens = normalize_phrase(text).split()
+    for bucket, words in buckets:
+        if any(token.startswith(word) for token in tokens for word in words):
+            return bucket
+    return default
+
+
+def weather_bucket(weather: str) -> str:
+    return _bucket(weather, WEATHER_BUCKETS, "any")
+
+
+def budget_tier(budget: str) -> str:
+    dollars = budget.count("$")
+    if dollars:
+        return ("low", "medium", "high")[min(dollars, 3) - 1]
+    return _bucket(budget, BUDGET_TIERS, "flexible")
+
+
+def catalog_key(location: str, weather: str, budget: str, when: Optional[datetime.date] = None) -> CatalogKey:
+    weekday = (when or datetime.date.today()).strftime("%A")
+    return normalize_city(location), weather_bucket(weather), budget_tier(budget), weekday
+
+
+def seed_keys(cities: List[str], weathers: List[str], when: datetime.date) -> List[CatalogKey]:
+    """Every budget tier for each city and weather bucket on the weekday of `when`."""
+    return [
+        catalog_key(city, weather, budget, when)
+        for city in cities
+        for weather in weathers
+        for budget in SEED_BUDGETS
+    ]
+
+
+def seconds_until_midnight(now: datetime.datetime) -> float:
+    midnight = datetime.datetime.combine(now.date() + datetime.timedelta(days=1), datetime.time(), now.tzinfo)
+    return (midnight - now).total_seconds()
+
+
+class _Idea:
+    __slots__ = ("id", "idea", "serves")
+
+    def __init__(self, idea_id: int, idea: Dict[str, str]):
+        self.id = idea_id
+        self.idea = idea
+        self.serves = 0
+
+
+class _Pool:
+    __slots__ = ("ideas", "refill")
+
+    def __init__(self):
+        self.ideas: List[_Idea] = []
+        self.refill: Optional[asyncio.Task] = None
+
+
+class DateIdeaCatalog:
+    """Pre-generated date ideas per (city, weather bucket, budget tier, weekday).
+
+    Serving is a dict lookup plus a random pick, with no LLM call. A user never
+    gets the same idea twice (tracked by puch_user_id), and every idea is retired
+    after `max_serves` users. Pools that drop below `low_water` are refilled by
+    one batched completion in the background. Cold keys, and users who have
+    seen the whole pool, get None: the caller answers live and forces a refill.
+    """
+
+    def __init__(
+        self,
+        pool_size: int = DATE_IDEA_POOL_SIZE,
+        low_water: int = DATE_IDEA_LOW_WATER,
+        max_serves: int = DATE_IDEA_MAX_SERVES,
+        max_pools: int = DATE_IDEA_MAX_POOLS,
+        max_users: int = DATE_IDEA_MAX_USERS,
+    ):
+        self.pool_size = pool_size
+        self.low_water = low_water
+        self.max_serves = max_serves
+        self.max_pools = max_pools
+        self.max_users = max_users
+        self._pools: "OrderedDict[CatalogKey, _Pool]" = OrderedDict()
+        self._seen: "OrderedDict[str, Set[int]]" = OrderedDict()
+        self._ids = itertools.count()
+
+    def _pool(self, key: CatalogKey) -> _Pool:
+        pool = self._pools.get(key)
+        if pool is None:
+            pool = self._pools[key] = _Pool()
+            while len(self._pools) > self.max_pools:
+                self._pools.popitem(last=False)
+        self._pools.move_to_end(key)
+        return pool
+
+    def _seen_by(self, user_id: Optional[str]) -> Optional[Set[int]]:
+        if not user_id:
+            return None
+        seen = self._seen.get(user_id)
+        if seen is None:
+            seen = self._seen[user_id] = set()
+            while len(self._seen) > self.max_users:
+                self._seen.popitem(last=False)
+        self._seen.move_to_end(user_id)
+        return seen
+
+    def take(self, key: CatalogKey, user_id: Optional[str] = None) -> Optional[Dict[str, str]]:
+        pool = self._pool(key)
+        seen = self._seen_by(user_id)
+        candidates = [item for item in pool.ideas if seen is None or item.id not in seen]
+        if not candidates:
+            record_cache("date_ideas", "misses")
+            return None
+        record_cache("date_ideas", "hits")
+        item = random.choice(candidates)
+        item.serves += 1
+        if seen is not None:
+            seen.add(item.id)
+        if item.serves >= self.max_serves:
+            pool.ideas.remove(item)
+        return item.idea
+
+    def refill_if_low(self, key: CatalogKey, generate: IdeaGenerator, force: bool = False) -> Optional[asyncio.Task]:
+        """Top the pool up in the background; `force` adds ideas even to a full pool."""
+        pool = self._pool(key)
+        if pool.refill is not None and not pool.refill.done():
+            return pool.refill
+        if len(pool.ideas) >= self.low_water and not force:
+            return None
+        missing = max(self.pool_size - len(pool.ideas), self.low_water)
+
+        async def refill() -> None:
+            ideas = await generate(key, missing)
+            pool.ideas.extend(_Idea(next(self._ids), idea) for idea in ideas)
+
+        pool.refill = asyncio.ensure_future(refill())
+        # Refills run unattended; a failed one is simply retried on the next request
+        pool.refill.add_done_callback(lambda t: t.cancelled() or t.exception())
+        return pool.refill
+
+    async def seed(self, keys: List[CatalogKey], generate: IdeaGenerator, concurrency: int = 4) -> None:
+        """Pre-generate pools (e.g. popular cities at start-up) so first requests are warm."""
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def fill(key: CatalogKey) -> None:
+            async with semaphore:
+                task = self.refill_if_low(key, generate)
+                if task is not None:
+                    await asyncio.gather(task, return_exceptions=True)
+
+        await asyncio.gather(*(fill(key) for key in keys))
+
+    async def keep_seeded(
+        self,
+        cities: List[str],
+        weathers: List[str],
+        generate: IdeaGenerator,
+        now: Callable[[], datetime.datetime] = datetime.datetime.now,
+        sleep: Callable[[float], Awaitable[None]] = asyncio.sleep,
+    ) -> None:
+        """Seed today's and tomorrow's pools, then tomorrow's again after each midnight.
+
+        Keys carry the weekday, so a single start-up seed goes cold at midnight.
+        Seeding a day ahead means the new day's pools are already full when it
+        starts. Runs until cancelled.
+        """
+        while True:
+            today = now().date()
+            tomorrow = today + datetime.timedelta(days=1)
+            await self.seed(seed_keys(cities, weathers, today) + seed_keys(cities, weathers, tomorrow), generate)
+            await sleep(seconds_until_midnight(now()) + 1)
+
+
+idea_catalog = DateIdeaCatalog()
@@ -7,46 +7,46 @@ except Exception:
     INTERNAL_ERROR = -32603  # type: ignore
 from pydantic import BaseModel, Field
 from typing import Dict, Any
-from groq import Groq
-import json, base64, io
-from PIL import Image, ImageDraw, ImageFont
+from .llm import groq_client, chat_completion
+from .response_cache import cached
+from .meme_renderer import render_meme
+import asyncio
 
 class DateMemeGeneratorInput(BaseModel):
     text: str = Field(..., min_length=1, max_length=500, description="Text or conversation to base meme on")
     vibe: str = Field(default="funny", description="Desired meme vibe (e.g., funny, romantic)")
 
 class DateMemeGenerator:
+    prompt_version = "1"
+    llm_priority = "entertainment"  # yields the Groq budget to safety checks
+    cache_responses = False  # randomness is the point of this tool
+
     def __init__(self, api_key: str, model: str = "llama3-70b-8192"):
-        self.client = Groq(api_key=api_key)
+        self.client = groq_client(api_key)
         self.model = model
         self.name = "date_meme_generator"
         self.description = "Generate a meme based on date or conversation with LLM caption"
 
     async def _llm_caption(self, text: str, vibe: str) -> str:
         prompt = f"Generate a short meme caption (max 15 words). Text: {text} | Vibe: {vibe}. Return ONLY the caption text with no quotes, no markdown." 
-        try:
-            chat_completion = self.client.chat.completions.create(
+        async def complete() -> str:
+            content = await chat_completion(
+                self.client,
+                priority=self.llm_priority,
                 model=self.model,
                 messages=[{"role": "system", "content": "Return ONLY the caption text."}, {"role": "user", "content": prompt}],
                 temperature=0.9,
                 max_tokens=100,
             )
-            return chat_completion.choices[0].message.content.strip()
+            return content.strip()
+
+        try:
+            return await cached(self.name, self.model, self.prompt_version, f"{vibe}|{text}", complete, enabled=self.cache_responses)
         except Exception as e:
             raise McpError(ErrorData(code=INTERNAL_ERROR, message=f"LLM caption failed: {str(e)}"))
 
     def _generate_meme_image(self, caption: str) -> ImageContent:
-        img = Image.new("RGB", (400, 200), color="#FFFFFF")
-        draw = ImageDraw.Draw(img)
-        try:
-            font = ImageFont.truetype("arial.ttf", 20)
-        except:  # noqa
-            font = ImageFont.load_default()
-        draw.text((10, 10), caption[:100], fill="#000000", font=font)
-        draw.text((10, 150), "#SafeDateMeme", fill="#FF6B6B", font=font)
-        buf = io.BytesIO()
-        img.save(buf, format="PNG")
-        return ImageContent(type="image", mimeType="image/png", data=base64.b64encode(buf.getvalue()).decode("utf-8"))
+        return render_meme("date_meme", [caption[:100]])
 
     async def run(self, inputs: Dict[str, Any]) -> Dict[str, Any]:
         try:
@@ -54,5 +54,5 @@ class DateMemeGenerator:
         except ValueError as e:
             raise McpError(ErrorData(code=INVALID_PARAMS, message=str(e)))
         caption = await self._llm_caption(validated.text, validated.vibe)
-        meme = self._generate_meme_image(caption)
+        meme = await asyncio.to_thread(self._generate_meme_image, caption)
         return {"caption": caption, "meme": meme, "share_text": f"{caption} 😂 #SafeDateMeme"}
\ No newline at end of file
@@ -0,0 +1,121 @@
+import functools
+import json
+import os
+import re
+import zlib
+from typing import Any, Dict, List, Optional, Tuple
+
+MODEL_PATH = os.path.join(os.path.dirname(__file__), "data", "dm_prefilter.json")
+_TOKEN = re.compile(r"[a-z0-9']+")
+
+LOCAL_SUMMARIES = {
+    "Harmless": ("Totally normal hello", "Short, friendly message with no risky signals."),
+    "Run": ("Block and report", "Matches a high-risk pattern: {signals}."),
+}
+
+
+class DMPrefilter:
+    """In-process first tier for DMRiskMeter.
+
+    Compiled run/risk regex sets plus a hashed uni+bigram linear model loaded
+    from data/dm_prefilter.json. It only answers when confident: "Run" on an
+    explicit threat pattern, and, once measured, "Run" for a risky signal with
+    a high score and "Harmless" for short messages with a low score and no
+    risky signal. Everything else returns None and goes to the LLM.
+
+    The two score-based answers stay off until bench/eval_dm_prefilter.py has
+    measured them against LLM labels. "Harmless" needs an agreement of at
+    least `min_harmless_agreement` over `min_harmless_samples` local answers,
+    with no message the LLM rated "Run" or "Borderline creepy" among them; the
+    scored "Run" needs `min_scored_run_agreement` over `min_scored_run_samples`.
+    """
+
+    def __init__(self, model: Dict[str, Any]):
+        self.buckets = model["buckets"]
+        evaluation = model.get("evaluation") or {}
+        self.harmless_enabled = (
+            evaluation.get("label_source") == "llm"
+            and (evaluation.get("harmless_agreement") or 0.0) >= model["min_harmless_agreement"]
+            and evaluation.get("harmless_samples", 0) >= model["min_harmless_samples"]
+            and evaluation.get("harmless_unsafe", 1) == 0
+        )
+        self.scored_run_enabled = (
+            evaluation.get("label_source") == "llm"
+            and (evaluation.get("scored_run_agreement") or 0.0) >= model["min_scored_run_agreement"]
+            and evaluation.get("scored_run_samples", 0) >= model["min_scored_run_samples"]
+        )
+        self.bias = model["bias"]
+        self.harmless_below = model["harmless_below"]
+        self.run_above = model["run_above"]
+        self.max_harmless_chars = model["max_harmless_chars"]
+        self.run_patterns = [(name, re.compile(p, re.I)) for name, p in model["run_patterns"].items()]
+        self.risk_pattern = re.compile(
+            "|".join(f"(?P<{name}>{p})" for name, p in model["risk_patterns"].items()), re.I
+        )
+        self.weights = [0.0] * self.buckets
+        for ngram, weight in model["ngram_weights"].items():
+            self.weights[self._bucket(ngram)] += weight
+
+    def _bucket(self, feature: str) -> int:
+        return zlib.crc32(feature.encode("utf-8")) % self.buckets
+
+    def score(self, text: str) -> float:
+        tokens = _TOKEN.findall(text.lower())
+        total = self.bias
+        weights, bucket = self.weights, self._bucket
+        for i, token in enumerate(tokens):
+            total += weights[bucket(token)]
+            if i:
+                total += weights[bucket(f"{tokens[i - 1]} {token}")]
+        return total
+
+    def risk_signals(self, text: str) -> List[str]:
+        return sorted({m.lastgroup for m in self.risk_pattern.finditer(text) if m.lastgroup})
+
+    def run_hits(self, text: str) -> List[str]:
+        """Names of the explicit threat patterns in `text`."""
+        return [name for name, pattern in self.run_patterns if pattern.search(text)]
+
+    def classify(
+        self,
+        text: str,
+        allow_harmless: Optional[bool] = None,
+        allow_scored_run: Optional[bool] = None,
+    ) -> Optional[Tuple[str, List[str], float]]:
+        """Return (risk_level, signals, score) when confident, else None.
+
+        `allow_harmless` and `allow_scored_run` override the evaluation gates
+        (used by the eval script).
+        """
+        run_hits = self.run_hits(text)
+        score = self.score(text)
+        if run_hits:
+            return "Run", run_hits, score
+        signals = self.risk_signals(text)
+        scored_run_ok = self.scored_run_enabled if allow_scored_run is None else allow_scored_run
+        if scored_run_ok and signals and score >= self.run_above:
+            return "Run", signals, score
+        harmless_ok = self.harmless_enabled if allow_harmless is None else allow_harmless
+        if harmless_ok and not signals and score <= self.harmless_below and len(text) <= self.max_harmless_chars:
+            return "Harmless", [], score
+        return None
+
+    def analysis(self, text: str) -> Optional[Dict[str, Any]]:
+        """Local answer in DMRiskMeter's LLM output shape, or None to escalate."""
+        verdict = self.classify(text)
+        if verdict is None:
+            return None
+        risk_level, signals, score = verdict
+        summary, reasoning = LOCAL_SUMMARIES[risk_level]
+        return {
+            "risk_level": risk_level,
+            "three_word_summary": summary,
+            "reasoning": reasoning.format(signals=", ".join(signals)),
+            "local_score": round(score, 2),
+        }
+
+
+@functools.lru_cache(maxsize=1)
+def load_prefilter(path: str = MODEL_PATH) -> DMPrefilter:
+    with open(path, encoding="utf-8") as f:
+        return DMPrefilter(json.load(f))
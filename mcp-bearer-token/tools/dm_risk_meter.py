@@ -5,21 +5,50 @@ except Exception:
     INVALID_PARAMS = -32602  # type: ignore
     INTERNAL_ERROR = -32603  # type: ignore
 from pydantic import BaseModel, Field
-from typing import Dict, Any
-from groq import Groq
-import json
+from typing import Dict, Any, List, Tuple, Annotated
+from .llm import groq_client, chat_completion
+from .response_cache import cached
+from .batching import classify_in_batches, numbered_items
+from .dm_prefilter import load_prefilter
+from .metrics import metrics
+import json, os
+
+# Answer confident messages in-process and only escalate ambiguous ones to Groq
+DM_LOCAL_TIER = os.environ.get("DM_LOCAL_TIER", "1") != "0"
+
+RISK_LEVELS = ["Harmless", "Flirty but fine", "Weird but safe", "Borderline creepy", "Run"]
+
+def danger_gauge(risk_level: str) -> str:
+    index = RISK_LEVELS.index(risk_level) if risk_level in RISK_LEVELS else 0
+    return "🟢" * (index + 1) + "🔴" * (4 - index)
 
 class DMRiskMeterInput(BaseModel):
     dm_text: str = Field(..., min_length=1, max_length=500, description="DM text to analyze")
     raw: bool = Field(default=False, description="Return raw analysis if True")
 
+class DMRiskMeterBatchInput(BaseModel):
+    dm_texts: List[Annotated[str, Field(min_length=1, max_length=500)]] = Field(..., min_length=1, max_length=300, description="DM texts to analyze")
+
 class DMRiskMeter:
+    prompt_version = "1"
+    llm_priority = "safety"
+    cache_responses = True
+    batch_chunk_size = 20
+    local_tier = DM_LOCAL_TIER
+
     def __init__(self, api_key: str, model: str = "llama3-70b-8192"):
-        self.client = Groq(api_key=api_key)
+        self.client = groq_client(api_key)
         self.model = model
         self.name = "dm_risk_meter"
         self.description = "Rate unsolicited DMs for creepiness or risk with a danger gauge"
 
+    def _local_analysis(self, dm_text: str) -> Dict[str, Any] | None:
+        if not self.local_tier:
+            return None
+        result = load_prefilter().analysis(dm_text)
+        metrics.inc("dm_prefilter_total", {"outcome": result["risk_level"] if result else "escalated"})
+        return result
+
     async def _llm_analysis(self, dm_text: str) -> Dict[str, str]:
         prompt = f"""
         You are an expert in reading between the lines of unsolicited DMs.
@@ -40,8 +69,10 @@ class DMRiskMeter:
         }}
         """
 
-        try:
-            chat_completion = self.client.chat.completions.create(
+        async def complete() -> Dict[str, str]:
+            content = await chat_completion(
+                self.client,
+                priority=self.llm_priority,
                 model=self.model,
                 messages=[
                     {"role": "system", "content": "Return ONLY strict JSON. No extra commentary."},
@@ -51,7 +82,10 @@ class DMRiskMeter:
                 max_tokens=300
             )
             import json as _json
-            return _json.loads(chat_completion.choices[0].message.content)
+            return _json.loads(content)
+
+        try:
+            return await cached(self.name, self.model, self.prompt_version, dm_text, complete, enabled=self.cache_responses)
         except (json.JSONDecodeError, KeyError, Exception) as e:
             raise McpError(ErrorData(code=INTERNAL_ERROR, message=f"LLM analysis failed: {str(e)}"))
 
@@ -61,19 +95,83 @@ class DMRiskMeter:
         except ValueError as e:
             raise McpError(ErrorData(code=INVALID_PARAMS, message=str(e)))
 
-        result = await self._llm_analysis(validated.dm_text)
+        result = self._local_analysis(validated.dm_text)
+        answered_by = "local"
+        if result is None:
+            result = await self._llm_analysis(validated.dm_text)
+            answered_by = "llm"
 
         if validated.raw:
-            return result
-
-        levels = ["Harmless", "Flirty but fine", "Weird but safe", "Borderline creepy", "Run"]
-        index = levels.index(result.get("risk_level", levels[0])) if result.get("risk_level") in levels else 0
-        gauge = "🟢" * (index + 1) + "🔴" * (4 - index)
+            return {**result, "answered_by": answered_by}
 
         return {
             "risk_level": result.get("risk_level"),
             "three_word_summary": result.get("three_word_summary"),
             "reasoning": result.get("reasoning"),
-            "danger_gauge": gauge,
+            "danger_gauge": danger_gauge(result.get("risk_level")),
+            "answered_by": answered_by,
             "share_text": f"DM Risk: {result.get('risk_level')} 🚨 — {result.get('three_word_summary')} #SafeDateRisk"
-        }
\ No newline at end of file
+        }
+
+    async def _llm_batch(self, chunk: List[Tuple[int, str]]) -> List[Dict[str, Any]]:
+        prompt = f"""
+        You are an expert in reading between the lines of unsolicited DMs.
+        Classify EACH numbered DM below as one of: "Harmless", "Flirty but fine", "Weird but safe", "Borderline creepy", "Run".
+        DMs:
+        ---
+        {numbered_items(chunk)}
+        ---
+        For every DM give risk_level (exactly one category above), three_word_summary (exactly 3 words, funny roast style) and reasoning (one short sentence).
+        Respond ONLY with a strict JSON object and NOTHING else:
+        {{"results": [{{"index": <DM number>, "risk_level": "...", "three_word_summary": "...", "reasoning": "..."}}]}}
+        """
+        content = await chat_completion(
+            self.client,
+            priority=self.llm_priority,
+            model=self.model,
+            messages=[
+                {"role": "system", "content": "Return ONLY strict JSON. No extra commentary."},
+                {"role": "user", "content": prompt}
+            ],
+            temperature=0.3,
+            max_tokens=80 * len(chunk) + 50,
+            response_format={"type": "json_object"},
+        )
+        return json.loads(content).get("results", [])
+
+    @staticmethod
+    def _valid_batch_item(item: Dict[str, Any]) -> bool:
+        return item.get("risk_level") in RISK_LEVELS and isinstance(item.get("three_word_summary"), str)
+
+    async def run_batch(self, inputs: Dict[str, Any]) -> Dict[str, Any]:
+        try:
+            validated = DMRiskMeterBatchInput(**inputs)
+        except ValueError as e:
+            raise McpError(ErrorData(code=INVALID_PARAMS, message=str(e)))
+
+        local = [self._local_analysis(text) for text in validated.dm_texts]
+        escalated = [i for i, result in enumerate(local) if result is None]
+        llm_outputs, stats = await classify_in_batches(
+            [validated.dm_texts[i] for i in escalated], self._llm_batch, self._valid_batch_item, chunk_size=self.batch_chunk_size
+        )
+        outputs = list(local)
+        for i, output in zip(escalated, llm_outputs):
+            outputs[i] = output
+        stats["answered_locally"] = len(local) - len(escalated)
+
+        results: List[Dict[str, Any]] = []
+        counts = {level: 0 for level in RISK_LEVELS}
+        for index, output in enumerate(outputs):
+            if output is None:
+                results.append({"index": index, "error": "Could not classify this DM"})
+                continue
+            counts[output["risk_level"]] += 1
+            results.append({
+                "index": index,
+                "risk_level": output["risk_level"],
+                "three_word_summary": output.get("three_word_summary"),
+                "reasoning": output.get("reasoning"),
+                "danger_gauge": danger_gauge(output["risk_level"]),
+                "answered_by": "llm" if local[index] is None else "local",
+            })
+        return {"results": results, "risk_counts": counts, "stats": stats}
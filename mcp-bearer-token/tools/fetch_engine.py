@@ -0,0 +1,231 @@
+import asyncio
+import hashlib
+import multiprocessing
+import os
+import re
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+import httpx
+from .clients import registry
+from .metrics import upstream_call, record_payload, record_cache
+from .resilience import is_upstream_fault, upstream
+
+FETCH_MAX_BYTES = int(os.environ.get("FETCH_MAX_BYTES", str(2 * 1024 * 1024)))
+FETCH_PER_HOST = int(os.environ.get("FETCH_PER_HOST", "4"))
+FETCH_TIMEOUT = float(os.environ.get("FETCH_TIMEOUT", "15"))
+FETCH_CACHE_ENTRIES = int(os.environ.get("FETCH_CACHE_ENTRIES", "256"))
+# Processes that run readability + markdownify; 0 (default) runs them in a thread.
+# Each spawned process re-imports the server's main module (fastmcp, auth key pair),
+# so a worker costs about as much memory as the server itself.
+FETCH_PARSE_WORKERS = int(os.environ.get("FETCH_PARSE_WORKERS", "0"))
+
+_MAX_AGE = re.compile(r"max-age=(\d+)")
+
+
+class FetchResult:
+    __slots__ = ("url", "status_code", "content_type", "body", "encoding", "truncated", "source")
+
+    def __init__(self, url: str, status_code: int, content_type: str, body: bytes, encoding: str, truncated: bool, source: str):
+        self.url = url
+        self.status_code = status_code
+        self.content_type = content_type
+        self.body = body
+        self.encoding = encoding
+        self.truncated = truncated
+        self.source = source  # "network", "cache" (fresh), "revalidated" (304) or "stale" (host down)
+
+    def served_from(self, source: str) -> "FetchResult":
+        return FetchResult(self.url, self.status_code, self.content_type, self.body, self.encoding, self.truncated, source)
+
+    @property
+    def text(self) -> str:
+        return self.body.decode(self.encoding, errors="replace")
+
+    @property
+    def is_html(self) -> bool:
+        return "text/html" in self.content_type
+
+
+class _CachedPage:
+    __slots__ = ("result", "etag", "last_modified", "fresh_until")
+
+    def __init__(self, result: FetchResult, etag: Optional[str], last_modified: Optional[str], fresh_until: float):
+        self.result = result
+        self.etag = etag
+        self.last_modified = last_modified
+        self.fresh_until = fresh_until
+
+
+def html_to_markdown(html: str) -> str:
+    """Readability extraction then Markdown conversion; runs inside the parse pool."""
+    import markdownify
+    import readabilipy
+
+    ret = readabilipy.simple_json.simple_json_from_html_string(html, use_readability=True)
+    if not ret or not ret.get("content"):
+        return "<error>Page failed to be simplified from HTML</error>"
+    return markdownify.markdownify(ret["content"], heading_style=markdownify.ATX)
+
+
+def _preload_parsers() -> None:
+    import markdownify, readabilipy  # noqa: F401
+
+
+def _fresh_until(headers: httpx.Headers) -> float:
+    cache_control = headers.get("cache-control", "").lower()
+    if "no-store" in cache_control or "no-cache" in cache_control:
+        return 0.0
+    match = _MAX_AGE.search(cache_control)
+    return time.time() + int(match.group(1)) if match else 0.0
+
+
+class FetchEngine:
+    """Web page fetching for the fetch/search tools.
+
+    Requests share the pooled "web" client and are limited per host. Bodies are
+    streamed and cut off at `max_bytes`. Pages are kept in an LRU and revalidated
+    with If-None-Match / If-Modified-Since once their max-age lapses, so an
+    unchanged page costs a 304. Each host gets its own circuit breaker and
+    latency-driven timeout. While a host is failing, its last cached copy is
+    served as "stale". HTML-to-Markdown conversion is CPU-bound and runs
+    in a worker thread, or in a spawned process pool when `parse_workers` is
+    set, cached by the SHA-256 of the HTML.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = FETCH_MAX_BYTES,
+        per_host: int = FETCH_PER_HOST,
+        timeout: float = FETCH_TIMEOUT,
+        cache_entries: int = FETCH_CACHE_ENTRIES,
+        parse_workers: int = FETCH_PARSE_WORKERS,
+    ):
+        self.max_bytes = max_bytes
+        self.per_host = per_host
+        self.timeout = timeout
+        self.cache_entries = cache_entries
+        self.parse_workers = parse_workers
+        self._hosts: Dict[str, asyncio.Semaphore] = {}
+        self._pages: "OrderedDict[str, _CachedPage]" = OrderedDict()
+        self._markdown: "OrderedDict[str, str]" = OrderedDict()
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def _host_limit(self, url: str) -> asyncio.Semaphore:
+        host = urlsplit(url).netloc.lower()
+        semaphore = self._hosts.get(host)
+        if semaphore is None:
+            semaphore = self._hosts[host] = asyncio.Semaphore(self.per_host)
+        return semaphore
+
+    def _remember(self, cache: "OrderedDict[str, object]", key: str, value: object) -> None:
+        cache[key] = value
+        cache.move_to_end(key)
+        while len(cache) > self.cache_entries:
+            cache.popitem(last=False)
+
+    async def fetch(self, url: str, user_agent: str) -> FetchResult:
+        cached = self._pages.get(url)
+        if cached is not None and cached.fresh_until > time.time():
+            self._pages.move_to_end(url)
+            record_cache("fetch", "hits")
+            return cached.result.served_from("cache")
+
+        headers = {"User-Agent": user_agent}
+        if cached is not None:
+            if cached.etag:
+                headers["If-None-Match"] = cached.etag
+            if cached.last_modified:
+                headers["If-Modified-Since"] = cached.last_modified
+
+        try:
+            return await upstream(f"web:{urlsplit(url).netloc.lower()}", self.timeout).call(
+                lambda timeout: self._download(url, headers, cached, timeout), idempotent=True
+            )
+        except Exception as e:
+            if cached is None or not is_upstream_fault(e):
+                raise
+            record_cache("fetch", "stale")
+            return cached.result.served_from("stale")
+
+    async def _download(self, url: str, headers: Dict[str, str], cached: Optional[_CachedPage], timeout: float) -> FetchResult:
+        async with self._host_limit(url), upstream_call("web"):
+            client = registry.http("web")
+            async with client.stream("GET", url, headers=headers, follow_redirects=True, timeout=timeout) as response:
+                if response.status_code == 304 and cached is not None:
+                    cached.fresh_until = _fresh_until(response.headers)
+                    self._pages.move_to_end(url)
+                    record_cache("fetch", "revalidated")
+                    return cached.result.served_from("revalidated")
+                if response.status_code >= 500:
+                    response.raise_for_status()  # counts against the host's breaker
+                chunks, size, truncated = [], 0, False
+                async for chunk in response.aiter_bytes():
+                    chunks.append(chunk)
+                    size += len(chunk)
+                    if size >= self.max_bytes:
+                        truncated = True
+                        break
+        body = b"".join(chunks)[: self.max_bytes]
+        record_payload("web", len(body))
+        record_cache("fetch", "misses")
+        result = FetchResult(
+            url=str(response.url),
+            status_code=response.status_code,
+            content_type=response.headers.get("content-type", ""),
+            body=body,
+            encoding=response.charset_encoding or "utf-8",
+            truncated=truncated,
+            source="network",
+        )
+        etag, last_modified = response.headers.get("etag"), response.headers.get("last-modified")
+        if response.status_code == 200 and not truncated and (etag or last_modified or _fresh_until(response.headers)):
+            self._remember(self._pages, url, _CachedPage(result, etag, last_modified, _fresh_until(response.headers)))
+        return result
+
+    def _parse_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # spawn: forked children would inherit the event loop and open sockets
+            self._pool = ProcessPoolExecutor(self.parse_workers, mp_context=multiprocessing.get_context("spawn"))
+        return self._pool
+
+    def warm(self) -> None:
+        """Start the parse processes and their imports ahead of the first page."""
+        if self.parse_workers > 0:
+            pool = self._parse_pool()
+            for _ in range(self.parse_workers):
+                pool.submit(_preload_parsers)
+
+    async def to_markdown(self, html: str) -> str:
+        key = hashlib.sha256(html.encode("utf-8", errors="replace")).hexdigest()
+        markdown = self._markdown.get(key)
+        if markdown is not None:
+            self._markdown.move_to_end(key)
+            record_cache("markdown", "hits")
+            return markdown
+        record_cache("markdown", "misses")
+        if self.parse_workers > 0:
+            markdown = await asyncio.get_running_loop().run_in_executor(self._parse_pool(), html_to_markdown, html)
+        else:
+            markdown = await asyncio.to_thread(html_to_markdown, html)
+        self._remember(self._markdown, key, markdown)
+        return markdown
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+_engine: Optional[FetchEngine] = None
+_engine_pid: Optional[int] = None
+
+
+def get_fetch_engine() -> FetchEngine:
+    """Per-process engine; forked server workers build their own pool and caches."""
+    global _engine, _engine_pid
+    if _engine is None or _engine_pid != os.getpid():
+        _engine, _engine_pid = FetchEngine(), os.getpid()
+    return _engine
@@ -0,0 +1,173 @@
+import asyncio
+import math
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from .metrics import record_cache
+
+_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+# (lat, lon, radius_m) -> raw Places results
+PlacesFetch = Callable[[float, float, int], Awaitable[List[Dict[str, Any]]]]
+
+# Places reports quota and key problems as HTTP 200 with an error status and no results
+PLACES_OK_STATUSES = ("OK", "ZERO_RESULTS")
+
+
+class PlacesStatusError(Exception):
+    """Places answered, but with an error status such as OVER_QUERY_LIMIT."""
+
+
+def places_results(payload: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Results of a nearbysearch reply; raises on error statuses so they are never cached as a tile."""
+    status = payload.get("status")
+    if status not in PLACES_OK_STATUSES:
+        detail = payload.get("error_message")
+        raise PlacesStatusError(f"{status}: {detail}" if detail else str(status))
+    return payload.get("results", [])
+
+
+def geohash(lat: float, lon: float, precision: int) -> str:
+    lat_range, lon_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars, bits, bit_count, even = [], 0, 0, True
+    while len(chars) < precision:
+        rng, value = (lon_range, lon) if even else (lat_range, lat)
+        mid = (rng[0] + rng[1]) / 2
+        bits <<= 1
+        if value >= mid:
+            bits |= 1
+            rng[0] = mid
+        else:
+            rng[1] = mid
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(_BASE32[bits])
+            bits, bit_count = 0, 0
+    return "".join(chars)
+
+
+def tile_bounds(tile: str) -> Tuple[float, float, float, float]:
+    """Return (lat_min, lat_max, lon_min, lon_max) of a geohash tile."""
+    lat_range, lon_range = [-90.0, 90.0], [-180.0, 180.0]
+    even = True
+    for ch in tile:
+        idx = _BASE32.index(ch)
+        for shift in range(4, -1, -1):
+            rng = lon_range if even else lat_range
+            mid = (rng[0] + rng[1]) / 2
+            if (idx >> shift) & 1:
+                rng[0] = mid
+            else:
+                rng[1] = mid
+            even = not even
+    return lat_range[0], lat_range[1], lon_range[0], lon_range[1]
+
+
+def haversine_m(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    p1, p2 = math.radians(lat1), math.radians(lat2)
+    dp, dl = p2 - p1, math.radians(lon2 - lon1)
+    a = math.sin(dp / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(dl / 2) ** 2
+    return 2 * 6371000 * math.asin(math.sqrt(a))
+
+
+def parse_lat_lon(location: str) -> Optional[Tuple[float, float]]:
+    """Parse a '40.7128,-74.0060' style location; None for free-text places."""
+    parts = location.split(",")
+    if len(parts) != 2:
+        return None
+    try:
+        lat, lon = float(parts[0]), float(parts[1])
+    except ValueError:
+        return None
+    if -90 <= lat <= 90 and -180 <= lon <= 180:
+        return lat, lon
+    return None
+
+
+class PlacesTileCache:
+    """Places nearbysearch results cached per (geohash tile, type, keyword).
+
+    Each tile is fetched once from its centre with a radius widened by the tile's
+    half-diagonal, so any point inside the tile can be answered locally by
+    re-ranking the stored places on distance. Stale tiles are served immediately
+    while a background refresh runs.
+    """
+
+    def __init__(self, precision: int = 6, max_tiles: int = 4096):
+        self.precision = precision
+        self.max_tiles = max_tiles
+        self._tiles: "OrderedDict[Tuple[str, str, str], Tuple[float, List[Dict[str, Any]]]]" = OrderedDict()
+        self._inflight: Dict[Tuple[str, str, str], asyncio.Task] = {}
+        self.stats = {"hits": 0, "stale": 0, "misses": 0}
+
+    def _count(self, outcome: str, place_type: str) -> None:
+        self.stats[outcome] += 1
+        record_cache(f"places_{place_type}", outcome)
+
+    def _refresh(self, key: Tuple[str, str, str], radius_m: int, fetch: PlacesFetch) -> asyncio.Task:
+        task = self._inflight.get(key)
+        if task is not None:
+            return task
+        lat_min, lat_max, lon_min, lon_max = tile_bounds(key[0])
+        center_lat, center_lon = (lat_min + lat_max) / 2, (lon_min + lon_max) / 2
+        reach = radius_m + haversine_m(center_lat, center_lon, lat_max, lon_max)
+
+        async def load() -> List[Dict[str, Any]]:
+            try:
+                results = await fetch(center_lat, center_lon, int(min(reach, 50000)))
+                self._tiles[key] = (time.time(), results)
+                self._tiles.move_to_end(key)
+                while len(self._tiles) > self.max_tiles:
+                    self._tiles.popitem(last=False)
+                return results
+            finally:
+                self._inflight.pop(key, None)
+
+        task = asyncio.ensure_future(load())
+        # Background refreshes may finish with nobody awaiting them
+        task.add_done_callback(lambda t: t.cancelled() or t.exception())
+        self._inflight[key] = task
+        return task
+
+    async def nearby(
+        self,
+        lat: float,
+        lon: float,
+        place_type: str,
+        keyword: str,
+        radius_m: int,
+        ttl: float,
+        fetch: PlacesFetch,
+    ) -> List[Dict[str, Any]]:
+        key = (geohash(lat, lon, self.precision), place_type, keyword)
+        entry = self._tiles.get(key)
+        if entry is None:
+            self._count("misses", place_type)
+            places = await asyncio.shield(self._refresh(key, radius_m, fetch))
+        else:
+            fetched_at, places = entry
+            self._tiles.move_to_end(key)
+            if time.time() - fetched_at > ttl:
+                self._count("stale", place_type)
+                self._refresh(key, radius_m, fetch)
+            else:
+                self._count("hits", place_type)
+        return self.rank(places, lat, lon, radius_m)
+
+    @staticmethod
+    def rank(places: List[Dict[str, Any]], lat: float, lon: float, radius_m: int) -> List[Dict[str, Any]]:
+        ranked: List[Tuple[float, Dict[str, Any]]] = []
+        for place in places:
+            loc = (place.get("geometry") or {}).get("location") or {}
+            if "lat" not in loc or "lng" not in loc:
+                continue
+            distance = haversine_m(lat, lon, loc["lat"], loc["lng"])
+            if distance <= radius_m:
+                ranked.append((distance, place))
+        ranked.sort(key=lambda x: x[0])
+        return [dict(place, distance_m=round(distance)) for distance, place in ranked]
+
+
+places_cache = PlacesTileCache(precision=int(os.environ.get("GEO_TILE_PRECISION", "6")))
@@ -0,0 +1,105 @@
+import asyncio
+import base64
+import binascii
+import io
+import os
+from typing import Any, Dict, List, Tuple
+from mcp import ErrorData, McpError
+try:
+    from mcp.types import INVALID_PARAMS  # type: ignore  # noqa
+except Exception:
+    INVALID_PARAMS = -32602  # type: ignore
+from PIL import Image
+
+MAX_IMAGE_BYTES = int(os.environ.get("OUTFIT_IMAGE_MAX_BYTES", str(8 * 1024 * 1024)))
+MAX_IMAGE_PIXELS = int(os.environ.get("OUTFIT_IMAGE_MAX_PIXELS", str(40_000_000)))
+ANALYSIS_SIDE = int(os.environ.get("OUTFIT_IMAGE_ANALYSIS_SIDE", "256"))
+# Image sent to the vision model: fewer pixels and lower quality mean fewer tokens and faster uploads
+VISION_SIDE = int(os.environ.get("OUTFIT_VISION_SIDE", "512"))
+VISION_QUALITY = int(os.environ.get("OUTFIT_VISION_QUALITY", "70"))
+PALETTE_SIZE = 5
+
+
+def _reject(message: str) -> McpError:
+    return McpError(ErrorData(code=INVALID_PARAMS, message=message))
+
+
+def decode_base64_image(data: str, max_bytes: int = MAX_IMAGE_BYTES) -> bytes:
+    """Decode base64 image data, refusing oversized payloads before allocating them."""
+    if data.startswith("data:") and "," in data:
+        data = data.split(",", 1)[1]
+    # 4 base64 chars carry 3 bytes, so the decoded size is known up front
+    if (len(data) // 4) * 3 > max_bytes + 3:
+        raise _reject(f"Image too large (limit {max_bytes // (1024 * 1024)} MB)")
+    try:
+        raw = base64.b64decode(data)
+    except (binascii.Error, ValueError):
+        raise _reject("Image data is not valid base64")
+    if len(raw) > max_bytes:
+        raise _reject(f"Image too large (limit {max_bytes // (1024 * 1024)} MB)")
+    return raw
+
+
+def _dominant_colors(image: Image.Image) -> List[Tuple[int, int, int]]:
+    quantized = image.quantize(colors=PALETTE_SIZE)
+    palette = quantized.getpalette() or []
+    counts = sorted(quantized.getcolors() or [], reverse=True)
+    return [tuple(palette[index * 3:index * 3 + 3]) for _, index in counts]
+
+
+def dhash(image: Image.Image) -> int:
+    """64-bit difference hash: robust to rescaling, recompression and small crops."""
+    gray = image.convert("L").resize((9, 8), Image.Resampling.BILINEAR)
+    pixels = gray.tobytes()  # mode "L": one byte per pixel, row-major
+    value = 0
+    for row in range(8):
+        for col in range(8):
+            value = (value << 1) | (pixels[row * 9 + col] > pixels[row * 9 + col + 1])
+    return value
+
+
+def encode_for_vision(image: Image.Image, side: int = VISION_SIDE, quality: int = VISION_QUALITY) -> str:
+    copy = image.copy()
+    copy.thumbnail((side, side))
+    buf = io.BytesIO()
+    copy.save(buf, format="JPEG", quality=quality, optimize=True)
+    return "data:image/jpeg;base64," + base64.b64encode(buf.getvalue()).decode("ascii")
+
+
+def analyze_image_bytes(raw: bytes, side: int = ANALYSIS_SIDE, vision_side: int = 0) -> Dict[str, Any]:
+    """Header-check, draft-decode and downsample an image, then pull its palette.
+
+    Only the header is read before the pixel-count check. JPEGs are decoded
+    straight at a reduced scale via Image.draft, and everything is thumbnailed to
+    `side` pixels before quantizing, so memory stays bounded by the analysis size
+    rather than the upload's resolution. With `vision_side` set, a re-encoded
+    JPEG data URL of at most that size is returned as "vision_image" too.
+    """
+    work_side = max(side, vision_side)
+    try:
+        image = Image.open(io.BytesIO(raw))
+        width, height = image.size
+        if width * height > MAX_IMAGE_PIXELS:
+            raise _reject(f"Image resolution too large ({width}x{height})")
+        fmt = image.format
+        image.draft("RGB", (work_side, work_side))
+        image.thumbnail((work_side, work_side))
+        image = image.convert("RGB")
+    except McpError:
+        raise
+    except Exception as e:
+        raise _reject(f"Unreadable image: {e}")
+    result: Dict[str, Any] = {"format": fmt, "size": (width, height)}
+    if vision_side:
+        result["vision_image"] = encode_for_vision(image, vision_side)
+    image.thumbnail((side, side))
+    palette = _dominant_colors(image)
+    result.update(dominant_color=palette[0] if palette else None, palette=palette, dhash=dhash(image))
+    return result
+
+
+async def analyze_base64_image(data: str, vision_side: int = 0) -> Dict[str, Any]:
+    """Decode and analyze an uploaded image in a worker thread."""
+    def work() -> Dict[str, Any]:
+        return analyze_image_bytes(decode_base64_image(data), vision_side=vision_side)
+    return await asyncio.to_thread(work)
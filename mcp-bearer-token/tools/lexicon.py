@@ -0,0 +1,47 @@
+import re
+from collections import Counter
+from typing import Dict
+
+
+class LexiconHits:
+    __slots__ = ("counts", "_lexicon")
+
+    def __init__(self, counts: Dict[str, int], lexicon: "Lexicon"):
+        self.counts = counts
+        self._lexicon = lexicon
+
+    def hits(self, category: str) -> int:
+        """Total occurrences of the category's terms."""
+        terms = self._lexicon.categories[category]
+        return sum(n for term, n in self.counts.items() if term in terms)
+
+    def points(self, category: str) -> float:
+        """Occurrence-weighted score: every hit adds its term's weight."""
+        terms = self._lexicon.categories[category]
+        return sum(terms[term] * n for term, n in self.counts.items() if term in terms)
+
+    def presence_points(self, category: str) -> float:
+        """Each distinct term found adds its weight once."""
+        terms = self._lexicon.categories[category]
+        return sum(terms[term] for term in self.counts if term in terms)
+
+
+class Lexicon:
+    """Weighted keyword categories compiled into one regex over lower-cased text.
+
+    `scan` walks the text once and returns per-term hit counts; category scores
+    are derived from those counts, so heuristics no longer rescan the text once
+    per category. Terms match as substrings, longest first, without overlap.
+    The text is lower-cased up front rather than matched with re.IGNORECASE,
+    which is several times slower on a large alternation.
+    """
+
+    def __init__(self, categories: Dict[str, Dict[str, float]]):
+        self.categories = {c: {t.lower(): w for t, w in terms.items()} for c, terms in categories.items()}
+        terms = {term for category_terms in self.categories.values() for term in category_terms}
+        alternation = "|".join(re.escape(t) for t in sorted(terms, key=len, reverse=True))
+        self._findall = re.compile(alternation).findall
+
+    def scan(self, text: str) -> LexiconHits:
+        found = self._findall(text.lower())
+        return LexiconHits(dict(Counter(found)) if found else {}, self)
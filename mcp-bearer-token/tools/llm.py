@@ -0,0 +1,107 @@
+from groq import AsyncGroq, RateLimitError
+from typing import Dict, Any, List, Awaitable, Callable, Optional, Tuple
+from .clients import registry
+from .metrics import upstream_call, record_payload
+from .rate_limiter import UpstreamRateLimiter, estimate_tokens, get_limiter
+
+# Receives each text delta of a streamed completion as it arrives
+PartialCallback = Callable[[str], Awaitable[None]]
+
+
+def groq_client(api_key: str) -> AsyncGroq:
+    """Shared async Groq client: completions are awaited on the pooled `groq` connection pool."""
+    return registry.groq(api_key)
+
+
+async def _admit(model: str, messages: List[Dict[str, Any]], max_tokens: int, priority: str) -> Tuple[UpstreamRateLimiter, float]:
+    """Wait for the shared per-model budget; every Groq call goes through here."""
+    limiter = get_limiter(model)
+    charged = await limiter.acquire(estimate_tokens(messages, max_tokens), priority)
+    return limiter, charged
+
+
+async def _create(client: AsyncGroq, limiter: UpstreamRateLimiter, **params: Any) -> Any:
+    """Create a completion through the raw-response API so the rate-limit headers reach the limiter."""
+    try:
+        raw = await client.chat.completions.with_raw_response.create(**params)
+    except RateLimitError as e:
+        limiter.adapt(e.response.headers)
+        raise
+    limiter.adapt(raw.headers)
+    return await raw.parse()
+
+
+async def chat_completion(
+    client: AsyncGroq,
+    model: str,
+    messages: List[Dict[str, Any]],
+    temperature: float,
+    max_tokens: int,
+    response_format: Optional[Dict[str, Any]] = None,
+    priority: str = "normal",
+) -> str:
+    """Run one chat completion and return the text of the first choice."""
+    extra = {"response_format": response_format} if response_format else {}
+    limiter, charged = await _admit(model, messages, max_tokens, priority)
+    used: Optional[int] = 0  # a call that fails or is cancelled gives its whole charge back
+    try:
+        async with upstream_call("groq"):
+            completion = await _create(
+                client,
+                limiter,
+                model=model,
+                messages=messages,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                **extra,
+            )
+        used = completion.usage.total_tokens if completion.usage else None
+    finally:
+        limiter.settle(charged, used)
+    content = completion.choices[0].message.content
+    record_payload("groq", len(content or ""))
+    return content
+
+
+async def stream_chat_completion(
+    client: AsyncGroq,
+    model: str,
+    messages: List[Dict[str, Any]],
+    temperature: float,
+    max_tokens: int,
+    on_partial: Optional[PartialCallback] = None,
+    priority: str = "normal",
+) -> str:
+    """Consume a completion as a token stream, forwarding deltas to on_partial, and return the full text."""
+    parts: List[str] = []
+    reported: Optional[int] = None
+    limiter, charged = await _admit(model, messages, max_tokens, priority)
+    used: Optional[int] = 0  # a stream that fails or is cancelled gives its whole charge back
+    try:
+        async with upstream_call("groq"):
+            stream = await _create(
+                client,
+                limiter,
+                model=model,
+                messages=messages,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                stream=True,
+            )
+            async for chunk in stream:
+                # Groq reports usage on the final chunk under x_groq
+                usage = chunk.x_groq.usage if chunk.x_groq else None
+                if usage is not None:
+                    reported = usage.total_tokens
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if not delta:
+                    continue
+                parts.append(delta)
+                if on_partial is not None:
+                    await on_partial(delta)
+        used = reported
+    finally:
+        limiter.settle(charged, used)
+    content = "".join(parts)
+    record_payload("groq", len(content))
+    return content
@@ -0,0 +1,124 @@
+import base64
+import functools
+import io
+import os
+import threading
+from typing import List, Tuple
+from mcp.types import ImageContent
+from PIL import Image, ImageDraw, ImageFont
+
+FONT_SIZE = 20
+LINE_SPACING = 4
+PADDING = 10
+
+# Tried in order; the first that loads is kept for the life of the process.
+FONT_CANDIDATES = (
+    "arial.ttf",
+    "DejaVuSans.ttf",
+    "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
+    "/usr/share/fonts/TTF/DejaVuSans.ttf",
+    "/System/Library/Fonts/Supplemental/Arial.ttf",
+)
+
+# name -> (canvas size, background, footer text, footer colour)
+TEMPLATES = {
+    "date_meme": ((400, 200), "#FFFFFF", "#SafeDateMeme", "#FF6B6B"),
+    "vibe_meme": ((400, 200), "#FFFFFF", "#SafeDateVibes", "#FF6B6B"),
+}
+
+# FreeType faces are shared between the render threads
+_draw_lock = threading.Lock()
+
+
+@functools.lru_cache(maxsize=None)
+def load_font(size: int = FONT_SIZE) -> ImageFont.ImageFont:
+    candidates = (os.environ["MEME_FONT"],) + FONT_CANDIDATES if os.environ.get("MEME_FONT") else FONT_CANDIDATES
+    for path in candidates:
+        try:
+            return ImageFont.truetype(path, size)
+        except OSError:
+            continue
+    try:
+        return ImageFont.load_default(size=size)
+    except TypeError:  # Pillow < 10.1 has no sized default font
+        return ImageFont.load_default()
+
+
+@functools.lru_cache(maxsize=None)
+def _template(name: str) -> Tuple[Image.Image, int]:
+    """Pre-render a template's static parts; returns the canvas and the y where the footer starts."""
+    size, background, footer, footer_color = TEMPLATES[name]
+    font = load_font()
+    img = Image.new("RGB", size, color=background)
+    footer_y = size[1] - PADDING - _line_height(font)
+    ImageDraw.Draw(img).text((PADDING, footer_y), footer, fill=footer_color, font=font)
+    return img, footer_y
+
+
+def _line_height(font: ImageFont.ImageFont) -> int:
+    left, top, right, bottom = font.getbbox("Hg")
+    return bottom - top + LINE_SPACING
+
+
+def wrap_text(text: str, font: ImageFont.ImageFont, max_width: int) -> List[str]:
+    lines: List[str] = []
+    current = ""
+    for word in text.split():
+        candidate = f"{current} {word}" if current else word
+        if font.getlength(candidate) <= max_width:
+            current = candidate
+            continue
+        if current:
+            lines.append(current)
+        # Break words that are wider than the whole line
+        while font.getlength(word) > max_width and len(word) > 1:
+            cut = len(word)
+            while cut > 1 and font.getlength(word[:cut]) > max_width:
+                cut -= 1
+            lines.append(word[:cut])
+            word = word[cut:]
+        current = word
+    if current:
+        lines.append(current)
+    return lines
+
+
+def render(name: str, paragraphs: List[str]) -> Image.Image:
+    """Copy a template and draw the word-wrapped caption paragraphs above its footer."""
+    base, footer_y = _template(name)
+    img = base.copy()
+    font = load_font()
+    line_height = _line_height(font)
+    max_width = img.width - 2 * PADDING
+    max_lines = max(1, (footer_y - PADDING) // line_height)
+    lines: List[str] = []
+    for paragraph in paragraphs:
+        lines.extend(wrap_text(paragraph, font, max_width))
+    if len(lines) > max_lines:
+        lines = lines[:max_lines]
+        lines[-1] = lines[-1].rstrip(".") + "…"
+    with _draw_lock:
+        draw = ImageDraw.Draw(img)
+        for i, line in enumerate(lines):
+            draw.text((PADDING, PADDING + i * line_height), line, fill="#000000", font=font)
+    return img
+
+
+def encode(img: Image.Image) -> ImageContent:
+    """Encode with MEME_FORMAT (png, webp or jpeg); PNG uses a fast compress level by default."""
+    fmt = os.environ.get("MEME_FORMAT", "png").lower()
+    buf = io.BytesIO()
+    if fmt == "webp":
+        img.save(buf, format="WEBP", quality=int(os.environ.get("MEME_QUALITY", "80")), method=0)
+        mime = "image/webp"
+    elif fmt in ("jpeg", "jpg"):
+        img.save(buf, format="JPEG", quality=int(os.environ.get("MEME_QUALITY", "80")))
+        mime = "image/jpeg"
+    else:
+        img.save(buf, format="PNG", compress_level=int(os.environ.get("MEME_PNG_COMPRESS_LEVEL", "1")))
+        mime = "image/png"
+    return ImageContent(type="image", mimeType=mime, data=base64.b64encode(buf.getvalue()).decode("utf-8"))
+
+
+def render_meme(name: str, paragraphs: List[str]) -> ImageContent:
+    return encode(render(name, paragraphs))
@@ -0,0 +1,138 @@
+import bisect
+import functools
+import time
+from contextlib import asynccontextmanager
+from typing import Any, Dict, List, Tuple
+from mcp import McpError
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+class Histogram:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class MetricsRegistry:
+    """In-process counters and histograms rendered in the Prometheus text format.
+
+    Updates are plain dict and list operations on the event loop thread, cheap
+    enough to leave on in production. Each worker process keeps its own registry;
+    `const_labels` (e.g. the worker pid) are added to every rendered series so
+    scrapes that land on different workers stay apart.
+    """
+
+    def __init__(self, prefix: str = "safedate"):
+        self.prefix = prefix
+        self.const_labels: Labels = ()
+        self.counters: Dict[str, Dict[Labels, float]] = {}
+        self.histograms: Dict[str, Dict[Labels, Histogram]] = {}
+
+    def inc(self, name: str, labels: Dict[str, str], value: float = 1) -> None:
+        series = self.counters.setdefault(name, {})
+        key = tuple(sorted(labels.items()))
+        series[key] = series.get(key, 0) + value
+
+    def observe(self, name: str, labels: Dict[str, str], value: float, buckets: Tuple[float, ...] = LATENCY_BUCKETS) -> None:
+        series = self.histograms.setdefault(name, {})
+        key = tuple(sorted(labels.items()))
+        hist = series.get(key)
+        if hist is None:
+            hist = series[key] = Histogram(buckets)
+        hist.observe(value)
+
+    def _fmt(self, labels: Labels, extra: Tuple[Tuple[str, str], ...] = ()) -> str:
+        pairs = self.const_labels + labels + extra
+        if not pairs:
+            return ""
+        body = ",".join(f'{k}="{v}"' for k, v in pairs)
+        return "{" + body + "}"
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for name, series in sorted(self.counters.items()):
+            full = f"{self.prefix}_{name}"
+            lines.append(f"# TYPE {full} counter")
+            for labels, value in series.items():
+                lines.append(f"{full}{self._fmt(labels)} {value:g}")
+        for name, series in sorted(self.histograms.items()):
+            full = f"{self.prefix}_{name}"
+            lines.append(f"# TYPE {full} histogram")
+            for labels, hist in series.items():
+                cumulative = 0
+                for bound, count in zip(hist.buckets, hist.counts):
+                    cumulative += count
+                    lines.append(f"{full}_bucket{self._fmt(labels, (('le', f'{bound:g}'),))} {cumulative}")
+                lines.append(f"{full}_bucket{self._fmt(labels, (('le', '+Inf'),))} {hist.count}")
+                lines.append(f"{full}_sum{self._fmt(labels)} {hist.sum:g}")
+                lines.append(f"{full}_count{self._fmt(labels)} {hist.count}")
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry()
+
+
+@asynccontextmanager
+async def upstream_call(upstream: str):
+    """Time one upstream request and count its failures by exception type."""
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception as e:
+        metrics.inc("upstream_errors_total", {"upstream": upstream, "error": type(e).__name__})
+        raise
+    finally:
+        metrics.observe("upstream_request_seconds", {"upstream": upstream}, time.perf_counter() - start)
+
+
+def record_payload(upstream: str, size: int) -> None:
+    metrics.observe("upstream_response_bytes", {"upstream": upstream}, size, SIZE_BUCKETS)
+
+
+def record_cache(cache: str, outcome: str) -> None:
+    metrics.inc("cache_requests_total", {"cache": cache, "outcome": outcome})
+
+
+def _content_size(result: Any) -> int:
+    if not isinstance(result, list):
+        return len(str(result))
+    size = 0
+    for item in result:
+        size += len(getattr(item, "text", None) or getattr(item, "data", None) or "")
+    return size
+
+
+def instrumented(fn):
+    """Wrap an @mcp.tool coroutine with latency, error-code and response-size metrics."""
+    tool = fn.__name__
+
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            result = await fn(*args, **kwargs)
+        except McpError as e:
+            metrics.inc("tool_errors_total", {"tool": tool, "code": str(e.error.code)})
+            raise
+        except Exception:
+            metrics.inc("tool_errors_total", {"tool": tool, "code": "unhandled"})
+            raise
+        finally:
+            metrics.observe("tool_call_seconds", {"tool": tool}, time.perf_counter() - start)
+        metrics.observe("tool_response_bytes", {"tool": tool}, _content_size(result), SIZE_BUCKETS)
+        return result
+
+    return wrapper
@@ -5,43 +5,61 @@ except Exception:
     INVALID_PARAMS = -32602  # type: ignore
     INTERNAL_ERROR = -32603  # type: ignore
 from pydantic import BaseModel, Field
-from typing import Dict, Any
-import re
-from groq import Groq
-import base64, io
-from PIL import Image
+from typing import Dict, Any, Optional, Tuple
+from .llm import groq_client, stream_chat_completion, PartialCallback
+from .lexicon import Lexicon
+from .image_intake import analyze_base64_image, VISION_SIDE
+from .perceptual_cache import outfit_vision_cache
+from .metrics import metrics
+import os
+
+# Multimodal model that sees the photo itself; the text model gets a palette summary as fallback
+OUTFIT_VISION_MODEL = os.environ.get("OUTFIT_VISION_MODEL", "meta-llama/llama-4-scout-17b-16e-instruct")
+OUTFIT_VISION = os.environ.get("OUTFIT_VISION", "1") != "0"
 
 class OutfitRaterInput(BaseModel):
     outfit_description: str = Field(default="", min_length=0, max_length=500, description="Text description of the outfit")
     puch_image_data: str = Field(default="", description="Base64-encoded image data of the outfit")
     roast_mode: bool = Field(default=False, description="Enable roast mode for playful feedback")
 
+STYLE_LEXICON = Lexicon({
+    "classy": dict.fromkeys(["suit", "blazer", "dress", "heels", "silk", "tailored"], 10),
+    "casual": dict.fromkeys(["jeans", "t-shirt", "hoodie", "sneakers"], 5),
+    "trendy": dict.fromkeys(["oversized", "retro", "vintage", "streetwear"], 8),
+    "mismatch": dict.fromkeys(["clashing", "mismatched", "wrinkled"], -10),
+})
+
 class OutfitRater:
-    def __init__(self, api_key: str, model: str = "llama3-70b-8192"):
-        self.client = Groq(api_key=api_key)
+    prompt_version = "1"
+    llm_priority = "entertainment"
+
+    def __init__(self, api_key: str, model: str = "llama3-70b-8192", vision_model: Optional[str] = OUTFIT_VISION_MODEL):
+        self.client = groq_client(api_key)
         self.model = model
+        self.vision_model = vision_model if OUTFIT_VISION else None
         self.name = "outfit_rater"
         self.description = "Rate and review outfits with fashion tips and image support"
 
-    def _style_score(self, description: str) -> Dict[str, int]:
-        desc = description.lower()
-        classy_points = len(re.findall(r"suit|blazer|dress|heels|silk|tailored", desc)) * 10
-        casual_points = len(re.findall(r"jeans|t-shirt|hoodie|sneakers", desc)) * 5
-        trendy_points = len(re.findall(r"oversized|retro|vintage|streetwear", desc)) * 8
-        mismatch_points = len(re.findall(r"clashing|mismatched|wrinkled", desc)) * -10
+    def _style_score(self, description: str) -> Tuple[Dict[str, int], Dict[str, int]]:
+        hits = STYLE_LEXICON.scan(description)
+        classy_points = hits.points("classy")
+        casual_points = hits.points("casual")
+        trendy_points = hits.points("trendy")
+        mismatch_points = hits.points("mismatch")
         style_score = max(0, min(100, classy_points + casual_points + trendy_points + 50 + mismatch_points))
         fit_score = max(0, min(100, 50 + trendy_points - abs(mismatch_points)))
         uniqueness_score = max(0, min(100, trendy_points * 2 + 40))
-        return {"style": style_score, "fit": fit_score, "uniqueness": uniqueness_score}
+        return {"style": style_score, "fit": fit_score, "uniqueness": uniqueness_score}, hits.counts
 
-    async def _llm_fashion_review(self, description: str, scores: Dict[str, int], roast_mode: bool = False) -> str:
+    def _review_prompt(self, description: str, scores: Dict[str, int], roast_mode: bool, with_photo: bool = False) -> str:
         tone = "lightly roast their outfit in a playful way" if roast_mode else "give kind but confident fashion advice"
-        prompt = f"""
+        if with_photo:
+            intro = f"The user sent the attached photo of their outfit. Their note: {description or '(none)'}"
+        else:
+            intro = f"The user describes their outfit:\n        ---\n        {description}\n        ---"
+        return f"""
         You are a top-tier fashion stylist with a fun personality.
-        The user describes their outfit:
-        ---
-        {description}
-        ---
+        {intro}
         Here are the quick style scores:
         Style: {scores['style']}
         Fit: {scores['fit']}
@@ -55,46 +73,100 @@ class OutfitRater:
         Keep it short, fun, and Instagram-caption-worthy.
         Output ONLY the review text (no greetings, no closing). Do NOT add markdown fences.
         """
+
+    async def _vision_review(self, description: str, scores: Dict[str, int], image: Dict[str, Any], roast_mode: bool, on_partial: Optional[PartialCallback] = None) -> Optional[str]:
+        """Review the photo with the multimodal model; None means fall back to the text path.
+
+        Reviews are cached on the image's perceptual hash, so retries with a
+        slightly different crop or compression reuse the earlier answer. The
+        streamed deltas are held back until the call succeeds, so a vision
+        stream that fails halfway never reaches the client ahead of the
+        text fallback's review.
+        """
+        context = (self.vision_model, self.prompt_version, roast_mode, " ".join(description.lower().split()))
+        hit = outfit_vision_cache.get(image["dhash"], context)
+        if hit is not None:
+            if on_partial is not None:
+                await on_partial(hit)
+            return hit
+        content = [
+            {"type": "text", "text": self._review_prompt(description, scores, roast_mode, with_photo=True)},
+            {"type": "image_url", "image_url": {"url": image["vision_image"]}},
+        ]
+        try:
+            review = await stream_chat_completion(
+                self.client,
+                priority=self.llm_priority,
+                model=self.vision_model,
+                messages=[{"role": "user", "content": content}],
+                temperature=0.8,
+                max_tokens=500,
+            )
+        except Exception as e:
+            metrics.inc("outfit_vision_fallbacks_total", {"error": type(e).__name__})
+            return None
+        if not review:
+            return None
+        outfit_vision_cache.set(image["dhash"], context, review)
+        if on_partial is not None:
+            await on_partial(review)
+        return review
+
+    async def _llm_fashion_review(self, description: str, scores: Dict[str, int], roast_mode: bool = False, on_partial: Optional[PartialCallback] = None) -> str:
+        prompt = self._review_prompt(description, scores, roast_mode)
         try:
-            chat_completion = self.client.chat.completions.create(
+            content = await stream_chat_completion(
+                self.client,
+                priority=self.llm_priority,
                 model=self.model,
                 messages=[
                     {"role": "system", "content": "Return ONLY the review body. No extra commentary."},
                     {"role": "user", "content": prompt}
                 ],
                 temperature=0.8,
-                max_tokens=500
+                max_tokens=500,
+                on_partial=on_partial,
             )
-            return chat_completion.choices[0].message.content
+            return content
         except Exception as e:
             raise McpError(ErrorData(code=INTERNAL_ERROR, message=f"LLM review failed: {str(e)}"))
 
-    async def run(self, inputs: Dict[str, Any]) -> Dict[str, Any]:
+    async def run(self, inputs: Dict[str, Any], on_partial: Optional[PartialCallback] = None) -> Dict[str, Any]:
         try:
             validated = OutfitRaterInput(**inputs)
         except ValueError as e:
             raise McpError(ErrorData(code=INVALID_PARAMS, message=str(e)))
 
         description = validated.outfit_description
+        image: Optional[Dict[str, Any]] = None
         if validated.puch_image_data:
             try:
-                image_bytes = base64.b64decode(validated.puch_image_data)
-                image = Image.open(io.BytesIO(image_bytes))
-                # Basic improvement: Extract dominant color for "analysis"
-                colors = image.getcolors()
-                dominant_color = colors[0][1] if colors else "unknown"
-                description += f" [Image analysis: Dominant color RGB {dominant_color}, Size {image.size}]"
+                image = await analyze_base64_image(validated.puch_image_data, vision_side=VISION_SIDE if self.vision_model else 0)
+            except McpError:
+                raise
             except Exception as e:
                 raise McpError(ErrorData(code=INTERNAL_ERROR, message=f"Image processing failed: {str(e)}"))
 
-        if not description:
+        if not description and image is None:
             raise McpError(ErrorData(code=INVALID_PARAMS, message="No outfit description or image provided"))
 
-        scores = self._style_score(description)
-        llm_review = await self._llm_fashion_review(description, scores, validated.roast_mode)
+        scores, matched_terms = self._style_score(description)
+        llm_review = None
+        reviewed_by = "text"
+        if image is not None and self.vision_model:
+            llm_review = await self._vision_review(description, scores, image, validated.roast_mode, on_partial)
+            reviewed_by = "vision"
+        if llm_review is None:
+            reviewed_by = "text"
+            if image is not None:
+                dominant_color = image["dominant_color"] or "unknown"
+                description += f" [Image analysis: Dominant color RGB {dominant_color}, Palette {image['palette']}, Size {image['size']}]"
+            llm_review = await self._llm_fashion_review(description, scores, validated.roast_mode, on_partial)
 
         return {
             "scores": scores,
+            "matched_terms": matched_terms,
+            "reviewed_by": reviewed_by,
             "fashion_review": llm_review,
             "share_text": f"My outfit score: {scores['style']}/100 👗 #SafeDateStyle"
         }
\ No newline at end of file
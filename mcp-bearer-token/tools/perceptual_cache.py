@@ -0,0 +1,57 @@
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional, Tuple
+from .metrics import record_cache
+
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+class PerceptualCache:
+    """LRU of values keyed on a 64-bit image hash plus an exact context key.
+
+    Lookups accept any entry with the same context whose hash is within
+    `max_distance` bits, so slightly re-cropped or re-compressed re-uploads of
+    the same photo hit. The scan is linear, which is fine at a few thousand
+    entries (one XOR and popcount each).
+    """
+
+    def __init__(self, name: str, max_entries: int = 1024, ttl: float = 86400, max_distance: int = 6):
+        self.name = name
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_distance = max_distance
+        self._entries: "OrderedDict[Tuple[int, Hashable], Tuple[float, Any]]" = OrderedDict()
+
+    def get(self, image_hash: int, context: Hashable) -> Optional[Any]:
+        now = time.time()
+        best: Optional[Tuple[int, Tuple[int, Hashable]]] = None
+        for key, (expires_at, _) in self._entries.items():
+            if key[1] != context or expires_at < now:
+                continue
+            distance = hamming(key[0], image_hash)
+            if distance <= self.max_distance and (best is None or distance < best[0]):
+                best = (distance, key)
+        if best is None:
+            record_cache(self.name, "misses")
+            return None
+        record_cache(self.name, "hits")
+        self._entries.move_to_end(best[1])
+        return self._entries[best[1]][1]
+
+    def set(self, image_hash: int, context: Hashable, value: Any) -> None:
+        key = (image_hash, context)
+        self._entries[key] = (time.time() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+outfit_vision_cache = PerceptualCache(
+    "outfit_vision",
+    max_entries=int(os.environ.get("OUTFIT_VISION_CACHE_ENTRIES", "1024")),
+    ttl=float(os.environ.get("LLM_CACHE_TTL", "86400")),
+    max_distance=int(os.environ.get("OUTFIT_PHASH_DISTANCE", "6")),
+)
@@ -0,0 +1,210 @@
+import asyncio
+import heapq
+import itertools
+import os
+import re
+import time
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+from .metrics import metrics
+
+# Budgets per model for the shared GROQ_API_KEY; refined from x-ratelimit-* headers at runtime
+GROQ_RPM = float(os.environ.get("GROQ_RPM", "30"))
+GROQ_TPM = float(os.environ.get("GROQ_TPM", "6000"))
+# Each server worker process keeps its own buckets, so each gets an equal share of the budget
+MCP_WORKERS = max(1, int(os.environ.get("MCP_WORKERS", "1")))
+# How long a call may wait in the queue before giving up
+GROQ_QUEUE_DEADLINE = float(os.environ.get("GROQ_QUEUE_DEADLINE", "20"))
+# Rough token cost of one image part in a vision prompt
+IMAGE_TOKEN_ESTIMATE = 1000
+
+# Lower runs first: safety checks are served before everything else, memes last
+PRIORITIES = {"safety": 0, "normal": 1, "entertainment": 2}
+
+_DURATION = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+_UNITS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+
+
+class RateLimitTimeout(Exception):
+    """The upstream budget did not free up before the caller's queue deadline."""
+
+
+def parse_duration(value: Optional[str]) -> Optional[float]:
+    """Seconds in a Groq reset header such as '7.66s', '2m59.56s' or '120ms'."""
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parts = _DURATION.findall(value)
+    return sum(float(n) * _UNITS[unit] for n, unit in parts) if parts else None
+
+
+def estimate_tokens(messages: List[Dict[str, Any]], max_tokens: int) -> int:
+    """Prompt tokens at ~4 characters each plus the completion budget the tool asked for."""
+    chars = 0
+    images = 0
+    for message in messages:
+        content = message.get("content")
+        if isinstance(content, str):
+            chars += len(content)
+            continue
+        for part in content or []:
+            if part.get("type") == "text":
+                chars += len(part.get("text", ""))
+            else:
+                images += 1
+    return chars // 4 + images * IMAGE_TOKEN_ESTIMATE + max_tokens
+
+
+class TokenBucket:
+    __slots__ = ("rate", "capacity", "level", "updated")
+
+    def __init__(self, per_minute: float):
+        self.rate = per_minute / 60
+        self.capacity = per_minute
+        self.level = per_minute
+        self.updated = time.monotonic()
+
+    def refill(self, now: float) -> None:
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float) -> float:
+        return 0.0 if self.level >= amount else (amount - self.level) / self.rate
+
+    def set_limit(self, per_minute: float) -> None:
+        self.rate = per_minute / 60
+        self.capacity = per_minute
+        self.level = min(self.level, per_minute)
+
+
+class _Waiter:
+    __slots__ = ("cost", "deadline", "future")
+
+    def __init__(self, cost: float, deadline: float, future: asyncio.Future):
+        self.cost = cost
+        self.deadline = deadline
+        self.future = future
+
+
+class UpstreamRateLimiter:
+    """Request and token buckets for one upstream model, shared by every tool.
+
+    A call that fits the budget with nobody queued goes straight through.
+    Otherwise it joins a priority queue and is admitted, highest class first,
+    once both buckets can cover it. A call still queued at its deadline fails
+    with RateLimitTimeout instead of waiting indefinitely. Rate-limit headers
+    from the upstream clamp the local estimate, and a 429's retry-after pauses
+    the whole queue.
+
+    `rpm` and `tpm` are the budget of the whole API key; this process enforces
+    1/`workers` of it, since every worker process runs its own limiter.
+    """
+
+    def __init__(self, name: str, rpm: float = GROQ_RPM, tpm: float = GROQ_TPM, workers: int = MCP_WORKERS):
+        self.name = name
+        self.workers = workers
+        self.requests = TokenBucket(rpm / workers)
+        self.tokens = TokenBucket(tpm / workers)
+        self.paused_until = 0.0
+        self._queue: List[Tuple[int, int, _Waiter]] = []
+        self._seq = itertools.count()
+        self._dispatcher: Optional[asyncio.Task] = None
+
+    def _wait_time(self, cost: float, now: float) -> float:
+        self.requests.refill(now)
+        self.tokens.refill(now)
+        return max(self.paused_until - now, self.requests.wait_time(1), self.tokens.wait_time(cost))
+
+    def _take(self, cost: float) -> None:
+        self.requests.level -= 1
+        self.tokens.level -= cost
+
+    async def acquire(self, tokens: int, priority: str = "normal", deadline: float = GROQ_QUEUE_DEADLINE) -> float:
+        """Wait for budget and return the tokens charged, to be passed to `settle`."""
+        cost = min(float(tokens), self.tokens.capacity)
+        now = time.monotonic()
+        if not self._queue and self._wait_time(cost, now) <= 0:
+            self._take(cost)
+            return cost
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._queue, (PRIORITIES.get(priority, PRIORITIES["normal"]), next(self._seq), _Waiter(cost, now + deadline, future)))
+        metrics.inc("llm_queued_total", {"upstream": self.name, "priority": priority})
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = asyncio.ensure_future(self._dispatch())
+        try:
+            return await future
+        finally:
+            metrics.observe("llm_queue_seconds", {"upstream": self.name, "priority": priority}, time.monotonic() - now)
+
+    async def _dispatch(self) -> None:
+        while self._queue:
+            now = time.monotonic()
+            for _, _, waiter in self._queue:
+                if not waiter.future.done() and waiter.deadline <= now:
+                    waiter.future.set_exception(
+                        RateLimitTimeout(f"{self.name} rate limit: no capacity within the queue deadline")
+                    )
+            while self._queue and self._queue[0][2].future.done():
+                heapq.heappop(self._queue)
+            if not self._queue:
+                return
+            waiter = self._queue[0][2]
+            wait = self._wait_time(waiter.cost, now)
+            if wait <= 0:
+                heapq.heappop(self._queue)
+                self._take(waiter.cost)
+                waiter.future.set_result(waiter.cost)
+                continue
+            next_deadline = min(w.deadline for _, _, w in self._queue if not w.future.done())
+            await asyncio.sleep(max(0.0, min(wait, next_deadline - now)))
+
+    def settle(self, charged: float, used: Optional[int]) -> None:
+        """Refund the unused part of an estimate once the real token usage is known.
+
+        `used=0` refunds the whole charge (the call failed or was cancelled);
+        `used=None` keeps it, since the upstream did not report usage.
+        """
+        if used is not None:
+            self.tokens.level = min(self.tokens.capacity, self.tokens.level + charged - used)
+
+    def adapt(self, headers: Mapping[str, str]) -> None:
+        """Fold the upstream's own view of the budget into the local buckets."""
+        now = time.monotonic()
+        self.tokens.refill(now)
+        # Header budgets are for the whole key: take this worker's share of them
+        limit_tokens = headers.get("x-ratelimit-limit-tokens")
+        if limit_tokens:
+            self.tokens.set_limit(float(limit_tokens) / self.workers)
+        remaining_tokens = headers.get("x-ratelimit-remaining-tokens")
+        if remaining_tokens:
+            self.tokens.level = min(self.tokens.level, float(remaining_tokens) / self.workers)
+        # Groq's request limit is per day: only honour it once it is exhausted
+        if headers.get("x-ratelimit-remaining-requests") == "0":
+            reset = parse_duration(headers.get("x-ratelimit-reset-requests"))
+            if reset:
+                self.paused_until = max(self.paused_until, now + reset)
+        retry_after = parse_duration(headers.get("retry-after"))
+        if retry_after:
+            self.paused_until = max(self.paused_until, now + retry_after)
+            metrics.inc("llm_throttled_total", {"upstream": self.name})
+
+
+_limiters: Dict[str, UpstreamRateLimiter] = {}
+_limiters_pid: Optional[int] = None
+
+
+def get_limiter(model: str) -> UpstreamRateLimiter:
+    """Per-process limiter for one Groq model, since the upstream budgets each model separately.
+
+    With MCP_WORKERS > 1 each worker enforces an equal share, so a worker that
+    gets more than its share of traffic queues even while the others have room.
+    """
+    global _limiters, _limiters_pid
+    if _limiters_pid != os.getpid():
+        _limiters, _limiters_pid = {}, os.getpid()
+    limiter = _limiters.get(model)
+    if limiter is None:
+        limiter = _limiters[model] = UpstreamRateLimiter(f"groq:{model}")
+    return limiter
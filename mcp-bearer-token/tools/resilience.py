@@ -0,0 +1,215 @@
+import asyncio
+import bisect
+import os
+import random
+import time
+from collections import OrderedDict, deque
+from typing import Awaitable, Callable, Deque, Optional, TypeVar
+import httpx
+from .metrics import metrics
+
+# Consecutive failed calls (after retries) that open a circuit
+BREAKER_FAILURES = int(os.environ.get("BREAKER_FAILURES", "5"))
+# Seconds an open circuit fails fast before letting one probe through; doubles per failed probe
+BREAKER_COOLDOWN = float(os.environ.get("BREAKER_COOLDOWN", "30"))
+BREAKER_MAX_COOLDOWN = BREAKER_COOLDOWN * 8
+# Extra attempts for idempotent GETs, spaced by full-jitter backoff
+RETRY_ATTEMPTS = int(os.environ.get("RETRY_ATTEMPTS", "2"))
+# Latency samples kept per upstream; no hedging or tightened timeout until MIN_SAMPLES are in
+LATENCY_WINDOW = int(os.environ.get("LATENCY_WINDOW", "200"))
+MIN_SAMPLES = 20
+# Per-attempt timeout is this multiple of the observed p99, capped by the caller's old fixed timeout
+TIMEOUT_P99_MULTIPLIER = 3.0
+TIMEOUT_FLOOR = 1.0
+MAX_UPSTREAMS = 1024
+
+T = TypeVar("T")
+# Performs one request within the given timeout (seconds)
+Attempt = Callable[[float], Awaitable[T]]
+
+
+class UpstreamUnavailable(Exception):
+    """The circuit is open, or an attempt overran its latency-derived deadline."""
+
+
+def is_upstream_fault(exc: BaseException) -> bool:
+    """Failures that say the upstream is unhealthy, as opposed to a bad request."""
+    if isinstance(exc, (UpstreamUnavailable, httpx.TransportError, asyncio.TimeoutError)):
+        return True
+    if isinstance(exc, httpx.HTTPStatusError):
+        return exc.response.status_code >= 500 or exc.response.status_code == 429
+    return False
+
+
+class LatencyWindow:
+    """The last `size` successful latencies, for quantile lookups."""
+
+    def __init__(self, size: int = LATENCY_WINDOW):
+        self._recent: Deque[float] = deque(maxlen=size)
+        self._sorted: list = []
+
+    def __len__(self) -> int:
+        return len(self._recent)
+
+    def add(self, seconds: float) -> None:
+        if len(self._recent) == self._recent.maxlen:
+            old = self._recent[0]
+            del self._sorted[bisect.bisect_left(self._sorted, old)]
+        self._recent.append(seconds)
+        bisect.insort(self._sorted, seconds)
+
+    def quantile(self, q: float) -> Optional[float]:
+        if len(self._sorted) < MIN_SAMPLES:
+            return None
+        return self._sorted[min(len(self._sorted) - 1, int(q * len(self._sorted)))]
+
+
+class CircuitBreaker:
+    """closed -> open after `threshold` consecutive faults -> half-open (one probe) after the cooldown."""
+
+    def __init__(self, threshold: int = BREAKER_FAILURES, cooldown: float = BREAKER_COOLDOWN):
+        self.threshold = threshold
+        self.base_cooldown = cooldown
+        self.cooldown = cooldown
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+
+    def retry_in(self) -> float:
+        return max(0.0, self.opened_at + self.cooldown - time.monotonic())
+
+    def allow(self) -> bool:
+        if self.state == "closed":
+            return True
+        if self.state == "open" and self.retry_in() <= 0:
+            self.state = "half_open"
+            return True
+        return False
+
+    def success(self) -> None:
+        self.state, self.failures, self.cooldown = "closed", 0, self.base_cooldown
+
+    def abandon(self) -> None:
+        """A call ended without a verdict (e.g. cancelled); if it was the probe, let the next call probe."""
+        if self.state == "half_open":
+            self.state = "open"  # opened_at is unchanged, so the cooldown has already run out
+
+    def failure(self) -> bool:
+        """Count a fault; True when it (re)opened the circuit."""
+        self.failures += 1
+        if self.state == "half_open":
+            self.cooldown = min(self.cooldown * 2, BREAKER_MAX_COOLDOWN)
+        elif self.failures < self.threshold or self.state == "open":
+            return False
+        self.state, self.opened_at = "open", time.monotonic()
+        return True
+
+
+class Upstream:
+    """Breaker, latency window and call policy for one upstream.
+
+    Timeouts follow the observed p99 (capped at the caller's fixed `max_timeout`),
+    so a degraded upstream is given up on in about the time it normally takes
+    rather than after the worst case. Idempotent GETs are also hedged: a second
+    attempt starts once the first has run past the p95, and the first success
+    wins. They are retried with full-jitter backoff. Anything else gets a single
+    attempt.
+    """
+
+    def __init__(self, name: str, max_timeout: float):
+        self.name = name
+        self.max_timeout = max_timeout
+        self.breaker = CircuitBreaker()
+        self.latency = LatencyWindow()
+
+    def timeout(self) -> float:
+        p99 = self.latency.quantile(0.99)
+        if p99 is None:
+            return self.max_timeout
+        return min(self.max_timeout, max(TIMEOUT_FLOOR, p99 * TIMEOUT_P99_MULTIPLIER))
+
+    async def _timed(self, attempt: Attempt, timeout: float):
+        start = time.perf_counter()
+        try:
+            result = await asyncio.wait_for(attempt(timeout), timeout)
+        except asyncio.TimeoutError:
+            raise UpstreamUnavailable(f"{self.name} did not answer within {timeout:.1f}s") from None
+        self.latency.add(time.perf_counter() - start)
+        return result
+
+    async def _hedged(self, attempt: Attempt, timeout: float):
+        first = asyncio.ensure_future(self._timed(attempt, timeout))
+        delay = self.latency.quantile(0.95)
+        if delay is None:
+            return await first
+        pending = {first}
+        error: Optional[BaseException] = None
+        try:
+            # Inside the try so a caller cancelled during the hedge delay still cancels `first`
+            done, pending = await asyncio.wait(pending, timeout=delay)
+            if done:
+                return first.result()
+            metrics.inc("upstream_hedged_total", {"upstream": self.name})
+            pending.add(asyncio.ensure_future(self._timed(attempt, timeout)))
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def _with_retries(self, attempt: Attempt, idempotent: bool):
+        attempts = 1 + (RETRY_ATTEMPTS if idempotent else 0)
+        for n in range(attempts):
+            timeout = self.timeout()
+            try:
+                return await (self._hedged(attempt, timeout) if idempotent else self._timed(attempt, timeout))
+            except Exception as e:
+                if not is_upstream_fault(e) or n + 1 == attempts:
+                    raise
+            metrics.inc("upstream_retries_total", {"upstream": self.name})
+            # Full jitter around the typical latency keeps retries from synchronising
+            base = self.latency.quantile(0.5) or 0.2
+            await asyncio.sleep(random.uniform(0, base * 2 ** (n + 1)))
+
+    async def call(self, attempt: Attempt, idempotent: bool = False):
+        if not self.breaker.allow():
+            metrics.inc("circuit_rejected_total", {"upstream": self.name})
+            raise UpstreamUnavailable(f"{self.name} circuit open; retrying in {self.breaker.retry_in():.0f}s")
+        try:
+            result = await self._with_retries(attempt, idempotent)
+        except Exception as e:
+            # A call that still fails after its retries is one strike against the upstream
+            if not is_upstream_fault(e):
+                self.breaker.success()  # the upstream answered; the request was at fault
+            elif self.breaker.failure():
+                metrics.inc("circuit_opened_total", {"upstream": self.name})
+            raise
+        except BaseException:
+            # Cancelled mid-call: says nothing about the upstream, but must not hold the probe slot
+            self.breaker.abandon()
+            raise
+        self.breaker.success()
+        return result
+
+
+_upstreams: "OrderedDict[str, Upstream]" = OrderedDict()
+_upstreams_pid: Optional[int] = None
+
+
+def upstream(name: str, max_timeout: float) -> Upstream:
+    """Per-process policy for `name` (e.g. "tavily" or "web:example.com"), most recent kept."""
+    global _upstreams, _upstreams_pid
+    if _upstreams_pid != os.getpid():
+        _upstreams, _upstreams_pid = OrderedDict(), os.getpid()
+    policy = _upstreams.get(name)
+    if policy is None:
+        policy = _upstreams[name] = Upstream(name, max_timeout)
+        while len(_upstreams) > MAX_UPSTREAMS:
+            _upstreams.popitem(last=False)
+    _upstreams.move_to_end(name)
+    return policy
@@ -0,0 +1,160 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+from .metrics import record_cache
+
+
+def normalize_input(text: str) -> str:
+    """Collapse whitespace so re-pasted copies of the same chat share a cache entry."""
+    return " ".join(text.split())
+
+
+def make_key(tool: str, model: str, prompt_version: str, text: str) -> str:
+    raw = json.dumps([tool, model, prompt_version, normalize_input(text)], ensure_ascii=False)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class MemoryBackend:
+    """In-process LRU store of (expires_at, value) pairs."""
+
+    def __init__(self, max_entries: int = 2048):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.time():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        self._entries[key] = (time.time() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+class SQLiteBackend:
+    """On-disk LRU store that survives restarts; values are stored as JSON."""
+
+    def __init__(self, path: str, max_entries: int = 2048):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS llm_cache ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS llm_cache_accessed ON llm_cache (accessed_at)")
+
+    def get(self, key: str) -> Optional[Any]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT value, expires_at FROM llm_cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            if row[1] < now:
+                self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                return None
+            self._conn.execute("UPDATE llm_cache SET accessed_at = ? WHERE key = ?", (now, key))
+        return json.loads(row[0])
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value, ensure_ascii=False), now + ttl, now),
+            )
+            self._conn.execute(
+                "DELETE FROM llm_cache WHERE key IN ("
+                "SELECT key FROM llm_cache ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+
+
+class ResponseCache:
+    """TTL + LRU cache of parsed LLM responses with per-tool hit/miss counters."""
+
+    def __init__(self, backend, ttl: float = 86400, disabled_tools: frozenset = frozenset()):
+        self.backend = backend
+        self.ttl = ttl
+        self.disabled_tools = disabled_tools
+        self.stats: Dict[str, Dict[str, int]] = {}
+
+    @classmethod
+    def from_env(cls) -> "ResponseCache":
+        kind = os.environ.get("LLM_CACHE_BACKEND", "memory").lower()
+        max_entries = int(os.environ.get("LLM_CACHE_MAX_ENTRIES", "2048"))
+        if kind == "sqlite":
+            backend = SQLiteBackend(os.environ.get("LLM_CACHE_PATH", "llm_cache.sqlite3"), max_entries)
+        elif kind in ("off", "none", "disabled"):
+            backend = None
+        else:
+            backend = MemoryBackend(max_entries)
+        disabled = frozenset(t.strip() for t in os.environ.get("LLM_CACHE_DISABLED_TOOLS", "").split(",") if t.strip())
+        return cls(backend, float(os.environ.get("LLM_CACHE_TTL", "86400")), disabled)
+
+    def enabled_for(self, tool: str) -> bool:
+        return self.backend is not None and tool not in self.disabled_tools
+
+    def _count(self, tool: str, outcome: str) -> None:
+        counters = self.stats.setdefault(tool, {"hits": 0, "misses": 0})
+        counters[outcome] += 1
+        record_cache(tool, outcome)
+
+    async def get_or_compute(
+        self,
+        tool: str,
+        model: str,
+        prompt_version: str,
+        text: str,
+        compute: Callable[[], Awaitable[Any]],
+        enabled: bool = True,
+    ) -> Any:
+        if not enabled or not self.enabled_for(tool):
+            return await compute()
+        key = make_key(tool, model, prompt_version, text)
+        value = self.backend.get(key)
+        if value is not None:
+            self._count(tool, "hits")
+            return value
+        self._count(tool, "misses")
+        value = await compute()
+        self.backend.set(key, value, self.ttl)
+        return value
+
+
+_cache: Optional[ResponseCache] = None
+_cache_pid: Optional[int] = None
+
+
+def get_cache() -> ResponseCache:
+    """Per-process cache; forked workers open their own SQLite connection."""
+    global _cache, _cache_pid
+    if _cache is None or _cache_pid != os.getpid():
+        _cache, _cache_pid = ResponseCache.from_env(), os.getpid()
+    return _cache
+
+
+async def cached(
+    tool: str,
+    model: str,
+    prompt_version: str,
+    text: str,
+    compute: Callable[[], Awaitable[Any]],
+    enabled: bool = True,
+) -> Any:
+    """Return a cached response for (tool, model, prompt_version, normalized text) or compute and store it."""
+    return await get_cache().get_or_compute(tool, model, prompt_version, text, compute, enabled)
@@ -6,8 +6,17 @@ except Exception:
     INTERNAL_ERROR = -32603  # type: ignore
 from pydantic import BaseModel, Field
 from typing import Dict, Any, List
-import httpx
+from .clients import registry
+from .geo_cache import places_cache, places_results
+from .metrics import upstream_call, record_payload
+from .resilience import upstream
 from urllib.parse import quote
+import asyncio, os
+
+# Police stations rarely move; cached tiles stay fresh for a week by default
+POLICE_TILE_TTL = float(os.environ.get("PLACES_POLICE_TTL", str(7 * 24 * 3600)))
+# How long the SOS path waits on a cold tile before answering without stations
+SOS_POLICE_DEADLINE = float(os.environ.get("SOS_POLICE_DEADLINE", "1.5"))
 
 class SafetyToolsInput(BaseModel):
     latitude: float = Field(..., description="User's latitude")
@@ -19,23 +28,35 @@ class SafetyTools:
         self.name = "safety_tools"
         self.description = "Find nearby police stations, emergency numbers & SOS sharing"
 
-    async def _find_nearby_police(self, lat: float, lon: float) -> List[Dict[str, Any]]:
-        url = f"https://maps.googleapis.com/maps/api/place/nearbysearch/json?location={lat},{lon}&radius=5000&type=police&key={self.google_api_key}"
-        async with httpx.AsyncClient() as client:
-            try:
-                res = await client.get(url, timeout=10)
+    async def _places_nearbysearch(self, lat: float, lon: float, radius: int) -> List[Dict[str, Any]]:
+        url = f"https://maps.googleapis.com/maps/api/place/nearbysearch/json?location={lat},{lon}&radius={radius}&type=police&key={self.google_api_key}"
+        async def attempt(timeout: float):
+            async with upstream_call("google_places"):
+                res = await registry.http("google_places").get(url, timeout=timeout)
                 res.raise_for_status()
-                data = res.json()
-                results = []
-                for place in data.get("results", []):
-                    results.append({
-                        "name": place.get("name"),
-                        "address": place.get("vicinity"),
-                        "maps_link": f"https://www.google.com/maps/place/?q=place_id:{place.get('place_id')}"
-                    })
-                return results
-            except Exception as e:
-                raise McpError(ErrorData(code=INTERNAL_ERROR, message=f"Google Places API failed: {str(e)}"))
+            return res
+
+        try:
+            res = await upstream("google_places", 10).call(attempt, idempotent=True)
+            record_payload("google_places", len(res.content))
+            return places_results(res.json())
+        except Exception as e:
+            raise McpError(ErrorData(code=INTERNAL_ERROR, message=f"Google Places API failed: {str(e)}"))
+
+    async def _find_nearby_police(self, lat: float, lon: float) -> List[Dict[str, Any]]:
+        places = await places_cache.nearby(lat, lon, "police", "", 5000, POLICE_TILE_TTL, self._places_nearbysearch)
+        results = []
+        for place in places:
+            results.append({
+                "name": place.get("name"),
+                "address": place.get("vicinity"),
+                "distance_m": place.get("distance_m"),
+                "maps_link": f"https://www.google.com/maps/place/?q=place_id:{place.get('place_id')}"
+            })
+        return results
+
+    def _police_search_link(self, lat: float, lon: float) -> str:
+        return f"https://www.google.com/maps/search/police/@{lat},{lon},14z"
 
     def _emergency_contacts(self) -> List[Dict[str, str]]:
         return [
@@ -57,7 +78,15 @@ class SafetyTools:
             validated = SafetyToolsInput(**inputs)
         except ValueError as e:
             raise McpError(ErrorData(code=INVALID_PARAMS, message=str(e)))
-        police_stations = await self._find_nearby_police(validated.latitude, validated.longitude)
+        # The SOS links never wait on Google: a cold tile gets a short deadline and keeps
+        # loading in the background so the next caller nearby is answered from cache.
+        # A failed lookup (Places down, circuit open, quota) degrades to the search link.
+        lookup = asyncio.ensure_future(self._find_nearby_police(validated.latitude, validated.longitude))
+        try:
+            police_stations = await asyncio.wait_for(asyncio.shield(lookup), timeout=SOS_POLICE_DEADLINE)
+        except Exception:
+            lookup.add_done_callback(lambda t: t.cancelled() or t.exception())
+            police_stations = []
         emergency_numbers = self._emergency_contacts()
         location_link = self._share_location_link(validated.latitude, validated.longitude)
         whatsapp_sos = self._whatsapp_sos_link(validated.latitude, validated.longitude)
@@ -66,6 +95,7 @@ class SafetyTools:
             "emergency_contacts": emergency_numbers,
             "share_location_link": location_link,
             "call_police_now": "tel:100",
+            "police_search_link": self._police_search_link(validated.latitude, validated.longitude),
             "whatsapp_sos_link": whatsapp_sos,
             "share_text": f"Safety first! Nearest police: {police_stations[0]['name'] if police_stations else 'N/A'} 🚔 #SafeDateAlert",
         }
\ No newline at end of file
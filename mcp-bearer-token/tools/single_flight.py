@@ -0,0 +1,45 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable
+from .metrics import metrics
+
+
+class _Call:
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Coalesce concurrent identical calls onto one in-flight upstream task.
+
+    Every caller awaits the shared task through asyncio.shield, so cancelling one
+    caller never cancels the work for the others; the task itself is cancelled
+    only when its last waiter goes away.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, _Call] = {}
+
+    def _forget(self, key: Hashable, call: _Call) -> None:
+        if self._calls.get(key) is call:
+            del self._calls[key]
+
+    async def do(self, name: str, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        call = self._calls.get(key)
+        if call is None:
+            call = _Call(asyncio.ensure_future(fn()))
+            call.task.add_done_callback(lambda _t, k=key, c=call: self._forget(k, c))
+            self._calls[key] = call
+            metrics.inc("singleflight_calls_total", {"tool": name, "role": "leader"})
+        else:
+            metrics.inc("singleflight_calls_total", {"tool": name, "role": "follower"})
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task)
+        finally:
+            call.waiters -= 1
+            if call.waiters == 0 and not call.task.done():
+                call.task.cancel()
+                self._forget(key, call)
@@ -0,0 +1,139 @@
+import asyncio
+import functools
+import json
+import os
+import re
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from .metrics import record_cache
+
+ALIASES_PATH = os.path.join(os.path.dirname(__file__), "data", "city_aliases.json")
+TAVILY_CACHE_TTL = float(os.environ.get("TAVILY_CACHE_TTL", "21600"))
+TAVILY_CACHE_ENTRIES = int(os.environ.get("TAVILY_CACHE_ENTRIES", "512"))
+# Results fetched per (city, theme); requests for fewer spots are sliced from this set
+TAVILY_FETCH_RESULTS = int(os.environ.get("TAVILY_FETCH_RESULTS", "20"))
+# Keep the N most requested lookups warm, re-fetching them shortly before they expire
+TAVILY_HOT_KEYS = int(os.environ.get("TAVILY_HOT_KEYS", "10"))
+TAVILY_REFRESH_INTERVAL = float(os.environ.get("TAVILY_REFRESH_INTERVAL", "300"))
+
+_PUNCT = re.compile(r"[^\w\s]")
+
+SearchKey = Tuple[str, str]
+# (normalized city, normalized theme, result count) -> raw Tavily results
+SearchFetch = Callable[[str, str, int], Awaitable[List[Dict[str, Any]]]]
+
+
+@functools.lru_cache(maxsize=1)
+def city_aliases() -> Dict[str, str]:
+    with open(ALIASES_PATH, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def normalize_phrase(text: Optional[str]) -> str:
+    if not text:
+        return ""
+    return " ".join(_PUNCT.sub(" ", text.lower()).split())
+
+
+def normalize_city(location: str) -> str:
+    """'Austin, TX', 'austin tx' and 'ATX' all become 'austin'."""
+    city = normalize_phrase(location)
+    return city_aliases().get(city, city)
+
+
+class _Entry:
+    __slots__ = ("fetched_at", "results", "fetch", "requests")
+
+    def __init__(self, fetched_at: float, results: List[Dict[str, Any]], fetch: SearchFetch):
+        self.fetched_at = fetched_at
+        self.results = results
+        self.fetch = fetch
+        self.requests = 0
+
+
+class TavilyResultCache:
+    """Raw Tavily results per normalized (city, theme), fetched once at full size.
+
+    A request for `n` results is answered from the first `n` cached ones, so
+    smaller lookups never hit Tavily again. Stale entries are served while a
+    background refresh runs, and a periodic task re-fetches the most requested
+    keys before they expire so popular cities never wait on Tavily.
+    """
+
+    def __init__(self, ttl: float = TAVILY_CACHE_TTL, max_entries: int = TAVILY_CACHE_ENTRIES, fetch_size: int = TAVILY_FETCH_RESULTS):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.fetch_size = fetch_size
+        self._entries: "OrderedDict[SearchKey, _Entry]" = OrderedDict()
+        self._inflight: Dict[SearchKey, asyncio.Task] = {}
+        self._refresher: Optional[asyncio.Task] = None
+
+    def _load(self, key: SearchKey, fetch: SearchFetch) -> asyncio.Task:
+        task = self._inflight.get(key)
+        if task is not None:
+            return task
+
+        async def load() -> List[Dict[str, Any]]:
+            try:
+                results = await fetch(key[0], key[1], self.fetch_size)
+                entry = self._entries.get(key)
+                if entry is None:
+                    entry = self._entries[key] = _Entry(time.time(), results, fetch)
+                else:
+                    entry.fetched_at, entry.results, entry.fetch = time.time(), results, fetch
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                return results
+            finally:
+                self._inflight.pop(key, None)
+
+        task = asyncio.ensure_future(load())
+        task.add_done_callback(lambda t: t.cancelled() or t.exception())
+        self._inflight[key] = task
+        return task
+
+    async def search(self, location: str, theme: Optional[str], count: int, fetch: SearchFetch) -> List[Dict[str, Any]]:
+        self._ensure_refresher()
+        key = (normalize_city(location), normalize_phrase(theme))
+        entry = self._entries.get(key)
+        if entry is None:
+            record_cache("tavily", "misses")
+            results = await asyncio.shield(self._load(key, fetch))
+            entry = self._entries.get(key)
+        else:
+            self._entries.move_to_end(key)
+            if time.time() - entry.fetched_at > self.ttl:
+                record_cache("tavily", "stale")
+                self._load(key, fetch)
+            else:
+                record_cache("tavily", "hits")
+            results = entry.results
+        if entry is not None:
+            entry.requests += 1
+        return results[:count]
+
+    def hottest(self, n: int) -> List[SearchKey]:
+        ranked = sorted(self._entries.items(), key=lambda kv: kv[1].requests, reverse=True)
+        return [key for key, entry in ranked[:n] if entry.requests > 0]
+
+    def _ensure_refresher(self) -> None:
+        if TAVILY_HOT_KEYS > 0 and (self._refresher is None or self._refresher.done()):
+            self._refresher = asyncio.ensure_future(self._refresh_hot())
+
+    async def _refresh_hot(self) -> None:
+        while True:
+            await asyncio.sleep(TAVILY_REFRESH_INTERVAL)
+            now = time.time()
+            for key in self.hottest(TAVILY_HOT_KEYS):
+                entry = self._entries.get(key)
+                # Re-fetch anything that would expire before the next pass
+                if entry is not None and now - entry.fetched_at > self.ttl - TAVILY_REFRESH_INTERVAL:
+                    self._load(key, entry.fetch)
+            # Halve request counts so the ranking follows current demand
+            for entry in self._entries.values():
+                entry.requests //= 2
+
+
+tavily_cache = TavilyResultCache()
@@ -2,21 +2,31 @@ from mcp import ErrorData, McpError
 from mcp.types import ImageContent, INVALID_PARAMS, INTERNAL_ERROR
 from pydantic import BaseModel, Field
 from typing import Dict, Any
-from groq import Groq
-import httpx
+from .llm import groq_client, chat_completion
+from .response_cache import cached
+from .clients import registry
+from .metrics import upstream_call, record_payload
+from .resilience import upstream
 import json
-import base64
-import io
-from PIL import Image, ImageDraw, ImageFont
+from .meme_renderer import render_meme
 import random
+import asyncio
+import os
+
+# The GIF is decoration: past this deadline the built-in vibe_gifs table answers instead
+GIPHY_DEADLINE = float(os.environ.get("GIPHY_DEADLINE", "2.0"))
 
 class TextVibeCheckerInput(BaseModel):
     messages: str = Field(..., min_length=1, max_length=1000, description="Conversation text to analyze")
     raw: bool = Field(default=False, description="Return raw analysis if True")
 
 class TextVibeChecker:  # changed to plain class
+    prompt_version = "1"
+    llm_priority = "entertainment"
+    cache_responses = True
+
     def __init__(self, api_key: str, giphy_api_key: str, model: str = "llama3-70b-8192"):
-        self.client = Groq(api_key=api_key)
+        self.client = groq_client(api_key)
         self.giphy_api_key = giphy_api_key
         self.model = model
         self.name = "text_vibe_checker"
@@ -29,16 +39,31 @@ class TextVibeChecker:  # changed to plain class
             "Ghosting": ["https://media.giphy.com/media/3o6Zt6ML6BklcajjsA/giphy.gif"],
         }
 
+    def _fallback_gif(self, vibe: str) -> str:
+        return random.choice(self.vibe_gifs.get(vibe, ["https://media.giphy.com/media/3o7TKsQ8J2e3B8W4z6/giphy.gif"]))
+
     async def _fetch_giphy(self, vibe: str) -> str:
         try:
             url = f"https://api.giphy.com/v1/gifs/search?api_key={self.giphy_api_key}&q={vibe}&limit=1"
-            async with httpx.AsyncClient() as client:
-                res = await client.get(url, timeout=10)
-                res.raise_for_status()
-                data = res.json()
-                return data["data"][0]["url"] if data["data"] else random.choice(self.vibe_gifs.get(vibe, ["https://media.giphy.com/media/3o7TKsQ8J2e3B8W4z6/giphy.gif"]))
+
+            async def attempt(timeout: float):
+                async with upstream_call("giphy"):
+                    res = await registry.http("giphy").get(url, timeout=timeout)
+                    res.raise_for_status()
+                return res
+
+            res = await upstream("giphy", 10).call(attempt, idempotent=True)
+            record_payload("giphy", len(res.content))
+            data = res.json()
+            return data["data"][0]["url"] if data["data"] else self._fallback_gif(vibe)
         except Exception:
-            return random.choice(self.vibe_gifs.get(vibe, ["https://media.giphy.com/media/3o7TKsQ8J2e3B8W4z6/giphy.gif"]))
+            return self._fallback_gif(vibe)
+
+    async def _gif_before_deadline(self, vibe: str) -> str:
+        try:
+            return await asyncio.wait_for(self._fetch_giphy(vibe), timeout=GIPHY_DEADLINE)
+        except asyncio.TimeoutError:
+            return self._fallback_gif(vibe)
 
     async def _llm_analysis(self, messages: str) -> Dict[str, Any]:
         prompt = f"""
@@ -65,8 +90,9 @@ class TextVibeChecker:  # changed to plain class
         }}
         """
 
-        try:
-            chat_completion = self.client.chat.completions.create(
+        async def complete() -> Dict[str, Any]:
+            content = await chat_completion(
+                self.client,
                 model=self.model,
                 messages=[
                     {"role": "system", "content": "You output ONLY strict JSON when asked. No backticks, no extra text."},
@@ -74,28 +100,17 @@ class TextVibeChecker:  # changed to plain class
                 ],
                 temperature=0.8,
                 max_tokens=200,
+                priority=self.llm_priority,
             )
-            return json.loads(chat_completion.choices[0].message.content)
+            return json.loads(content)
+
+        try:
+            return await cached(self.name, self.model, self.prompt_version, messages, complete, enabled=self.cache_responses)
         except (json.JSONDecodeError, KeyError, Exception) as e:
             raise McpError(ErrorData(code=INTERNAL_ERROR, message=f"LLM analysis failed: {str(e)}"))
 
     def _generate_vibe_meme(self, vibe: str, confidence: int, reason: str) -> ImageContent:
-        img = Image.new("RGB", (400, 200), color="#FFFFFF")
-        draw = ImageDraw.Draw(img)
-        try:
-            font = ImageFont.truetype("arial.ttf", 20)
-        except IOError:
-            font = ImageFont.load_default()
-        draw.text((10, 10), f"Vibe: {vibe} ({confidence}%)", fill="#000000", font=font)
-        draw.text((10, 50), f"Because: {reason}", fill="#000000", font=font)
-        draw.text((10, 90), "#SafeDateVibes", fill="#FF6B6B", font=font)
-        buf = io.BytesIO()
-        img.save(buf, format="PNG")
-        return ImageContent(
-            type="image",
-            mimeType="image/png",
-            data=base64.b64encode(buf.getvalue()).decode("utf-8")
-        )
+        return render_meme("vibe_meme", [f"Vibe: {vibe} ({confidence}%)", f"Because: {reason}"])
 
     async def run(self, inputs: Dict[str, Any]) -> Dict[str, Any]:
         try:
@@ -111,8 +126,11 @@ class TextVibeChecker:  # changed to plain class
         if validated.raw:
             return analysis
 
-        gif_url = await self._fetch_giphy(vibe)
-        meme = self._generate_vibe_meme(vibe, confidence, reason)
+        # Once the vibe is known the GIF lookup and the PIL render are independent branches
+        gif_url, meme = await asyncio.gather(
+            self._gif_before_deadline(vibe),
+            asyncio.to_thread(self._generate_vibe_meme, vibe, confidence, reason),
+        )
 
         return {
             "vibe": vibe,
@@ -6,7 +6,15 @@ except Exception:  # Fallback JSON-RPC codes
     INTERNAL_ERROR = -32603  # type: ignore
 from pydantic import BaseModel, Field
 from typing import Dict, Any, List
-import httpx
+from .clients import registry
+from .metrics import upstream_call, record_payload
+from .resilience import upstream
+from .lexicon import Lexicon
+from .tavily_cache import tavily_cache, normalize_city, normalize_phrase
+
+SPOT_LEXICON = Lexicon({
+    "standout": dict.fromkeys(["rooftop", "speakeasy", "hidden", "underground", "arcade", "museum", "gallery", "theater", "popup"], 3),
+})
 
 class TrendyDateSpotterInput(BaseModel):
     location: str = Field(..., min_length=2, max_length=80, description="City or area (e.g. 'Austin, TX')")
@@ -20,6 +28,14 @@ class TrendyDateSpotter:  # plain class (no inheritance from mcp.Tool)
         self.api_key = tavily_api_key
         self.endpoint = "https://api.tavily.com/search"
 
+    @staticmethod
+    def _query(city: str, theme: str) -> str:
+        theme_part = f" {theme} " if theme else " "
+        return f"trending date spots{theme_part}in {city} 2025"
+
+    async def _search_spots(self, city: str, theme: str, max_results: int) -> List[Dict[str, Any]]:
+        return await self._tavily_search(self._query(city, theme), max_results)
+
     async def _tavily_search(self, query: str, max_results: int) -> List[Dict[str, Any]]:
         payload = {
             "api_key": self.api_key,
@@ -27,11 +43,18 @@ class TrendyDateSpotter:  # plain class (no inheritance from mcp.Tool)
             "search_depth": "basic",
             "max_results": max_results,
         }
-        try:
-            async with httpx.AsyncClient(timeout=12) as client:
-                res = await client.post(self.endpoint, json=payload)
+
+        async def attempt(timeout: float):
+            async with upstream_call("tavily"):
+                res = await registry.http("tavily").post(self.endpoint, json=payload, timeout=timeout)
                 res.raise_for_status()
-                data = res.json()
+            return res
+
+        try:
+            # POST: one attempt, no hedging (each call spends Tavily credits)
+            res = await upstream("tavily", 12).call(attempt)
+            record_payload("tavily", len(res.content))
+            data = res.json()
         except Exception as e:
             raise McpError(ErrorData(code=INTERNAL_ERROR, message=f"Tavily API error: {e}"))
         results = data.get("results", [])
@@ -45,12 +68,12 @@ class TrendyDateSpotter:  # plain class (no inheritance from mcp.Tool)
         return formatted
 
     def _curate(self, raw: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        keywords = ["rooftop", "speakeasy", "hidden", "underground", "arcade", "museum", "gallery", "theater", "popup"]
         scored: List[tuple[float, Dict[str, Any]]] = []
         for item in raw:
-            text = (item.get("title", "") + " " + item.get("snippet", "")).lower()
-            score = sum(3 for k in keywords if k in text) + len(text) / 400
-            scored.append((score, item))
+            text = (item.get("title") or "") + " " + (item.get("snippet") or "")
+            hits = SPOT_LEXICON.scan(text)
+            score = hits.presence_points("standout") + len(text) / 400
+            scored.append((score, dict(item, matched_terms=hits.counts)))
         scored.sort(key=lambda x: x[0], reverse=True)
         return [i for _, i in scored]
 
@@ -61,14 +84,14 @@ class TrendyDateSpotter:  # plain class (no inheritance from mcp.Tool)
             raise McpError(ErrorData(code=INVALID_PARAMS, message=str(e)))
         if not self.api_key:
             raise McpError(ErrorData(code=INTERNAL_ERROR, message="Missing Tavily API key"))
-        theme_part = f" {validated.theme} " if validated.theme else " "
-        query = f"trending date spots{theme_part}in {validated.location} 2025".strip()
-        raw_results = await self._tavily_search(query, validated.max_results * 2)
+        query = self._query(normalize_city(validated.location), normalize_phrase(validated.theme))
+        # Served from the shared cache when any request has already looked up this city and theme
+        raw_results = await tavily_cache.search(validated.location, validated.theme, validated.max_results * 2, self._search_spots)
         if not raw_results:
             raise McpError(ErrorData(code=INTERNAL_ERROR, message="No search results"))
         curated = self._curate(raw_results)[: validated.max_results]
         spots = [
-            {"rank": idx + 1, "title": r.get("title"), "url": r.get("url"), "snippet": r.get("snippet")}
+            {"rank": idx + 1, "title": r.get("title"), "url": r.get("url"), "snippet": r.get("snippet"), "matched_terms": r.get("matched_terms")}
             for idx, r in enumerate(curated)
         ]
         share_text = f"Trending date spots in {validated.location}! Top pick: {spots[0]['title'] if spots else 'None'} #SafeDateSpots"
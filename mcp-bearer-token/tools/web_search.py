@@ -0,0 +1,134 @@
+import asyncio
+import os
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, quote_plus, urlsplit
+import httpx
+from .clients import registry
+from .fetch_engine import get_fetch_engine
+from .metrics import upstream_call, record_payload
+from .resilience import UpstreamUnavailable, upstream
+
+SEARCH_DEADLINE = float(os.environ.get("SEARCH_DEADLINE", "8"))
+SEARCH_MAX_CHARS = int(os.environ.get("SEARCH_MAX_CHARS", "4000"))
+DDG_SEARCH_URL = "https://html.duckduckgo.com/html/"
+
+# Called with each page as soon as it is read, in completion order
+ResultCallback = Callable[[Dict[str, Any]], Awaitable[None]]
+
+
+def _unwrap(href: str) -> Optional[str]:
+    """DDG result anchors point at //duckduckgo.com/l/?uddg=<target>; return the target."""
+    if href.startswith("//"):
+        href = "https:" + href
+    parts = urlsplit(href)
+    if parts.netloc.endswith("duckduckgo.com") and parts.path.startswith("/l/"):
+        target = parse_qs(parts.query).get("uddg")
+        return target[0] if target else None
+    return href if parts.scheme in ("http", "https") else None
+
+
+def _result_anchors(html: str) -> List[Tuple[str, str]]:
+    """(href, title) of each result anchor; selectolax is a dependency, bs4 is the fallback."""
+    try:
+        from selectolax.lexbor import LexborHTMLParser as HTMLParser  # selectolax 1.0 dropped .parser
+    except ImportError:
+        HTMLParser = None
+    if HTMLParser is not None:
+        return [(a.attributes.get("href") or "", a.text(strip=True)) for a in HTMLParser(html).css("a.result__a")]
+
+    from bs4 import BeautifulSoup
+    try:
+        soup = BeautifulSoup(html, "lxml")
+    except Exception:  # bs4.FeatureNotFound when lxml is missing
+        soup = BeautifulSoup(html, "html.parser")
+    return [(a.get("href", ""), a.get_text(strip=True)) for a in soup.select("a.result__a")]
+
+
+def parse_result_links(html: str, num_results: int) -> List[Dict[str, str]]:
+    results: List[Dict[str, str]] = []
+    seen = set()
+    for href, title in _result_anchors(html):
+        url = _unwrap(href)
+        if not url or url in seen:
+            continue
+        seen.add(url)
+        results.append({"url": url, "title": title})
+        if len(results) >= num_results:
+            break
+    return results
+
+
+async def ddg_search(query: str, num_results: int, user_agent: str) -> Optional[List[Dict[str, str]]]:
+    """Top results from DuckDuckGo's HTML endpoint; None when the search itself failed."""
+    ddg_url = f"{DDG_SEARCH_URL}?q={quote_plus(query)}"
+
+    async def attempt(timeout: float) -> httpx.Response:
+        async with upstream_call("duckduckgo"):
+            resp = await registry.http("duckduckgo").get(ddg_url, headers={"User-Agent": user_agent}, timeout=timeout)
+        if resp.status_code >= 500:
+            resp.raise_for_status()  # let the breaker see upstream faults
+        return resp
+
+    try:
+        resp = await upstream("duckduckgo", 10).call(attempt, idempotent=True)
+    except (httpx.HTTPError, UpstreamUnavailable):
+        return None
+    record_payload("duckduckgo", len(resp.content))
+    if resp.status_code != 200:
+        return None
+    return parse_result_links(resp.text, num_results)
+
+
+async def _read(result: Dict[str, str], user_agent: str, max_chars: int) -> Dict[str, Any]:
+    engine = get_fetch_engine()
+    page = await engine.fetch(result["url"], user_agent)
+    if page.status_code >= 400:
+        return {**result, "error": f"status code {page.status_code}"}
+    content = await engine.to_markdown(page.text) if page.is_html else page.text
+    return {**result, "content": content[:max_chars], "truncated": page.truncated or len(content) > max_chars}
+
+
+async def search_and_read(
+    query: str,
+    user_agent: str,
+    num_results: int = 5,
+    deadline: float = SEARCH_DEADLINE,
+    max_chars: int = SEARCH_MAX_CHARS,
+    on_result: Optional[ResultCallback] = None,
+) -> Dict[str, Any]:
+    """Search, then fetch and simplify every hit concurrently under one deadline.
+
+    Pages are handed to `on_result` in the order they finish. Whatever is still
+    loading when `deadline` seconds have passed (search time included) is
+    cancelled and reported as timed out, so one slow site cannot hold up the rest.
+    """
+    started = time.monotonic()
+    hits = await ddg_search(query, num_results, user_agent)
+    if hits is None:
+        return {"query": query, "error": "Failed to perform search", "results": []}
+
+    tasks = {asyncio.ensure_future(_read(hit, user_agent, max_chars)): hit for hit in hits}
+    results: List[Dict[str, Any]] = []
+    pending = set(tasks)
+    try:
+        while pending:
+            remaining = deadline - (time.monotonic() - started)
+            if remaining <= 0:
+                break
+            done, pending = await asyncio.wait(pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                hit = tasks[task]
+                try:
+                    item = task.result()
+                except Exception as e:
+                    item = {**hit, "error": f"{type(e).__name__}: {e}"}
+                results.append(item)
+                if on_result is not None:
+                    await on_result(item)
+    finally:
+        for task in pending:
+            task.cancel()
+    for task in pending:
+        results.append({**tasks[task], "error": f"timed out after {deadline:g}s"})
+    return {"query": query, "results": results, "elapsed_s": round(time.monotonic() - started, 2)}